@@ -0,0 +1,132 @@
+import time
+
+import cv2
+import numpy as np
+from overlay import rotate_image_alpha
+from sprite_cache import premultiply
+
+class AtlasFrame:
+    # One animation frame, drawable like a Sprite; its planes are views into the atlas
+    __slots__ = ("premul", "inv_alpha", "width", "height")
+
+    def __init__(self, premul, inv_alpha):
+        self.premul = premul
+        self.inv_alpha = inv_alpha
+        self.height, self.width = premul.shape[:2]
+
+class Clip:
+    __slots__ = ("name", "size", "frames", "fps", "loop")
+
+    def __init__(self, name, size, frames, fps, loop):
+        self.name = name
+        self.size = size
+        self.frames = frames
+        self.fps = fps
+        self.loop = loop
+
+    @property
+    def duration(self):
+        return len(self.frames) / self.fps
+
+    def frame_at(self, elapsed):
+        # None once a one-shot clip has finished
+        index = int(elapsed * self.fps)
+        if self.loop:
+            return self.frames[index % len(self.frames)]
+        if 0 <= index < len(self.frames):
+            return self.frames[index]
+        return None
+
+def slice_sheet(image, cell_w, cell_h):
+    # Grid cells left to right, top to bottom; trailing fully transparent cells are
+    # unused slots of the sheet, not frames
+    rows, cols = image.shape[0] // cell_h, image.shape[1] // cell_w
+    cells = [image[r * cell_h:(r + 1) * cell_h, c * cell_w:(c + 1) * cell_w] for r in range(rows) for c in range(cols)]
+    while cells and not cells[-1][:, :, 3].any():
+        cells.pop()
+    return cells
+
+class AnimationAtlas:
+    # Every frame of every clip, sliced, scaled and premultiplied once at load time.
+    # add_sheet() stages the frames; build() packs all frames of the same size into one
+    # (frames, h, w, 3) array per plane, so a clip is a run of consecutive frames in it
+    # and playback is only an index lookup.
+    def __init__(self):
+        self.clips = {}
+        self.build_ms = 0.0
+        self._staged = []
+        self._planes = {}
+
+    def add_sheet(self, name, image, cell_size, sizes, fps, loop=False, angle=0):
+        # One clip per (name, size); sizes are the final (w, h) each clip is drawn at,
+        # after every cell is rotated by angle like the sprite it goes with
+        if image is None:
+            raise FileNotFoundError(f"Gambar untuk animasi '{name}' tidak ditemukan.")
+        if image.ndim < 3 or image.shape[2] < 4:
+            raise ValueError(f"Gambar untuk animasi '{name}' tidak memiliki alpha channel.")
+        start = time.perf_counter()
+        cells = slice_sheet(image, *cell_size)
+        if angle:
+            cells = [rotate_image_alpha(cell, angle) for cell in cells]
+        for size in dict.fromkeys(tuple(size) for size in sizes):
+            frames = [cv2.resize(cell, size, interpolation=cv2.INTER_AREA) if cell.shape[1::-1] != size else cell
+                      for cell in cells]
+            planes = [premultiply(np.ascontiguousarray(frame[:, :, :3]), np.ascontiguousarray(frame[:, :, 3]))
+                      for frame in frames]
+            self._staged.append((name, size, planes, fps, loop))
+        self.build_ms += (time.perf_counter() - start) * 1000.0
+
+    def build(self):
+        start = time.perf_counter()
+        by_size = {}
+        for staged in self._staged:
+            by_size.setdefault(staged[1], []).append(staged)
+        for size, clips in by_size.items():
+            planes = [plane for _, _, clip_planes, _, _ in clips for plane in clip_planes]
+            premul = np.stack([p for p, _ in planes])
+            inv_alpha = np.stack([inv for _, inv in planes])
+            self._planes[size] = (premul, inv_alpha)
+            first = 0
+            for name, _, clip_planes, fps, loop in clips:
+                frames = [AtlasFrame(premul[i], inv_alpha[i]) for i in range(first, first + len(clip_planes))]
+                self.clips[(name, size)] = Clip(name, size, frames, fps, loop)
+                first += len(clip_planes)
+        self._staged = []
+        self.build_ms += (time.perf_counter() - start) * 1000.0
+        return self
+
+    def clip(self, name, size):
+        return self.clips[(name, tuple(size))]
+
+    def stats(self):
+        return {
+            "clips": len(self.clips),
+            "frames": sum(len(premul) for premul, _ in self._planes.values()),
+            "bytes": sum(premul.nbytes + inv.nbytes for premul, inv in self._planes.values()),
+            "build_ms": self.build_ms,
+        }
+
+class Animator:
+    # One-shot clips playing on the game clock. Each is centred on a fixed point, or on
+    # a player's ship so it follows the ship around.
+    def __init__(self):
+        self._playing = []
+
+    def play(self, clip, t, x=0, y=0, player=None):
+        self._playing.append((clip, t, x, y, player))
+
+    def clear(self):
+        self._playing.clear()
+
+    def draw(self, compositor, t, players):
+        still_playing = []
+        for entry in self._playing:
+            clip, start, x, y, player = entry
+            frame = clip.frame_at(t - start)
+            if frame is None:
+                continue
+            still_playing.append(entry)
+            if player is not None:
+                x, y = players[player].x + players[player].w // 2, players[player].y + players[player].h // 2
+            compositor.add(frame, int(x) - frame.width // 2, int(y) - frame.height // 2)
+        self._playing = still_playing
@@ -0,0 +1,129 @@
+import hashlib
+import json
+import os
+import time
+
+import cv2
+import numpy as np
+
+# Decoded images, stored as .npy so later runs map them instead of decoding the PNG
+ASSET_CACHE_DIR = os.path.join("assets", ".cache")
+
+def _file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+def _read_meta(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _write_atomic(path, write):
+    # Spawned worker processes load the same assets, so never leave a half-written file behind
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+class AssetCache:
+    # A cached image is used while the source keeps its mtime and size. When those
+    # change (a checkout, a copy) the source is hashed and the cache is only rebuilt
+    # if the content actually differs.
+    def __init__(self, cache_dir=ASSET_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self.load_ms = 0.0
+
+    def _cache_base(self, path):
+        key = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:12]
+        name = os.path.splitext(os.path.basename(path))[0]
+        return os.path.join(self.cache_dir, f"{name}-{key}")
+
+    def load(self, path):
+        # Same contract as cv2.imread(path, cv2.IMREAD_UNCHANGED): None when it cannot be read.
+        # Cached images come back as read-only memory maps.
+        start = time.perf_counter()
+        try:
+            image = self._load(path)
+        finally:
+            self.load_ms += (time.perf_counter() - start) * 1000.0
+        return image
+
+    def _load(self, path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        base = self._cache_base(path)
+        meta = _read_meta(base + ".json")
+        digest = None
+        if meta is not None:
+            fresh = meta.get("mtime_ns") == stat.st_mtime_ns and meta.get("size") == stat.st_size
+            if not fresh:
+                digest = _file_hash(path)
+                fresh = meta.get("sha1") == digest
+                if fresh:
+                    self._save_meta(base, stat, digest)
+            image = self._map(base) if fresh else None
+            if image is not None:
+                self.hits += 1
+                return image
+
+        self.misses += 1
+        image = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+        if image is None:
+            return None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            def write(tmp_path):
+                with open(tmp_path, "wb") as f:
+                    np.save(f, image)
+            _write_atomic(base + ".npy", write)
+            self._save_meta(base, stat, digest or _file_hash(path))
+        except OSError:
+            # A read-only checkout still runs, it just decodes every time
+            pass
+        return image
+
+    def _map(self, base):
+        try:
+            return np.load(base + ".npy", mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+
+    def _save_meta(self, base, stat, digest):
+        meta = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha1": digest}
+        def write(tmp_path):
+            with open(tmp_path, "w") as f:
+                json.dump(meta, f)
+        try:
+            _write_atomic(base + ".json", write)
+        except OSError:
+            pass
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "load_ms": self.load_ms}
+
+# Shared by the menu and the game
+asset_cache = AssetCache()
+
+def load_image(path):
+    return asset_cache.load(path)
+
+def prepare_sprites(cache, variants):
+    # Builds and pins every (name, size, angle) variant up front, so gameplay only does lookups
+    start = time.perf_counter()
+    sprites = [cache.pin(name, size, angle) for name, size, angle in variants]
+    build_ms = (time.perf_counter() - start) * 1000.0
+    return {
+        "variants": len(sprites),
+        "build_ms": build_ms,
+        "bytes": sum(sprite.nbytes for sprite in sprites),
+    }
@@ -0,0 +1,240 @@
+import numpy as np
+from game_core import (
+    BLINK_COOLDOWN,
+    BLINK_THRESHOLD,
+    HIT_DAMAGE,
+    MAX_PROJECTILES,
+    OPEN_THRESHOLD,
+    PROJECTILE_SPEED,
+    SHIELD_COOLDOWN,
+    SHIELD_DURATION,
+    START_HEALTH,
+)
+
+# Shot slots per match to start with; more are added, up to the capacity, once a
+# match has them all in flight. Live shots always sit in the lowest free slots.
+INITIAL_SLOTS = 4
+
+# Per-match arrays, one row per running match, dropped together when rows are compacted
+_PLAYER_FIELDS = ("x", "y", "present", "health", "shield_active", "shield_ready", "shield_off_due",
+                  "shield_ready_due", "blink_ready", "blink_due", "eye_ready")
+_SHOT_FIELDS = ("shot_x", "shot_y", "shot_dir", "shot_alive", "shot_order")
+_MATCH_FIELDS = ("match", "done", "shots_fired", "hits", "next_order")
+
+class BatchGameCore:
+    # GameCore for many matches at once: every player and projectile field is an array
+    # with one row per match, and step(inputs, dt) advances all of them together on one
+    # shared clock. Timers become due times compared against that clock. With the same
+    # inputs and step sizes each match plays out exactly as in GameCore (bench_core.py
+    # checks this), but no render events are produced. Finished matches are dropped from
+    # the arrays as they pile up; `match` maps each remaining row to its match number.
+    def __init__(self, matches, frame_size=(640, 480), player_sizes=((100, 100), (100, 100)),
+                 ammo_sizes=((80, 80), (80, 80)), capacity=MAX_PROJECTILES):
+        self.matches = matches
+        self.frame_w, self.frame_h = frame_size
+        self.capacity = capacity
+        (w0, h0), (w1, h1) = player_sizes
+        (aw0, ah0), (aw1, ah1) = ammo_sizes
+        # Same offsets as Player.place and GameCore.fire
+        self._x_offset = (int(w0 * 0.7), int(w1 * 0.3))
+        self._y_offset = (h0 // 2, h1 // 2)
+        self._shot_x_offset = (w0 - aw0 // 2, -(aw1 // 2))
+        self._shot_y_offset = (h0 // 2 - ah0 // 2, h1 // 2 - ah1 // 2)
+        self._ammo = ((aw0, ah0), (aw1, ah1))
+        self._player_size = ((w0, h0), (w1, h1))
+        self.reset()
+
+    def reset(self):
+        n = self.matches
+        self.time = 0.0
+        self.match = np.arange(n)
+        self.done = np.zeros(n, dtype=bool)
+        self.shots_fired = np.zeros(n, dtype=np.int64)
+        self.hits = np.zeros(n, dtype=np.int64)
+        self.next_order = np.zeros(n, dtype=np.int64)
+
+        self.x = np.zeros((n, 2), dtype=np.int64)
+        self.y = np.zeros((n, 2), dtype=np.int64)
+        self.present = np.zeros((n, 2), dtype=bool)
+        self.health = np.full((n, 2), START_HEALTH, dtype=np.int64)
+        self.shield_active = np.zeros((n, 2), dtype=bool)
+        self.shield_ready = np.ones((n, 2), dtype=bool)
+        # inf while the timer is not pending
+        self.shield_off_due = np.full((n, 2), np.inf)
+        self.shield_ready_due = np.full((n, 2), np.inf)
+        self.blink_ready = np.ones((n, 2), dtype=bool)
+        self.blink_due = np.full((n, 2), np.inf)
+        self.eye_ready = np.zeros((n, 2), dtype=bool)
+
+        slots = min(INITIAL_SLOTS, self.capacity)
+        self.shot_x = np.zeros((n, slots), dtype=np.float32)
+        self.shot_y = np.zeros((n, slots), dtype=np.float32)
+        # +1 for player 1's shots, which travel right and can only hit player 2, -1 for player 2's
+        self.shot_dir = np.zeros((n, slots), dtype=np.float32)
+        self.shot_alive = np.zeros((n, slots), dtype=bool)
+        self.shot_order = np.zeros((n, slots), dtype=np.int64)
+
+        # Indexed by match number; filled in as matches finish, and by results()
+        self.winner = np.full(n, -1, dtype=np.int8)
+        self.end_time = np.zeros(n)
+        self.final_health = np.zeros((n, 2), dtype=np.int64)
+        self.total_shots = np.zeros(n, dtype=np.int64)
+        self.total_hits = np.zeros(n, dtype=np.int64)
+
+    @property
+    def running(self):
+        return int(np.count_nonzero(~self.done))
+
+    def step(self, inputs, dt):
+        # inputs: None, or (nose_x, nose_y, ear, thumbs) for the rows in `match`, each
+        # (rows, 2) or broadcastable to it, applied in GameCore's order: player 1's nose,
+        # EAR and gesture, then player 2's. Returns the number of matches still running.
+        self.time += dt
+        now = self.time
+        self._run_timers(now)
+        if inputs is not None:
+            nose_x, nose_y, ear, thumbs = (np.asarray(value) for value in inputs)
+            for p in (0, 1):
+                self._apply(p, nose_x[..., p], nose_y[..., p], ear[..., p], thumbs[..., p], now)
+
+        if self.shot_alive.any():
+            self._move_shots(PROJECTILE_SPEED * dt)
+            self._collide()
+            dead = self.health <= 0
+            finished = ~self.done & (dead[:, 0] | dead[:, 1])
+            if finished.any():
+                rows = np.flatnonzero(finished)
+                self.winner[self.match[rows]] = np.where(dead[rows, 0], 1, 0)
+                self._record(rows)
+                self.done[rows] = True
+                # Copying the arrays costs about as much as a few steps, so only do it once
+                # an eighth of the rows are just along for the ride
+                if np.count_nonzero(self.done) * 8 >= len(self.done):
+                    self._compact()
+        return self.running
+
+    def results(self):
+        # Per match number: winner (0, 1, or -1 while unfinished), time, health, shots and hits
+        self._record(np.flatnonzero(~self.done))
+        return {
+            "winner": self.winner,
+            "time": self.end_time,
+            "health": self.final_health,
+            "shots": self.total_shots,
+            "hits": self.total_hits,
+        }
+
+    def _run_timers(self, now):
+        blink = self.blink_due <= now
+        self.blink_ready |= blink
+        self.blink_due[blink] = np.inf
+        off = self.shield_off_due <= now
+        if off.any():
+            self.shield_active[off] = False
+            self.shield_off_due[off] = np.inf
+            self.shield_ready_due[off] = now + SHIELD_COOLDOWN
+        ready = self.shield_ready_due <= now
+        self.shield_ready |= ready
+        self.shield_ready_due[ready] = np.inf
+
+    def _apply(self, p, nose_x, nose_y, ear, thumbs, now):
+        self.x[:, p] = (nose_x * self.frame_w).astype(np.int64) - self._x_offset[p]
+        self.y[:, p] = (nose_y * self.frame_h).astype(np.int64) - self._y_offset[p]
+        self.present[:, p] = True
+
+        self.eye_ready[:, p] |= ear > OPEN_THRESHOLD
+        fire = (ear < BLINK_THRESHOLD) & self.eye_ready[:, p] & self.blink_ready[:, p] & self.present[:, p]
+        if fire.any():
+            self._fire(p, np.flatnonzero(fire), now)
+
+        shield = thumbs & self.shield_ready[:, p]
+        if shield.any():
+            self.shield_active[shield, p] = True
+            self.shield_ready[shield, p] = False
+            self.shield_off_due[shield, p] = now + SHIELD_DURATION
+
+    def _fire(self, p, rows, now):
+        slots = self._free_slots(rows)
+        self.shot_x[rows, slots] = self.x[rows, p] + self._shot_x_offset[p]
+        self.shot_y[rows, slots] = self.y[rows, p] + self._shot_y_offset[p]
+        self.shot_dir[rows, slots] = 1 if p == 0 else -1
+        self.shot_alive[rows, slots] = True
+        self.shot_order[rows, slots] = self.next_order[rows]
+        self.next_order[rows] += 1
+        self.shots_fired[rows] += 1
+        self.blink_ready[rows, p] = False
+        self.eye_ready[rows, p] = False
+        self.blink_due[rows, p] = now + BLINK_COOLDOWN
+
+    def _free_slots(self, rows):
+        # ProjectileStore.spawn for each row: the first free slot, or the oldest shot's
+        # slot once all `capacity` are in flight
+        free = ~self.shot_alive[rows]
+        has_free = free.any(axis=1)
+        if not has_free.all() and self.shot_alive.shape[1] < self.capacity:
+            self._grow_slots()
+            free = ~self.shot_alive[rows]
+            has_free = free.any(axis=1)
+        slots = free.argmax(axis=1)
+        full = ~has_free
+        if full.any():
+            slots[full] = self.shot_order[rows[full]].argmin(axis=1)
+        return slots
+
+    def _grow_slots(self):
+        slots = self.shot_alive.shape[1]
+        extra = min(slots, self.capacity - slots)
+        for name in _SHOT_FIELDS:
+            array = getattr(self, name)
+            setattr(self, name, np.concatenate((array, np.zeros((len(array), extra), dtype=array.dtype)), axis=1))
+
+    # Shot sizes are fixed per player, so ProjectileStore's `x + w` tests are written as
+    # `x > -w` style comparisons against whole numbers. Both compare the same exact values
+    # (float32 x plus an integer is exact in float64), but these stay in float32 and work
+    # on one column per match instead of an array per shot.
+
+    def _move_shots(self, distance):
+        # ProjectileStore.step across every match. Free slots move too; they are
+        # overwritten before they are used again.
+        self.shot_x += self.shot_dir * np.float32(distance)
+        (aw0, _), (aw1, _) = self._ammo
+        on_screen = self.shot_x <= self.frame_w
+        if aw0 == aw1:
+            on_screen &= self.shot_x >= -aw0
+        else:
+            on_screen &= self.shot_x >= np.where(self.shot_dir > 0, np.float32(-aw0), np.float32(-aw1))
+        self.shot_alive &= on_screen
+
+    def _collide(self):
+        # ProjectileStore.collide across every match: a shot can only hit the other player
+        at_p1 = self.shot_dir > 0
+        left = self.x.astype(np.float32)
+        top = self.y.astype(np.float32)
+        for p, aimed in ((0, ~at_p1), (1, at_p1)):
+            w, h = self._player_size[p]
+            ammo_w, ammo_h = self._ammo[1 - p]
+            tx, ty = left[:, p:p + 1], top[:, p:p + 1]
+            hit = (
+                self.shot_alive & aimed & self.present[:, p:p + 1]
+                & (self.shot_x < tx + w) & (self.shot_x > tx - ammo_w)
+                & (self.shot_y < ty + h) & (self.shot_y > ty - ammo_h)
+            )
+            if not hit.any():
+                continue
+            self.shot_alive &= ~hit
+            count = np.count_nonzero(hit, axis=1)
+            self.hits += count
+            # A shielded player absorbs the shot without losing health
+            self.health[:, p] -= np.where(self.shield_active[:, p], 0, count * HIT_DAMAGE)
+
+    def _record(self, rows):
+        match = self.match[rows]
+        self.end_time[match] = self.time
+        self.final_health[match] = self.health[rows]
+        self.total_shots[match] = self.shots_fired[rows]
+        self.total_hits[match] = self.hits[rows]
+
+    def _compact(self):
+        keep = ~self.done
+        for name in _PLAYER_FIELDS + _SHOT_FIELDS + _MATCH_FIELDS:
+            setattr(self, name, getattr(self, name)[keep])
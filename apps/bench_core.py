@@ -0,0 +1,225 @@
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from batch_core import BatchGameCore
+from game_core import OPEN_THRESHOLD, GameCore
+from scheduler import TimerScheduler
+from simulation import SIM_HZ, FixedStepLoop, InputEvent, InputQueue
+
+FRAME_W, FRAME_H = 640, 480
+CAMERA_HZ = 30
+MAX_MATCH_TIME = 120.0
+# Nose x of each player; only the height moves
+BASE_X = (0.15, 0.85)
+# Matches whose inputs are made together: a chunk for GameCore, or one BatchGameCore
+OBJECT_CHUNK = 64
+DEFAULT_BATCH = 4096
+
+class SyntheticInputs:
+    # For every match and player: the head bobs on a sine wave, the eyes blink at a
+    # random rate and now and then a thumb goes up. frame(i) gives camera frame i for
+    # all matches at once, as (matches, 2) arrays.
+    def __init__(self, rng, matches):
+        self.rng = rng
+        # The wave is worked out in float32, which keeps input generation a small part of a
+        # batch run; both cores get the same float64 values from it
+        self.omega = (2 * np.pi * rng.uniform(0.1, 0.6, (matches, 2))).astype(np.float32)
+        self.phase = rng.uniform(0, 2 * np.pi, (matches, 2)).astype(np.float32)
+        self.blink_period = rng.integers(20, 60, (matches, 2))
+
+    def frame(self, frame):
+        wave = np.sin(self.omega * np.float32(frame / CAMERA_HZ) + self.phase).astype(np.float64)
+        nose_y = 0.5 + 0.35 * wave
+        ear = np.where(frame % self.blink_period < 3, 0.08, OPEN_THRESHOLD + 0.05)
+        thumbs = self.rng.random(self.omega.shape) < 0.01
+        return nose_y, ear, thumbs
+
+    def streams(self, frames):
+        # The same frames as lists for run_match, one (base_x, nose_y, ear, thumbs) per player
+        nose_y, ear, thumbs = (np.stack(columns) for columns in zip(*(self.frame(i) for i in range(frames))))
+        return [[(BASE_X[p], nose_y[:, m, p].tolist(), ear[:, m, p].tolist(), thumbs[:, m, p].tolist())
+                 for p in (0, 1)] for m in range(nose_y.shape[1])]
+
+def run_match(core, streams, dt):
+    core.reset()
+    steps_per_frame = max(1, int(round(1.0 / (CAMERA_HZ * dt))))
+    steps = 0
+    frames = len(streams[0][1])
+    for frame in range(frames):
+        inputs = []
+        for player, (base_x, nose_y, ear, thumbs) in enumerate(streams):
+            inputs.append(InputEvent(core.time, "nose", player, (base_x, nose_y[frame])))
+            inputs.append(InputEvent(core.time, "ear", player, ear[frame]))
+            if thumbs[frame]:
+                inputs.append(InputEvent(core.time, "gesture", player, "thumbs_up"))
+        running = core.step(inputs, dt)
+        steps += 1
+        for _ in range(steps_per_frame - 1):
+            if not running:
+                break
+            running = core.step((), dt)
+            steps += 1
+        if not running:
+            break
+    return steps
+
+def check_same_frame_inputs(hz):
+    # An event pushed at a frame's time must reach the core in that frame's advance(),
+    # also when the frame is too short for a full step to fall due
+    for frame_dt in (1.0 / CAMERA_HZ, 0.25 / hz):
+        core = GameCore((FRAME_W, FRAME_H))
+        inputs = InputQueue()
+        loop = FixedStepLoop(hz, inputs=inputs)
+        loop.reset(0.0)
+        now = 0.0
+        for frame in range(1, 5):
+            now = frame * frame_dt
+            inputs.push(InputEvent(now, "nose", 0, (0.2, 0.1 * frame)))
+            loop.advance(now, lambda sim_time, dt, events: core.step(events, dt))
+            expected_y = int(0.1 * frame * FRAME_H) - core.players[0].h // 2
+            if len(inputs) or core.players[0].y != expected_y:
+                raise AssertionError(f"Input frame {frame} belum diterapkan pada advance() yang sama "
+                                     f"(frame {frame_dt * 1000:.1f} ms)")
+
+class LoggedTimers(TimerScheduler):
+    # Notes (core time, due time, callback, args) for every timer as it fires
+    def __init__(self, clock):
+        super().__init__(clock)
+        self.fired = []
+
+    def call_at(self, due, callback, *args):
+        def fire(*fire_args):
+            self.fired.append((self.clock.now(), due, callback.__name__, fire_args))
+            callback(*fire_args)
+        return super().call_at(due, fire, *args)
+
+def check_timer_determinism(hz, seed=4321):
+    # The same match played twice must fire the same timers at the same core times: once
+    # on a fresh core and once on a core restarted in the middle of another match, whose
+    # pending shield and blink timers must not carry over
+    dt = 1.0 / hz
+    frames = int(MAX_MATCH_TIME * CAMERA_HZ)
+    match, other = SyntheticInputs(np.random.default_rng(seed), 2).streams(frames)
+    logs = []
+    for warm_up in (None, other):
+        core = GameCore((FRAME_W, FRAME_H))
+        core.timers = LoggedTimers(core)
+        if warm_up is not None:
+            run_match(core, [(base_x, nose_y[:CAMERA_HZ * 10], ear, thumbs)
+                             for base_x, nose_y, ear, thumbs in warm_up], dt)
+            if not core.timers.pending():
+                raise AssertionError("Permainan pemanasan tidak meninggalkan timer yang tertunda")
+        core.timers.fired.clear()
+        run_match(core, match, dt)
+        logs.append(core.timers.fired)
+    if not any(name == "_deactivate_shield" for _, _, name, _ in logs[0]):
+        raise AssertionError("Match uji tidak memicu timer perisai")
+    if logs[0] != logs[1]:
+        raise AssertionError("Timer tidak berjalan sama pada dua permainan dengan input yang sama")
+
+def run_batch_matches(core, inputs, frames, dt):
+    # run_match for every match in a BatchGameCore; returns the steps taken, summed over matches
+    core.reset()
+    steps_per_frame = max(1, int(round(1.0 / (CAMERA_HZ * dt))))
+    base_x = np.array(BASE_X)
+    steps = 0
+    for frame in range(frames):
+        nose_y, ear, thumbs = inputs.frame(frame)
+        rows = core.match
+        steps += core.running
+        running = core.step((base_x, nose_y[rows], ear[rows], thumbs[rows]), dt)
+        for _ in range(steps_per_frame - 1):
+            if not running:
+                break
+            steps += running
+            running = core.step(None, dt)
+        if not running:
+            break
+    return steps
+
+def check_batch_core(hz, matches=16, seed=1234):
+    # BatchGameCore must play every match exactly as GameCore does on the same inputs
+    dt = 1.0 / hz
+    frames = int(MAX_MATCH_TIME * CAMERA_HZ)
+    streams = SyntheticInputs(np.random.default_rng(seed), matches).streams(frames)
+    batch = BatchGameCore(matches, (FRAME_W, FRAME_H))
+    run_batch_matches(batch, SyntheticInputs(np.random.default_rng(seed), matches), frames, dt)
+    results = batch.results()
+    core = GameCore((FRAME_W, FRAME_H))
+    for m in range(matches):
+        run_match(core, streams[m], dt)
+        expected = (-1 if core.winner is None else core.winner, core.time,
+                    [player.health for player in core.players], core.shots_fired, core.hits)
+        actual = (int(results["winner"][m]), float(results["time"][m]), results["health"][m].tolist(),
+                  int(results["shots"][m]), int(results["hits"][m]))
+        if expected != actual:
+            raise AssertionError(f"BatchGameCore berbeda dari GameCore pada match {m}: {actual} != {expected}")
+
+def run_batch(seed, matches, hz, core_kind="batch", batch=DEFAULT_BATCH):
+    # Each process gets its own core and its own share of the input streams
+    rng = np.random.default_rng(seed)
+    dt = 1.0 / hz
+    frames = int(MAX_MATCH_TIME * CAMERA_HZ)
+    wins = [0, 0, 0]
+    steps = 0
+    match_time = 0.0
+    chunk = batch if core_kind == "batch" else OBJECT_CHUNK
+    for first in range(0, matches, chunk):
+        count = min(chunk, matches - first)
+        inputs = SyntheticInputs(rng, count)
+        if core_kind == "batch":
+            core = BatchGameCore(count, (FRAME_W, FRAME_H))
+            steps += run_batch_matches(core, inputs, frames, dt)
+            results = core.results()
+            winners, times = results["winner"].tolist(), results["time"].tolist()
+        else:
+            core = GameCore((FRAME_W, FRAME_H))
+            winners, times = [], []
+            for streams in inputs.streams(frames):
+                steps += run_match(core, streams, dt)
+                winners.append(-1 if core.winner is None else core.winner)
+                times.append(core.time)
+        for winner, match_time_s in zip(winners, times):
+            wins[2 if winner < 0 else winner] += 1
+            match_time += match_time_s
+    return wins, steps, match_time
+
+def main():
+    parser = argparse.ArgumentParser(description="Run whole matches on the game core without camera or rendering")
+    parser.add_argument("--matches", type=int, default=200)
+    parser.add_argument("--hz", type=int, default=SIM_HZ, help="simulation steps per second")
+    parser.add_argument("--processes", type=int, default=1, help="split the matches across N processes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--core", choices=("batch", "object"), default="batch",
+                        help="batch runs many matches at once on BatchGameCore, object one at a time on GameCore")
+    parser.add_argument("--batch", type=int, default=DEFAULT_BATCH, help="matches per BatchGameCore")
+    args = parser.parse_args()
+
+    check_same_frame_inputs(args.hz)
+    check_timer_determinism(args.hz)
+    check_batch_core(args.hz)
+    share = [args.matches // args.processes + (i < args.matches % args.processes) for i in range(args.processes)]
+    start = time.perf_counter()
+    if args.processes == 1:
+        batches = [run_batch(args.seed, args.matches, args.hz, args.core, args.batch)]
+    else:
+        with ProcessPoolExecutor(args.processes) as pool:
+            batches = list(pool.map(run_batch, [args.seed + i for i in range(args.processes)], share,
+                                    [args.hz] * args.processes, [args.core] * args.processes,
+                                    [args.batch] * args.processes))
+    elapsed = time.perf_counter() - start
+
+    wins = np.sum([b[0] for b in batches], axis=0)
+    total_steps = sum(b[1] for b in batches)
+    match_time = sum(b[2] for b in batches)
+    print(f"{args.matches} matches on the {args.core} core at {args.hz} Hz on {args.processes} process(es) "
+          f"in {elapsed:.2f} s: "
+          f"{args.matches / elapsed:.1f} matches/s, {total_steps / elapsed:.0f} steps/s")
+    print(f"Average match {match_time / args.matches:.1f} s simulated, "
+          f"{match_time / elapsed:.0f}x real time")
+    print(f"Player 1 wins {wins[0]}, Player 2 wins {wins[1]}, unfinished {wins[2]}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import argparse
+import time
+
+import numpy as np
+from landmarks import HAND_POINTS, LandmarkBatch, PackedLandmarks
+from utils import INDEX_TIP_IDX, MIDDLE_TIP_IDX, THUMB_TIP_IDX, detect_hand_gesture, eye_aspect_ratio, landmark_features
+
+# Same indices as main.py; not imported from there so the game's assets are not loaded
+LEFT_EYE_IDX = [362, 385, 387, 263, 373, 380]
+RIGHT_EYE_IDX = [33, 160, 158, 133, 153, 144]
+NOSE_IDX = 1
+WRIST_IDX = 0
+FACE_POINTS = 478
+FRAME_SIZE = (640, 480)
+REPEATS = 5000
+
+def make_arrays(seed=0):
+    # Two faces and two hands, thumbs up on one of them
+    rng = np.random.default_rng(seed)
+    faces = rng.uniform(0.1, 0.9, (2, FACE_POINTS, 3)).astype(np.float32)
+    hands = rng.uniform(0.1, 0.9, (2, HAND_POINTS, 3)).astype(np.float32)
+    hands[0, 4, 1] = 0.05
+    return faces, hands
+
+def to_protobuf(arrays):
+    # What the in-process FaceMesh/Hands return
+    from mediapipe.framework.formats import landmark_pb2
+    lists = []
+    for array in arrays:
+        landmark_list = landmark_pb2.NormalizedLandmarkList()
+        for x, y, z in array:
+            point = landmark_list.landmark.add()
+            point.x, point.y, point.z = x, y, z
+        lists.append(landmark_list)
+    return lists
+
+def per_object(face_lists, hand_lists, img_w, img_h):
+    # The loop main.py ran before LandmarkBatch
+    ears, noses, gestures = [], [], []
+    for face_landmarks in face_lists:
+        nose = face_landmarks.landmark[NOSE_IDX]
+        noses.append((nose.x, nose.y))
+        left_ear = eye_aspect_ratio(face_landmarks.landmark, LEFT_EYE_IDX, img_w, img_h)
+        right_ear = eye_aspect_ratio(face_landmarks.landmark, RIGHT_EYE_IDX, img_w, img_h)
+        ears.append((left_ear + right_ear) / 2.0)
+    for hand_landmarks in hand_lists:
+        gestures.append((detect_hand_gesture(hand_landmarks) == "thumbs_up", hand_landmarks.landmark[WRIST_IDX].x))
+    return ears, noses, gestures
+
+def batched(batch, rows, face_lists, hand_lists, img_w, img_h):
+    batch.load(face_lists, hand_lists)
+    return landmark_features(batch, *rows, img_w, img_h)
+
+def time_call(func, args, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        func(*args)
+    return (time.perf_counter() - start) / repeats * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-object landmark reads vs. LandmarkBatch + landmark_features")
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    args = parser.parse_args()
+
+    img_w, img_h = FRAME_SIZE
+    faces, hands = make_arrays()
+    inputs = {"packed": ([PackedLandmarks(a) for a in faces], [PackedLandmarks(a) for a in hands])}
+    try:
+        inputs["protobuf"] = (to_protobuf(faces), to_protobuf(hands))
+    except ImportError:
+        print("mediapipe not installed, skipping protobuf results")
+
+    batch = LandmarkBatch([NOSE_IDX] + LEFT_EYE_IDX + RIGHT_EYE_IDX,
+                          [WRIST_IDX, THUMB_TIP_IDX, INDEX_TIP_IDX, MIDDLE_TIP_IDX])
+    rows = (batch.face_rows([LEFT_EYE_IDX, RIGHT_EYE_IDX]), int(batch.face_rows(NOSE_IDX)),
+            batch.hand_rows([THUMB_TIP_IDX, INDEX_TIP_IDX, MIDDLE_TIP_IDX]), int(batch.hand_rows(WRIST_IDX)))
+
+    print(f"{'input':>9} {'per-object us':>14} {'batched us':>11} {'speedup':>8} {'max EAR diff':>13} {'same':>5}")
+    for name, (face_lists, hand_lists) in inputs.items():
+        old_us = time_call(per_object, (face_lists, hand_lists, img_w, img_h), args.repeats)
+        new_us = time_call(batched, (batch, rows, face_lists, hand_lists, img_w, img_h), args.repeats)
+
+        ears, noses, gestures = per_object(face_lists, hand_lists, img_w, img_h)
+        avg_ears, batch_noses, thumbs, wrist_xs = batched(batch, rows, face_lists, hand_lists, img_w, img_h)
+        ear_diff = float(np.abs(np.array(ears) - avg_ears).max())
+        same = np.allclose(np.array(noses), batch_noses, rtol=0, atol=0) and \
+            [g for g, _ in gestures] == thumbs.tolist() and [x for _, x in gestures] == wrist_xs.tolist()
+        print(f"{name:>9} {old_us:14.1f} {new_us:11.1f} {old_us / new_us:7.2f}x {ear_diff:13.2e} {str(same):>5}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import time
+
+import numpy as np
+import overlay
+from sprite_cache import SpriteCache
+
+# Sprite sizes the game draws: ship, shield, ammo, winner banner, buttons, menu title
+SPRITE_SIZES = {
+    "player": (100, 100),
+    "shield": (130, 130),
+    "ammo": (80, 80),
+    "winner": (199, 29),
+    "button": (63, 63),
+    "title": (512, 384),
+}
+FRAME_SIZES = [(640, 480), (1280, 720)]
+REPEATS = 2000
+
+def make_sprite_source(seed=0):
+    # Soft-edged disc so the alpha plane has opaque, transparent and partial pixels
+    rng = np.random.default_rng(seed)
+    image = rng.integers(0, 256, (128, 128, 4), dtype=np.uint8)
+    yy, xx = np.mgrid[:128, :128]
+    dist = np.hypot(xx - 63.5, yy - 63.5)
+    image[:, :, 3] = np.clip((64 - dist) * 16, 0, 255).astype(np.uint8)
+    return image
+
+def time_blend(func, frame, sprite, x, y, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        func(frame, sprite, x, y)
+    return (time.perf_counter() - start) / repeats * 1e6
+
+def main():
+    cache = SpriteCache()
+    cache.register("sprite", make_sprite_source())
+    rng = np.random.default_rng(1)
+
+    print(f"{'frame':>10} {'sprite':>8} {'size':>9} {'float us':>9} {'int us':>9} {'speedup':>8} {'max diff':>8}")
+    for frame_w, frame_h in FRAME_SIZES:
+        frame = rng.integers(0, 256, (frame_h, frame_w, 3), dtype=np.uint8)
+        for name, size in SPRITE_SIZES.items():
+            sprite = cache.get("sprite", size)
+            x = (frame_w - sprite.width) // 2
+            y = (frame_h - sprite.height) // 2
+
+            float_us = time_blend(overlay.overlay_sprite_float, frame.copy(), sprite, x, y, REPEATS)
+            int_us = time_blend(overlay.overlay_premultiplied, frame.copy(), sprite, x, y, REPEATS)
+
+            # Compare a single blend of each path on the same input
+            expected = overlay.overlay_sprite_float(frame.copy(), sprite, x, y)
+            actual = overlay.overlay_premultiplied(frame.copy(), sprite, x, y)
+            max_diff = int(np.abs(expected.astype(np.int16) - actual).max())
+
+            print(f"{frame_w}x{frame_h:<5} {name:>8} {size[0]:>4}x{size[1]:<4} {float_us:9.1f} {int_us:9.1f} {float_us / int_us:7.2f}x {max_diff:8d}")
+
+if __name__ == "__main__":
+    main()
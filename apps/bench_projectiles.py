@@ -0,0 +1,67 @@
+import time
+
+import numpy as np
+from projectiles import ProjectileStore
+
+FRAME_W, FRAME_H = 640, 480
+PLAYER_BOXES = np.array([(60, 190, 100, 100), (480, 190, 100, 100)], dtype=np.int32)
+LIVE_COUNTS = [50, 200, 500, 1000]
+FRAMES = 500
+SPEED = 15
+
+def spawn_args(rng, count):
+    owners = rng.integers(0, 2, count)
+    xs = rng.integers(0, FRAME_W, count)
+    ys = rng.integers(0, FRAME_H, count)
+    return list(zip(xs.tolist(), ys.tolist(), owners.tolist()))
+
+def run_dicts(shots):
+    # The per-item loops main.py used before ProjectileStore
+    projectiles = [{'x': x, 'y': y, 'w': 80, 'h': 80, 'player': f"Player {owner + 1}"} for x, y, owner in shots]
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        new_projectiles = []
+        for proj in projectiles:
+            proj['x'] += SPEED if proj['player'] == "Player 1" else -SPEED
+            if 0 <= proj['x'] + proj['w'] and proj['x'] <= FRAME_W:
+                new_projectiles.append(proj)
+        projectiles = new_projectiles
+        for i in range(len(projectiles) - 1, -1, -1):
+            proj = projectiles[i]
+            for idx, (px, py, pw, ph) in enumerate(PLAYER_BOXES.tolist()):
+                if (proj['x'] < px + pw and proj['x'] + proj['w'] > px and
+                        proj['y'] < py + ph and proj['y'] + proj['h'] > py):
+                    if proj['player'] != f"Player {idx + 1}":
+                        projectiles.pop(i)
+                        break
+        # Keep the population constant so every frame does the same work
+        while len(projectiles) < len(shots):
+            x, y, owner = shots[len(projectiles)]
+            projectiles.append({'x': x, 'y': y, 'w': 80, 'h': 80, 'player': f"Player {owner + 1}"})
+    return (time.perf_counter() - start) / FRAMES * 1e6
+
+def run_store(shots):
+    store = ProjectileStore(len(shots))
+    for x, y, owner in shots:
+        store.spawn(x, y, 80, 80, owner, 0)
+    present = [True, True]
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        store.step(SPEED, FRAME_W)
+        store.collide(PLAYER_BOXES, present)
+        missing = len(shots) - len(store)
+        for x, y, owner in shots[:missing]:
+            store.spawn(x, y, 80, 80, owner, 0)
+    return (time.perf_counter() - start) / FRAMES * 1e6
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{'live':>6} {'dict us/frame':>14} {'store us/frame':>15} {'speedup':>8}")
+    for count in LIVE_COUNTS:
+        shots = spawn_args(rng, count)
+        dict_us = run_dicts(shots)
+        store_us = run_store(shots)
+        print(f"{count:6d} {dict_us:14.1f} {store_us:15.1f} {dict_us / store_us:7.2f}x")
+
+if __name__ == "__main__":
+    main()
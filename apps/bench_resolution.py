@@ -0,0 +1,114 @@
+import argparse
+import time
+
+import cv2
+import numpy as np
+from game_core import BLINK_THRESHOLD, OPEN_THRESHOLD
+from inference import InferenceStage, create_face_mesh, create_hands
+from main import (
+    LEFT_EYE_IDX,
+    NOSE_IDX,
+    RESIZED_FRAME_DIMENSIONS,
+    RIGHT_EYE_IDX,
+    SCREEN_CENTER_X,
+    parse_size,
+)
+from utils import eye_aspect_ratio
+
+# (face size, hands size) pairs; the first one is the reference the others are scored against
+DEFAULT_SETTINGS = "640x480:640x480,640x480:320x240,480x360:320x240,320x240:320x240,320x240:160x120"
+MATCH_TOLERANCE_FRAMES = 2
+
+def parse_settings(text):
+    settings = []
+    for item in text.split(","):
+        face, hands = item.split(":")
+        settings.append((parse_size(face), parse_size(hands)))
+    return settings
+
+def run_setting(video_path, face_size, hands_size, max_frames):
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise IOError(f"Tidak dapat membuka video: {video_path}")
+    inference = InferenceStage(create_face_mesh(), create_hands(), face_size=face_size, hands_size=hands_size)
+
+    ears = []
+    blinks = [[], []]
+    ready = [False, False]
+    elapsed = 0.0
+    frame_idx = 0
+    while max_frames is None or frame_idx < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frame = cv2.flip(frame, 1)
+        if (frame.shape[1], frame.shape[0]) != RESIZED_FRAME_DIMENSIONS:
+            frame = cv2.resize(frame, RESIZED_FRAME_DIMENSIONS)
+        ih, iw = frame.shape[:2]
+
+        start = time.perf_counter()
+        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        result = inference.process(rgb_frame)
+        elapsed += time.perf_counter() - start
+
+        # Same player assignment and blink edge as main.main, without the cooldown
+        frame_ears = [np.nan, np.nan]
+        for face_landmarks in (result.face.multi_face_landmarks or [])[:2]:
+            nose = face_landmarks.landmark[NOSE_IDX]
+            player_id = 0 if nose.x * iw < SCREEN_CENTER_X else 1
+            if not np.isnan(frame_ears[player_id]):
+                continue
+            left_ear = eye_aspect_ratio(face_landmarks.landmark, LEFT_EYE_IDX, iw, ih)
+            right_ear = eye_aspect_ratio(face_landmarks.landmark, RIGHT_EYE_IDX, iw, ih)
+            avg_ear = (left_ear + right_ear) / 2.0
+            frame_ears[player_id] = avg_ear
+            if avg_ear > OPEN_THRESHOLD:
+                ready[player_id] = True
+            if avg_ear < BLINK_THRESHOLD and ready[player_id]:
+                blinks[player_id].append(frame_idx)
+                ready[player_id] = False
+        ears.append(frame_ears)
+        frame_idx += 1
+
+    inference.close()
+    cap.release()
+    fps = frame_idx / elapsed if elapsed else 0.0
+    return fps, np.array(ears, dtype=np.float64).reshape(-1, 2), blinks
+
+def match_blinks(reference, candidate):
+    matched = 0
+    used = set()
+    for ref_frame in reference:
+        for i, frame in enumerate(candidate):
+            if i not in used and abs(frame - ref_frame) <= MATCH_TOLERANCE_FRAMES:
+                used.add(i)
+                matched += 1
+                break
+    return matched
+
+def main():
+    parser = argparse.ArgumentParser(description="Frame rate vs. blink detection across inference resolutions")
+    parser.add_argument("video", help="recorded session with both players in view")
+    parser.add_argument("--settings", type=parse_settings, default=parse_settings(DEFAULT_SETTINGS),
+                        help="comma separated FACExHANDS pairs, e.g. 640x480:320x240")
+    parser.add_argument("--max-frames", type=int, default=None)
+    args = parser.parse_args()
+
+    results = [(face, hands) + run_setting(args.video, face, hands, args.max_frames) for face, hands in args.settings]
+    _, _, _, ref_ears, ref_blinks = results[0]
+    ref_total = sum(len(b) for b in ref_blinks)
+
+    print(f"{'face':>9} {'hands':>9} {'fps':>7} {'blinks':>7} {'recall':>7} {'precision':>9} {'EAR err':>8}")
+    for face, hands, fps, ears, blinks in results:
+        total = sum(len(b) for b in blinks)
+        matched = sum(match_blinks(ref_blinks[p], blinks[p]) for p in range(2))
+        recall = matched / ref_total if ref_total else 1.0
+        precision = matched / total if total else 1.0
+        frames = min(len(ears), len(ref_ears))
+        ear_diff = np.abs(ears[:frames] - ref_ears[:frames])
+        ear_diff = ear_diff[np.isfinite(ear_diff)]
+        ear_err = ear_diff.mean() if ear_diff.size else float("nan")
+        print(f"{face[0]:>4}x{face[1]:<4} {hands[0]:>4}x{hands[1]:<4} {fps:7.1f} {total:7d} {recall:7.2f} {precision:9.2f} {ear_err:8.4f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+import glob
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+class CameraStream:
+    # Reads the camera on its own thread and keeps only the newest frame,
+    # so slow inference in the game loop never backs up stale frames.
+    def __init__(self, src=0, size=None):
+        self.cap = cv2.VideoCapture(src)
+        if not self.cap.isOpened():
+            raise IOError("Tidak dapat membuka kamera.")
+        if size is not None:
+            # Ask the driver for the display size so the game loop can skip its resize
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, size[0])
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, size[1])
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        self._cond = threading.Condition()
+        self._frame = None
+        self._frame_time = 0.0
+        # Monotonic time the frame last returned by read() came off the driver
+        self.last_capture_time = 0.0
+        self._seq = 0
+        self._read_seq = 0
+        self._ended = False
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._running = True
+            self._thread = threading.Thread(target=self._update, name="CameraStream", daemon=True)
+            self._thread.start()
+        return self
+
+    def _update(self):
+        while self._running:
+            ret, frame = self.cap.read()
+            with self._cond:
+                if not ret:
+                    break
+                # The previous frame was never handed out, so it is dropped
+                if self._seq != self._read_seq:
+                    self.frames_dropped += 1
+                self._frame = frame
+                self._frame_time = time.monotonic()
+                self._seq += 1
+                self.frames_captured += 1
+                self._cond.notify_all()
+        # A reader waiting for a frame returns end of stream only now that none can come
+        with self._cond:
+            self._ended = True
+            self._cond.notify_all()
+
+    def read(self, timeout=None):
+        # Blocks until a frame newer than the last one returned is available, however slow
+        # the camera is; (False, None) means the capture thread has ended. A caller that
+        # passes a timeout also gets (False, None) when it runs out.
+        # The array is handed over as-is; the capture thread never writes to it again.
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq != self._read_seq or self._ended, timeout)
+            if self._seq == self._read_seq:
+                return False, None
+            self._read_seq = self._seq
+            self.last_capture_time = self._frame_time
+            return True, self._frame
+
+    def stats(self):
+        with self._cond:
+            return {"captured": self.frames_captured, "dropped": self.frames_dropped}
+
+    def release(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        self.cap.release()
+
+class VideoFileSource:
+    # Reads a video file frame by frame on the caller's thread. Nothing is dropped,
+    # so a headless run processes every frame as fast as the pipeline allows.
+    def __init__(self, path, loop=False):
+        self.path = path
+        self.loop = loop
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise IOError(f"Tidak dapat membuka video: {path}")
+        self.frames_captured = 0
+        self.last_capture_time = 0.0
+
+    def start(self):
+        return self
+
+    def read(self, timeout=None):
+        ret, frame = self.cap.read()
+        if not ret and self.loop and self.frames_captured:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read()
+        if not ret:
+            return False, None
+        self.frames_captured += 1
+        self.last_capture_time = time.monotonic()
+        return True, frame
+
+    def stats(self):
+        return {"captured": self.frames_captured, "dropped": 0}
+
+    def release(self):
+        self.cap.release()
+
+class ImageSequenceSource:
+    # Frames from a directory or glob of images, in file name order
+    def __init__(self, pattern, loop=False):
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, "*")
+        self.paths = sorted(p for p in glob.glob(pattern) if p.lower().endswith(IMAGE_EXTENSIONS))
+        if not self.paths:
+            raise IOError(f"Tidak ada gambar ditemukan: {pattern}")
+        self.loop = loop
+        self.frames_captured = 0
+        self._index = 0
+        self.last_capture_time = 0.0
+
+    def start(self):
+        return self
+
+    def read(self, timeout=None):
+        if self._index >= len(self.paths):
+            if not self.loop:
+                return False, None
+            self._index = 0
+        frame = cv2.imread(self.paths[self._index], cv2.IMREAD_COLOR)
+        self._index += 1
+        if frame is None:
+            raise IOError(f"Gambar tidak dapat dibaca: {self.paths[self._index - 1]}")
+        self.frames_captured += 1
+        self.last_capture_time = time.monotonic()
+        return True, frame
+
+    def stats(self):
+        return {"captured": self.frames_captured, "dropped": 0}
+
+    def release(self):
+        pass
+
+class SyntheticSource:
+    # Generated frames for runs without any input media: a small pool of noisy
+    # gradients is built once and cycled, so producing a frame costs nothing.
+    # Frames are shared; like the camera stream, callers must not write into them.
+    def __init__(self, size=(640, 480), frames=None, pool=8, seed=0):
+        w, h = size
+        rng = np.random.default_rng(seed)
+        gradient = np.linspace(0, 160, w, dtype=np.float32)[None, :, None]
+        self._pool = []
+        for i in range(pool):
+            noise = rng.normal(0, 12, (h, w, 3)).astype(np.float32)
+            frame = np.clip(gradient + noise + i * 8, 0, 255).astype(np.uint8)
+            self._pool.append(frame)
+        self.max_frames = frames
+        self.frames_captured = 0
+        self.last_capture_time = 0.0
+
+    def start(self):
+        return self
+
+    def read(self, timeout=None):
+        if self.max_frames is not None and self.frames_captured >= self.max_frames:
+            return False, None
+        frame = self._pool[self.frames_captured % len(self._pool)]
+        self.frames_captured += 1
+        self.last_capture_time = time.monotonic()
+        return True, frame
+
+    def stats(self):
+        return {"captured": self.frames_captured, "dropped": 0}
+
+    def release(self):
+        pass
+
+def open_source(spec, size=None, loop=False, frames=None):
+    # "camera" or "camera:N", "synthetic", a directory or glob of images, or a video file
+    if spec == "camera":
+        return CameraStream(0, size=size)
+    if spec.startswith("camera:"):
+        return CameraStream(int(spec[len("camera:"):]), size=size)
+    if spec.isdigit():
+        return CameraStream(int(spec), size=size)
+    if spec == "synthetic":
+        return SyntheticSource(size or (640, 480), frames=frames)
+    if os.path.isdir(spec) or any(c in spec for c in "*?["):
+        return ImageSequenceSource(spec, loop=loop)
+    return VideoFileSource(spec, loop=loop)
@@ -0,0 +1,161 @@
+import cv2
+import numpy as np
+from overlay import blend, blend_premultiplied
+
+# Height of the horizontal bands cached layers are cut into
+LAYER_BAND = 16
+# Two pieces are kept as their bounding box when it is at most this much bigger
+# than the pieces themselves; fewer, larger blends beat many small ones
+MERGE_SLACK = 1.3
+
+class Layer:
+    # Premultiplied planes cropped to the drawn content, laid out like Sprite's;
+    # x, y is the crop's offset in the canvas it was rendered on
+    __slots__ = ("premul", "inv_alpha", "x", "y", "width", "height")
+
+    def __init__(self, premul, inv_alpha, x, y):
+        self.premul = premul
+        self.inv_alpha = inv_alpha
+        self.x = x
+        self.y = y
+        self.height, self.width = premul.shape[:2]
+
+def _over(dst_premul, dst_inv, src_premul, src_inv):
+    # Porter-Duff "over" in premultiplied space, in place: src drawn on top of dst
+    blend_premultiplied(dst_premul, src_premul, src_inv)
+    cv2.multiply(dst_inv, src_inv, dst=dst_inv, scale=1.0 / 255.0)
+
+def _area(rect):
+    return (rect[2] - rect[0]) * (rect[3] - rect[1])
+
+def paint(canvas, sprite, x, y):
+    # Draws a sprite onto a BGRA canvas holding premultiplied colour, for static layers
+    h, w = canvas.shape[:2]
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + sprite.width, w), min(y + sprite.height, h)
+    if x0 >= x1 or y0 >= y1:
+        return canvas
+    sx, sy = x0 - x, y0 - y
+    src_inv = sprite.inv_alpha[sy:sy + y1 - y0, sx:sx + x1 - x0]
+    roi = canvas[y0:y1, x0:x1]
+    premul = np.ascontiguousarray(roi[:, :, :3])
+    inv = np.repeat(255 - roi[:, :, 3:], 3, axis=2)
+    _over(premul, inv, sprite.premul[sy:sy + y1 - y0, sx:sx + x1 - x0], src_inv)
+    roi[:, :, :3] = premul
+    roi[:, :, 3] = 255 - inv[:, :, 0]
+    return canvas
+
+def render_layer(size, draw):
+    # draw(canvas) paints on a transparent BGRA canvas. cv2 drawing calls with colour
+    # (b, g, r, 255) leave premultiplied colour, anti-aliased edges included. The result
+    # is a list of pieces cut from LAYER_BAND-row bands cropped to their drawn content,
+    # with neighbouring bands joined where little is wasted, so sparse layers like text
+    # skip most of their empty space.
+    w, h = size
+    canvas = np.zeros((h, w, 4), dtype=np.uint8)
+    draw(canvas)
+    rects = []
+    for band_y in range(0, h, LAYER_BAND):
+        x, y, bw, bh = cv2.boundingRect(canvas[band_y:band_y + LAYER_BAND, :, 3])
+        if not (bw and bh):
+            continue
+        rect = (x, band_y + y, x + bw, band_y + y + bh)
+        if rects:
+            # Grow the previous piece instead when the combined box wastes little area
+            prev = rects[-1]
+            union = (min(rect[0], prev[0]), prev[1], max(rect[2], prev[2]), rect[3])
+            if _area(union) <= (_area(rect) + _area(prev)) * MERGE_SLACK:
+                rects[-1] = union
+                continue
+        rects.append(rect)
+    pieces = []
+    for x0, y0, x1, y1 in rects:
+        crop = canvas[y0:y1, x0:x1]
+        inv_alpha = np.repeat(255 - crop[:, :, 3:], 3, axis=2)
+        pieces.append(Layer(np.ascontiguousarray(crop[:, :, :3]), inv_alpha, x0, y0))
+    return pieces
+
+class Compositor:
+    # Collects everything drawn over the camera frame during a frame: sprites (add),
+    # solid boxes (add_rect) and cached static layers (add_static), which go on top.
+    # compose() then blends the whole list onto the frame in one pass, in drawing
+    # order, straight from the cached premultiplied planes, with the selected blend mode.
+    def __init__(self, frame_size):
+        self.frame_w, self.frame_h = frame_size
+        self._items = []
+        self._static = []
+        self._layers = {}
+        self.layer_builds = 0
+
+    def cached_layer(self, name, key, draw, size=None):
+        # Pieces rendered again only when key changes; one entry is kept per name
+        entry = self._layers.get(name)
+        if entry is None or entry[0] != key:
+            pieces = render_layer(size or (self.frame_w, self.frame_h), draw)
+            self.layer_builds += 1
+            self._layers[name] = (key, pieces)
+            return pieces
+        return entry[1]
+
+    def add_static(self, name, key, draw):
+        self._static.extend(self.cached_layer(name, key, draw))
+
+    def _clip(self, x, y, w, h):
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, self.frame_w), min(y + h, self.frame_h)
+        if x0 >= x1 or y0 >= y1:
+            return None
+        return x0, y0, x1, y1
+
+    def add(self, sprite, x, y):
+        rect = self._clip(x, y, sprite.width, sprite.height)
+        if rect is None:
+            return
+        x0, y0, x1, y1 = rect
+        sx, sy = x0 - x, y0 - y
+        self._items.append((rect, sprite.premul[sy:sy + y1 - y0, sx:sx + x1 - x0],
+                            sprite.inv_alpha[sy:sy + y1 - y0, sx:sx + x1 - x0]))
+
+    def add_rect(self, x, y, w, h, color):
+        rect = self._clip(x, y, w, h)
+        if rect is not None:
+            self._items.append((rect, color, None))
+
+    def compose(self, frame):
+        for (x0, y0, x1, y1), premul, inv_alpha in self._items:
+            if inv_alpha is None:
+                frame[y0:y1, x0:x1] = premul
+            else:
+                blend(frame[y0:y1, x0:x1], premul, inv_alpha)
+        for piece in self._static:
+            blend(frame[piece.y:piece.y + piece.height, piece.x:piece.x + piece.width],
+                  piece.premul, piece.inv_alpha)
+        self._items.clear()
+        self._static.clear()
+        return frame
+
+# Where the bar sits inside its cached layer, leaving room for the outline and label
+HEALTHBAR_ORIGIN = (2, 20)
+
+def draw_healthbar_frame(canvas, player_id, w, h, bg_color=(0, 0, 0)):
+    # The parts of the health bar that do not depend on health: its outline and the
+    # player label above it, with the bar's top-left corner at HEALTHBAR_ORIGIN
+    ox, oy = HEALTHBAR_ORIGIN
+    cv2.rectangle(canvas, (ox, oy), (ox + w, oy + h), bg_color + (255,), 2)
+    cv2.putText(canvas, player_id, (ox, oy - 5), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255, 255), 1)
+    return canvas
+
+def add_healthbar(compositor, player_id, health, x, y, w=100, h=10, bg_color=(0, 0, 0), fg_color=(0, 255, 0)):
+    # The outline and label come from a cached layer; only the fill, w * health / 100
+    # pixels wide, is drawn per frame
+    pieces = compositor.cached_layer(
+        "healthbar " + player_id, (w, h, bg_color),
+        lambda canvas: draw_healthbar_frame(canvas, player_id, w, h, bg_color),
+        size=(w + 120, h + HEALTHBAR_ORIGIN[1] + 4),
+    )
+    ox, oy = HEALTHBAR_ORIGIN
+    for piece in pieces:
+        compositor.add(piece, x - ox + piece.x, y - oy + piece.y)
+    fill_width = int((health / 100) * w)
+    # cv2.rectangle includes both corners, hence the + 1
+    compositor.add_rect(x, y, fill_width + 1, h + 1, fg_color)
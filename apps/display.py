@@ -0,0 +1,168 @@
+import math
+import threading
+
+import cv2
+import numpy as np
+
+class WindowDisplay:
+    # An OpenCV window; show() returns the key pressed, like cv2.waitKey(1) & 0xFF
+    interactive = True
+
+    def __init__(self, name="EVADER"):
+        self.name = name
+        self.frames_shown = 0
+
+    def open(self, mouse_callback=None):
+        cv2.namedWindow(self.name)
+        if mouse_callback is not None:
+            cv2.setMouseCallback(self.name, mouse_callback)
+
+    def show(self, frame):
+        cv2.imshow(self.name, frame)
+        self.frames_shown += 1
+        return cv2.waitKey(1) & 0xFF
+
+    def close(self):
+        cv2.destroyAllWindows()
+
+class NullDisplay:
+    # Discards every frame, for headless benchmark runs
+    interactive = False
+
+    def __init__(self):
+        self.frames_shown = 0
+
+    def open(self, mouse_callback=None):
+        pass
+
+    def show(self, frame):
+        self.frames_shown += 1
+        return 0xFF
+
+    def close(self):
+        pass
+
+class OffscreenDisplay:
+    # Keeps the last composited frame and, given a path, writes every frame to a video
+    interactive = False
+
+    def __init__(self, path=None, fps=30.0):
+        self.path = path
+        self.fps = fps
+        self.frames_shown = 0
+        self.last_frame = None
+        self._writer = None
+
+    def open(self, mouse_callback=None):
+        pass
+
+    def show(self, frame):
+        if self.path is not None:
+            if self._writer is None:
+                h, w = frame.shape[:2]
+                self._writer = cv2.VideoWriter(self.path, cv2.VideoWriter_fourcc(*"mp4v"), self.fps, (w, h))
+                if not self._writer.isOpened():
+                    raise IOError(f"Tidak dapat menulis video: {self.path}")
+            self._writer.write(frame)
+        self.last_frame = frame
+        self.frames_shown += 1
+        return 0xFF
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.release()
+            self._writer = None
+
+class MosaicWindow:
+    # One OpenCV window showing several arenas side by side. Arena threads only store
+    # their latest frame in a tile; pump() draws and polls keys on the thread that owns
+    # the window, since OpenCV's GUI calls are not safe from several threads.
+    def __init__(self, count, tile_size, name="EVADER"):
+        self.name = name
+        self.tile_size = tile_size
+        self.cols = math.ceil(math.sqrt(count))
+        self.rows = math.ceil(count / self.cols)
+        tile_w, tile_h = tile_size
+        self._canvas = np.zeros((self.rows * tile_h, self.cols * tile_w, 3), dtype=np.uint8)
+        self._frames = [None] * count
+        self._lock = threading.Lock()
+        self.last_key = 0xFF
+        self.tiles = [MosaicTile(self, i) for i in range(count)]
+        cv2.namedWindow(self.name)
+        cv2.setMouseCallback(self.name, self._on_mouse)
+
+    def tile(self, index):
+        return self.tiles[index]
+
+    def put(self, index, frame):
+        with self._lock:
+            self._frames[index] = frame
+        return self.last_key
+
+    def pump(self, wait_ms=1):
+        tile_w, tile_h = self.tile_size
+        with self._lock:
+            frames = list(self._frames)
+        for i, frame in enumerate(frames):
+            if frame is None:
+                continue
+            if frame.shape[1::-1] != (tile_w, tile_h):
+                frame = cv2.resize(frame, (tile_w, tile_h), interpolation=cv2.INTER_AREA)
+            row, col = divmod(i, self.cols)
+            self._canvas[row * tile_h:(row + 1) * tile_h, col * tile_w:(col + 1) * tile_w] = frame
+        cv2.imshow(self.name, self._canvas)
+        key = cv2.waitKey(wait_ms) & 0xFF
+        # Only ESC means anything to an arena; it is kept so every arena sees it on its next frame
+        if key == 27:
+            self.last_key = key
+        return key
+
+    def _on_mouse(self, event, x, y, flags, param):
+        # Runs inside pump(); the click goes to the tile under the cursor, in that
+        # arena's own frame coordinates
+        tile_w, tile_h = self.tile_size
+        col, row = x // tile_w, y // tile_h
+        index = row * self.cols + col
+        if col >= self.cols or index >= len(self.tiles):
+            return
+        tile = self.tiles[index]
+        if tile.mouse_callback is None:
+            return
+        frame_w, frame_h = tile.frame_size or self.tile_size
+        tile_x = (x - col * tile_w) * frame_w // tile_w
+        tile_y = (y - row * tile_h) * frame_h // tile_h
+        tile.mouse_callback(event, tile_x, tile_y, flags, param)
+
+    def close(self):
+        cv2.destroyWindow(self.name)
+
+class MosaicTile:
+    # The display one arena draws to; MosaicWindow hands it the clicks that land on it
+    interactive = True
+
+    def __init__(self, mosaic, index):
+        self.mosaic = mosaic
+        self.index = index
+        self.frames_shown = 0
+        self.mouse_callback = None
+        # (w, h) of the arena's frames, which the tile may be scaled from
+        self.frame_size = None
+
+    def open(self, mouse_callback=None):
+        self.mouse_callback = mouse_callback
+
+    def show(self, frame):
+        self.frames_shown += 1
+        self.frame_size = frame.shape[1::-1]
+        # The frame is reused by the arena's next compose, so the tile keeps a copy
+        return self.mosaic.put(self.index, frame.copy())
+
+    def close(self):
+        pass
+
+def create_display(kind, path=None):
+    if kind == "window":
+        return WindowDisplay()
+    if kind == "offscreen":
+        return OffscreenDisplay(path)
+    return NullDisplay()
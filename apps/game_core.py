@@ -0,0 +1,197 @@
+import numpy as np
+from projectiles import ProjectileStore
+from scheduler import TimerScheduler
+
+# Game States
+GAME_STATE_PLAYING = 0
+GAME_STATE_WINNER = 1
+
+# Thresholds and cooldowns
+BLINK_THRESHOLD = 0.15
+OPEN_THRESHOLD = 0.25
+BLINK_COOLDOWN = 1.0
+SHIELD_DURATION = 3.0
+SHIELD_COOLDOWN = 5.0
+# The shield starts cracking this long before it drops, as a warning
+SHIELD_CRACK_WARNING = 0.5
+
+MAX_PROJECTILES = 50
+# Pixels per second (the old 15 px per frame at a 30 FPS camera)
+PROJECTILE_SPEED = 450.0
+START_HEALTH = 100
+HIT_DAMAGE = 10
+
+class Shield:
+    __slots__ = ("active", "ready")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.active = False
+        # Cleared while the shield is up and during its cooldown after it drops
+        self.ready = True
+
+class Player:
+    __slots__ = ("idx", "w", "h", "x", "y", "present", "health", "shield",
+                 "blink_ready", "eye_ready", "ammo_w", "ammo_h", "ammo_sprite_id")
+
+    def __init__(self, idx, size, ammo_size, ammo_sprite_id):
+        self.idx = idx
+        self.w, self.h = size
+        self.ammo_w, self.ammo_h = ammo_size
+        self.ammo_sprite_id = ammo_sprite_id
+        self.shield = Shield()
+        self.reset()
+
+    def reset(self):
+        self.x = 0
+        self.y = 0
+        self.present = False
+        self.health = START_HEALTH
+        self.shield.reset()
+        # Cleared for BLINK_COOLDOWN seconds after each shot
+        self.blink_ready = True
+        # Set once the eyes have been seen open, so holding them shut fires only once
+        self.eye_ready = False
+
+    def place(self, nose_x, nose_y, frame_w, frame_h):
+        # Adjust X position for better placement
+        if self.idx == 0:  # Player 1 (left)
+            self.x = int(nose_x * frame_w) - int(self.w * 0.7)
+        else:  # Player 2 (right)
+            self.x = int(nose_x * frame_w) - int(self.w * 0.3)
+        self.y = int(nose_y * frame_h) - self.h // 2
+        self.present = True
+
+class GameCore:
+    # Render-free gameplay: players, shields and projectiles advanced by step(inputs, dt).
+    # Inputs are InputEvents with kind "nose" (normalized x, y), "ear" (measured eye
+    # aspect ratio) or "gesture" ("thumbs_up"). Timers run on the core's own clock, so a
+    # run is fully determined by its input stream and step sizes.
+    def __init__(self, frame_size=(640, 480), player_sizes=((100, 100), (100, 100)),
+                 ammo_sizes=((80, 80), (80, 80)), ammo_sprite_ids=(0, 0), capacity=MAX_PROJECTILES):
+        self.frame_w, self.frame_h = frame_size
+        self.players = [Player(idx, player_sizes[idx], ammo_sizes[idx], ammo_sprite_ids[idx]) for idx in (0, 1)]
+        self.projectiles = ProjectileStore(capacity)
+        self.timers = TimerScheduler(self)
+        self._boxes = np.zeros((2, 4), dtype=np.float32)
+        self.reset()
+
+    def now(self):
+        return self.time
+
+    def reset(self):
+        self.time = 0.0
+        self.state = GAME_STATE_PLAYING
+        self.winner = None
+        self.shots_fired = 0
+        self.hits = 0
+        # (kind, player, cause) for every projectile fired and shield raised, where cause
+        # is the input event that triggered it; the frame loop drains this for latency
+        self.effects = []
+        # (kind, player, x, y) for the renderer: "hit" and "shield_hit" at the impact point,
+        # "shield_cracking", "shield_down" and "defeated" at the player; the frame loop drains this
+        self.events = []
+        self.timers.cancel_all()
+        self.projectiles.clear()
+        for player in self.players:
+            player.reset()
+
+    def shield_available(self, idx):
+        # A thumbs-up can only do something while the shield is down and off cooldown
+        return self.players[idx].shield.ready
+
+    def activate_shield(self, idx, cause=None):
+        shield = self.players[idx].shield
+        if shield.ready:
+            shield.active = True
+            shield.ready = False
+            self.effects.append(("shield", idx, cause))
+            self.timers.call_later(SHIELD_DURATION - SHIELD_CRACK_WARNING, self._player_event, "shield_cracking", idx)
+            self.timers.call_later(SHIELD_DURATION, self._deactivate_shield, idx)
+
+    def _deactivate_shield(self, idx):
+        self.players[idx].shield.active = False
+        self._player_event("shield_down", idx)
+        self.timers.call_later(SHIELD_COOLDOWN, self._end_shield_cooldown, idx)
+
+    def _end_shield_cooldown(self, idx):
+        self.players[idx].shield.ready = True
+
+    def _player_event(self, kind, idx):
+        player = self.players[idx]
+        self.events.append((kind, idx, player.x + player.w // 2, player.y + player.h // 2))
+
+    def _end_blink_cooldown(self, idx):
+        self.players[idx].blink_ready = True
+
+    def apply(self, event):
+        player = self.players[event.player]
+        if event.kind == "nose":
+            player.place(event.value[0], event.value[1], self.frame_w, self.frame_h)
+        elif event.kind == "ear":
+            if event.value > OPEN_THRESHOLD:
+                player.eye_ready = True
+            if event.value < BLINK_THRESHOLD and player.eye_ready and player.blink_ready and player.present:
+                self.fire(player, event)
+        elif event.kind == "gesture":
+            if event.value == "thumbs_up":
+                self.activate_shield(event.player, event)
+
+    def fire(self, player, cause=None):
+        # Position the projectile at the tip of the spaceship
+        if player.idx == 0:
+            start_x = player.x + player.w - (player.ammo_w // 2)
+        else:  # Player 2 shooting to the left
+            start_x = player.x - (player.ammo_w // 2)
+        start_y = player.y + player.h // 2 - (player.ammo_h // 2)
+
+        self.projectiles.spawn(start_x, start_y, player.ammo_w, player.ammo_h, player.idx, player.ammo_sprite_id)
+        self.shots_fired += 1
+        self.effects.append(("projectile", player.idx, cause))
+        player.blink_ready = False
+        player.eye_ready = False
+        self.timers.call_later(BLINK_COOLDOWN, self._end_blink_cooldown, player.idx)
+
+    def step(self, inputs, dt):
+        # Returns False once the round is over
+        if self.state != GAME_STATE_PLAYING:
+            return False
+        self.time += dt
+        self.timers.run_due(self.time)
+        for event in inputs:
+            self.apply(event)
+
+        projectiles = self.projectiles
+        if not projectiles.alive.any():
+            return True
+        projectiles.step(PROJECTILE_SPEED * dt, self.frame_w)
+
+        # Detect collisions for all projectiles at once
+        boxes = self._boxes
+        for player in self.players:
+            boxes[player.idx] = (player.x, player.y, player.w, player.h)
+        present = (self.players[0].present, self.players[1].present)
+        hit_players, hit_slots = projectiles.collide(boxes, present)
+        for idx, slot in zip(hit_players, hit_slots):
+            player = self.players[idx]
+            self.hits += 1
+            impact_x = int(projectiles.x[slot]) + (int(projectiles.w[slot]) if idx == 1 else 0)
+            impact_y = int(projectiles.y[slot]) + int(projectiles.h[slot]) // 2
+            # A shielded player absorbs the shot without losing health
+            if player.shield.active:
+                self.events.append(("shield_hit", int(idx), impact_x, impact_y))
+            else:
+                player.health -= HIT_DAMAGE
+                self.events.append(("hit", int(idx), impact_x, impact_y))
+
+        if self.players[0].health <= 0:
+            self.state = GAME_STATE_WINNER
+            self.winner = 1
+        elif self.players[1].health <= 0:
+            self.state = GAME_STATE_WINNER
+            self.winner = 0
+        if self.state == GAME_STATE_WINNER:
+            self._player_event("defeated", 1 - self.winner)
+        return self.state == GAME_STATE_PLAYING
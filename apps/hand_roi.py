@@ -0,0 +1,117 @@
+import cv2
+import numpy as np
+from landmarks import PackedLandmarks, PackedResult, landmarks_to_array
+from inference import resize_for_inference
+
+WRIST_IDX = 0
+
+def player_for_wrist(wrist_x):
+    # Left half of the frame is player 1, right half player 2
+    return 0 if wrist_x < 0.5 else 1
+
+class HandPipeline:
+    # Drop-in for a Hands model. Full-frame detection only runs every
+    # `full_interval` calls, or right after a tracked hand is lost; in between each
+    # player's hand is tracked by its own single-hand model inside a crop around it.
+    # A player with no hand in view is only searched for by the periodic full pass.
+    # Players whose gate is closed (shield active or cooling down) are skipped entirely.
+    # Each hand is returned with the player it was found for, so a tracked hand stays
+    # with its player even when it drifts across the middle of the frame.
+    def __init__(self, full_model, roi_models, full_size=None, full_interval=5, roi_margin=1.0, min_roi=96):
+        self.full_model = full_model
+        self.roi_models = roi_models
+        self.full_size = full_size
+        self.interpolation = cv2.INTER_AREA
+        self.full_interval = full_interval
+        self.roi_margin = roi_margin
+        self.min_roi = min_roi
+        self.gate = [True, True]
+        self.full_runs = 0
+        self.roi_runs = 0
+        self._rois = [None, None]
+        self._calls_since_full = full_interval
+        self._reacquire = False
+
+    def set_gate(self, gate):
+        for player_idx, enabled in enumerate(gate):
+            if not enabled:
+                self._rois[player_idx] = None
+            elif not self.gate[player_idx]:
+                # Re-acquire with a full-frame pass once the player can use a gesture again
+                self._reacquire = True
+            self.gate[player_idx] = enabled
+
+    def process(self, rgb_frame):
+        wanted = [idx for idx in (0, 1) if self.gate[idx]]
+        if not wanted:
+            return PackedResult(multi_hand_landmarks=None)
+
+        self._calls_since_full += 1
+        if self._reacquire or self._calls_since_full >= self.full_interval:
+            hands = self._process_full(rgb_frame, wanted)
+        else:
+            hands = self._process_rois(rgb_frame, wanted)
+        return PackedResult(multi_hand_landmarks=[PackedLandmarks(array) for _, array in hands] or None,
+                            hand_players=[player_idx for player_idx, _ in hands] or None)
+
+    def _process_full(self, rgb_frame, wanted):
+        self._calls_since_full = 0
+        self._reacquire = False
+        self.full_runs += 1
+        result = self.full_model.process(resize_for_inference(rgb_frame, self.full_size, self.interpolation))
+        hands = []
+        found = [False, False]
+        for hand_landmarks in result.multi_hand_landmarks or []:
+            array = landmarks_to_array(hand_landmarks)
+            player_idx = player_for_wrist(array[WRIST_IDX, 0])
+            if player_idx not in wanted or found[player_idx]:
+                continue
+            found[player_idx] = True
+            self._rois[player_idx] = self._roi_from(array, rgb_frame.shape)
+            hands.append((player_idx, array))
+        for player_idx in wanted:
+            if not found[player_idx]:
+                self._rois[player_idx] = None
+        return hands
+
+    def _process_rois(self, rgb_frame, wanted):
+        frame_h, frame_w = rgb_frame.shape[:2]
+        hands = []
+        for player_idx in wanted:
+            if self._rois[player_idx] is None:
+                continue
+            x0, y0, x1, y1 = self._rois[player_idx]
+            crop = np.ascontiguousarray(rgb_frame[y0:y1, x0:x1])
+            self.roi_runs += 1
+            result = self.roi_models[player_idx].process(crop)
+            if not result.multi_hand_landmarks:
+                # Lost inside the crop: the next call falls back to a full-frame pass
+                self._rois[player_idx] = None
+                self._reacquire = True
+                continue
+            array = landmarks_to_array(result.multi_hand_landmarks[0]).copy()
+            # Crop-normalized -> frame-normalized
+            crop_w, crop_h = x1 - x0, y1 - y0
+            array[:, 0] = (array[:, 0] * crop_w + x0) / frame_w
+            array[:, 1] = (array[:, 1] * crop_h + y0) / frame_h
+            array[:, 2] *= crop_w / frame_w
+            self._rois[player_idx] = self._roi_from(array, rgb_frame.shape)
+            hands.append((player_idx, array))
+        return hands
+
+    def _roi_from(self, array, frame_shape):
+        # Square crop around the hand's bounding box, padded by roi_margin on each side
+        frame_h, frame_w = frame_shape[:2]
+        xs = array[:, 0] * frame_w
+        ys = array[:, 1] * frame_h
+        cx, cy = (xs.min() + xs.max()) / 2.0, (ys.min() + ys.max()) / 2.0
+        side = max(xs.max() - xs.min(), ys.max() - ys.min()) * (1.0 + 2.0 * self.roi_margin)
+        side = int(min(max(side, self.min_roi), frame_w, frame_h))
+        x0 = int(min(max(cx - side / 2.0, 0), frame_w - side))
+        y0 = int(min(max(cy - side / 2.0, 0), frame_h - side))
+        return x0, y0, x0 + side, y0 + side
+
+    def close(self):
+        self.full_model.close()
+        for model in self.roi_models:
+            model.close()
@@ -0,0 +1,170 @@
+import argparse
+import threading
+import time
+
+import numpy as np
+from assets import asset_cache, prepare_sprites
+from capture import open_source
+from display import MosaicWindow, create_display
+from inference_pool import InferencePool
+from latency import LatencyTracker
+from sprite_cache import sprite_cache
+from main import (
+    FACE_DETECTION_INTERVAL,
+    FACE_INFERENCE_SIZE,
+    GAME_SPRITE_VARIANTS,
+    HANDS_DETECTION_INTERVAL,
+    HANDS_INFERENCE_SIZE,
+    RESIZED_FRAME_DIMENSIONS,
+    animation_atlas,
+    load_animations,
+    main,
+    parse_size,
+)
+
+# Several arenas, one per camera or video, in one process. Sprites, animations and
+# decoded assets are built once and shared; the models live in one InferencePool that
+# every arena submits its frames to.
+
+DEFAULT_WORKERS = 2
+
+class ArenaDisplay:
+    # Passes frames and clicks through to the arena's display and reports ESC once the
+    # host is stopping
+    def __init__(self, display, stop):
+        self.display = display
+        self.stop = stop
+        self.interactive = display.interactive
+
+    @property
+    def frames_shown(self):
+        return self.display.frames_shown
+
+    def open(self, mouse_callback=None):
+        self.display.open(mouse_callback)
+
+    def show(self, frame):
+        key = self.display.show(frame)
+        return 27 if self.stop.is_set() else key
+
+    def close(self):
+        self.display.close()
+
+class Arena:
+    def __init__(self, index, source, client, display):
+        self.index = index
+        self.source = source
+        self.client = client
+        self.display = display
+        self.latency = LatencyTracker()
+        self.result = None
+        self.error = None
+        self.thread = None
+
+    @property
+    def name(self):
+        return f"arena {self.index}"
+
+    def log(self, text):
+        for line in text.splitlines():
+            print(f"[{self.name}] {line}")
+
+    def run(self, args, stop):
+        stream = None
+        try:
+            stream = open_source(self.source, size=RESIZED_FRAME_DIMENSIONS, loop=args.loop,
+                                 frames=args.frames).start()
+            self.result = main(stream, self.client, ArenaDisplay(self.display, stop), args.face_interval,
+                               args.hands_interval, latency=self.latency, log=self.log)
+        except Exception as e:
+            self.error = e
+            self.log(f"Error: {e}")
+        finally:
+            if stream is not None:
+                stream.release()
+
+    def report(self):
+        # One row of the summary table
+        if self.result is None:
+            return f"{self.index:>5} {self.source[-24:]:>24}  {'failed' if self.error else 'no frames':>8}"
+        totals = self.latency.totals()
+        p50, p95 = np.percentile(totals, (50, 95)) if len(totals) else (float("nan"), float("nan"))
+        r = self.result
+        return (f"{self.index:>5} {self.source[-24:]:>24} {r['frames']:>8} {r['fps']:7.1f} {r['frame_ms']:9.1f} "
+                f"{r['queue_ms']:8.1f} {r['inference_ms']:9.1f} {p50:7.0f} {p95:7.0f}")
+
+def print_report(arenas, pool, elapsed):
+    print(f"{'arena':>5} {'source':>24} {'frames':>8} {'FPS':>7} {'frame ms':>9} {'queue ms':>8} "
+          f"{'infer ms':>9} {'p50 ms':>7} {'p95 ms':>7}")
+    for arena in arenas:
+        print(arena.report())
+    total_frames = sum(arena.result["frames"] for arena in arenas if arena.result is not None)
+    pool_stats = pool.stats()
+    print(f"Host: {len(arenas)} arenas, {total_frames} frames in {elapsed:.2f} s "
+          f"({total_frames / elapsed if elapsed else 0.0:.1f} FPS combined); "
+          f"{pool_stats['workers']} inference workers, {pool_stats['utilization'] * 100:.0f}% busy")
+
+def host():
+    parser = argparse.ArgumentParser(description="EVADER multi-arena host")
+    parser.add_argument("--source", action="append", required=True,
+                        help="camera index, video file or image directory for one arena; repeat for each arena")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="inference worker threads shared by all arenas, each with its own models")
+    parser.add_argument("--face-size", type=parse_size, default=FACE_INFERENCE_SIZE, metavar="WxH")
+    parser.add_argument("--hands-size", type=parse_size, default=HANDS_INFERENCE_SIZE, metavar="WxH")
+    parser.add_argument("--face-interval", type=int, default=FACE_DETECTION_INTERVAL)
+    parser.add_argument("--hands-interval", type=int, default=HANDS_DETECTION_INTERVAL)
+    parser.add_argument("--loop", action="store_true", help="restart video or image sources when they end")
+    parser.add_argument("--frames", type=int, default=None, help="number of frames a synthetic source produces")
+    parser.add_argument("--display", choices=("window", "null", "offscreen"), default="window",
+                        help="window shows every arena in one mosaic window")
+    parser.add_argument("--display-output", default=None, metavar="PREFIX",
+                        help="with --display offscreen, write arena N to PREFIX-N.mp4")
+    args = parser.parse_args()
+
+    asset_report = prepare_sprites(sprite_cache, GAME_SPRITE_VARIANTS)
+    animation_stats = load_animations(animation_atlas).stats()
+    asset_stats = asset_cache.stats()
+    print(f"Assets (shared): {asset_stats['hits']} images mapped from cache, {asset_stats['misses']} decoded; "
+          f"{asset_report['variants']} sprite variants, {animation_stats['frames']} animation frames, "
+          f"{(asset_report['bytes'] + animation_stats['bytes']) / 1024:.0f} KiB")
+
+    pool = InferencePool(args.workers, face_size=args.face_size, hands_size=args.hands_size)
+    frame_w, frame_h = RESIZED_FRAME_DIMENSIONS
+    pool.warm_up(np.zeros((frame_h, frame_w, 3), dtype=np.uint8))
+    mosaic = MosaicWindow(len(args.source), RESIZED_FRAME_DIMENSIONS) if args.display == "window" else None
+    arenas = []
+    for i, source in enumerate(args.source):
+        if mosaic is not None:
+            display = mosaic.tile(i)
+        else:
+            path = f"{args.display_output}-{i}.mp4" if args.display_output else None
+            display = create_display(args.display, path)
+        arenas.append(Arena(i, source, pool.client(f"arena {i}"), display))
+
+    stop = threading.Event()
+    start = time.perf_counter()
+    for arena in arenas:
+        arena.thread = threading.Thread(target=arena.run, args=(args, stop), name=arena.name, daemon=True)
+        arena.thread.start()
+    try:
+        while any(arena.thread.is_alive() for arena in arenas):
+            if mosaic is not None:
+                if mosaic.pump() == 27:
+                    stop.set()
+            else:
+                time.sleep(0.05)
+    except KeyboardInterrupt:
+        stop.set()
+    finally:
+        stop.set()
+        for arena in arenas:
+            arena.thread.join()
+        elapsed = time.perf_counter() - start
+        if mosaic is not None:
+            mosaic.close()
+        print_report(arenas, pool, elapsed)
+        pool.close()
+
+if __name__ == "__main__":
+    host()
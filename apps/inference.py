@@ -0,0 +1,194 @@
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import cv2
+from startup import BackgroundInit
+
+# Model settings shared by the in-process and multiprocess inference paths
+FACE_MESH_OPTIONS = {"max_num_faces": 2, "refine_landmarks": True}
+HANDS_OPTIONS = {"max_num_hands": 2}
+
+def create_face_mesh(**options):
+    import mediapipe as mp
+    return mp.solutions.face_mesh.FaceMesh(**{**FACE_MESH_OPTIONS, **options})
+
+def create_hands(**options):
+    import mediapipe as mp
+    return mp.solutions.hands.Hands(**{**HANDS_OPTIONS, **options})
+
+def create_hand_pipeline(full_size=None):
+    from hand_roi import HandPipeline
+    return HandPipeline(create_hands(), [create_hands(max_num_hands=1) for _ in range(2)], full_size=full_size)
+
+class RollingStat:
+    def __init__(self, window=120):
+        self._values = deque(maxlen=window)
+
+    def add(self, value):
+        self._values.append(value)
+
+    def mean(self):
+        return sum(self._values) / len(self._values) if self._values else 0.0
+
+    def max(self):
+        return max(self._values) if self._values else 0.0
+
+class InferenceResult:
+    __slots__ = ("face", "hands", "face_ms", "hands_ms", "total_ms")
+
+    def __init__(self, face, hands, face_ms, hands_ms, total_ms):
+        # face / hands are the MediaPipe results (multi_face_landmarks, multi_hand_landmarks),
+        # or None when that model was skipped for this frame
+        self.face = face
+        self.hands = hands
+        self.face_ms = face_ms
+        self.hands_ms = hands_ms
+        self.total_ms = total_ms
+
+def resize_for_inference(rgb_frame, size, interpolation=cv2.INTER_AREA):
+    # The whole display frame is scaled (never cropped), so the normalized landmarks a
+    # model returns still map to display pixels by multiplying with the display size
+    if size is None or (rgb_frame.shape[1], rgb_frame.shape[0]) == tuple(size):
+        return rgb_frame
+    return cv2.resize(rgb_frame, tuple(size), interpolation=interpolation)
+
+def _timed_process(model, rgb_frame, size=None, interpolation=cv2.INTER_AREA):
+    start = time.perf_counter()
+    result = model.process(resize_for_inference(rgb_frame, size, interpolation))
+    return result, (time.perf_counter() - start) * 1000.0
+
+class FaceMeshRebuild:
+    # Switching landmark refinement needs a new FaceMesh, which takes long enough to stall
+    # a frame. It is built on a helper thread while the current one keeps serving frames;
+    # swap() hands over the new one once it is ready.
+    def __init__(self, refine_landmarks=FACE_MESH_OPTIONS["refine_landmarks"]):
+        # Setting of the model in use, and the one asked for
+        self.refine_landmarks = refine_landmarks
+        self.wanted = refine_landmarks
+        self._loader = None
+        self._loader_refine = None
+
+    def request(self, refine_landmarks):
+        self.wanted = refine_landmarks
+        self._start()
+
+    def _start(self):
+        # One build at a time; a request made during it is picked up when it finishes
+        if self._loader is None and self.wanted != self.refine_landmarks:
+            self._loader_refine = self.wanted
+            self._loader = BackgroundInit(partial(create_face_mesh, refine_landmarks=self.wanted))
+
+    def swap(self, model):
+        # The model to use for the next frame; call it between frames
+        if self._loader is None or not self._loader.ready():
+            return model
+        loader, self._loader = self._loader, None
+        try:
+            new_model = loader.result()
+        except Exception as e:
+            print(f"Gagal membuat ulang FaceMesh, tetap memakai yang lama: {e}")
+            self.wanted = self.refine_landmarks
+            return model
+        model.close()
+        self.refine_landmarks = self._loader_refine
+        self._start()
+        return new_model
+
+    def close(self):
+        if self._loader is not None:
+            self._loader.close()
+            self._loader = None
+
+class InferenceStage:
+    # Runs FaceMesh and Hands on the same frame at the same time. MediaPipe releases
+    # the GIL inside its graph, so a single helper thread is enough: FaceMesh runs on
+    # it while Hands runs on the calling thread.
+    def __init__(self, face_model, hand_model, concurrent=True, face_size=None, hands_size=None):
+        self.face_model = face_model
+        self.hand_model = hand_model
+        self.concurrent = concurrent
+        # (w, h) each model sees; None runs it on the display frame as-is
+        self.face_size = face_size
+        self.hands_size = hands_size
+        self.interpolation = cv2.INTER_AREA
+        self._face_rebuild = FaceMeshRebuild()
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="FaceMesh") if concurrent else None
+        self.face_stat = RollingStat()
+        self.hands_stat = RollingStat()
+        self.total_stat = RollingStat()
+
+    def set_hand_gate(self, gate):
+        # Only the hand pipeline can skip players; a plain Hands model always runs
+        if hasattr(self.hand_model, "set_gate"):
+            self.hand_model.set_gate(gate)
+
+    def frame_buffer(self):
+        # In-process models read the caller's array directly, so there is no buffer to fill
+        return None
+
+    @property
+    def refine_landmarks(self):
+        return self._face_rebuild.refine_landmarks
+
+    def configure(self, face_size=None, hands_size=None, refine_landmarks=None, interpolation=None):
+        # Called between frames; a new FaceMesh is built in the background and swapped in by process()
+        if face_size is not None:
+            self.face_size = face_size
+        if hands_size is not None:
+            # The hand pipeline downscales its own full-frame pass
+            if hasattr(self.hand_model, "full_size"):
+                self.hand_model.full_size = hands_size
+            else:
+                self.hands_size = hands_size
+        if interpolation is not None:
+            self.interpolation = interpolation
+            if hasattr(self.hand_model, "interpolation"):
+                self.hand_model.interpolation = interpolation
+        if refine_landmarks is not None:
+            self._face_rebuild.request(refine_landmarks)
+
+    def process(self, rgb_frame, run_face=True, run_hands=True):
+        start = time.perf_counter()
+        self.face_model = self._face_rebuild.swap(self.face_model)
+        face, face_ms = None, 0.0
+        hands, hands_ms = None, 0.0
+        if self._pool is not None and run_face and run_hands:
+            face_future = self._pool.submit(_timed_process, self.face_model, rgb_frame, self.face_size,
+                                             self.interpolation)
+            hands, hands_ms = _timed_process(self.hand_model, rgb_frame, self.hands_size, self.interpolation)
+            face, face_ms = face_future.result()
+        else:
+            if run_face:
+                face, face_ms = _timed_process(self.face_model, rgb_frame, self.face_size, self.interpolation)
+            if run_hands:
+                hands, hands_ms = _timed_process(self.hand_model, rgb_frame, self.hands_size, self.interpolation)
+        total_ms = (time.perf_counter() - start) * 1000.0
+
+        if run_face:
+            self.face_stat.add(face_ms)
+        if run_hands:
+            self.hands_stat.add(hands_ms)
+        self.total_stat.add(total_ms)
+        return InferenceResult(face, hands, face_ms, hands_ms, total_ms)
+
+    def reset_stats(self):
+        self.face_stat = RollingStat()
+        self.hands_stat = RollingStat()
+        self.total_stat = RollingStat()
+
+    def stats(self):
+        return {
+            "face_ms": self.face_stat.mean(),
+            "hands_ms": self.hands_stat.mean(),
+            "inference_ms": self.total_stat.mean(),
+        }
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        self._face_rebuild.close()
+        self.face_model.close()
+        self.hand_model.close()
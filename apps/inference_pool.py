@@ -0,0 +1,203 @@
+import threading
+import time
+
+from hand_roi import HandPipeline
+from inference import InferenceResult, RollingStat, create_face_mesh, create_hands, resize_for_inference
+
+# Models in the pool serve frames from every arena in turn, so they must not carry
+# tracking state from one frame to the next; each arena keeps its own hand crops,
+# trackers and detection schedulers instead
+POOL_MODELS = {
+    "face": lambda: create_face_mesh(static_image_mode=True),
+    "hands": lambda: create_hands(static_image_mode=True),
+    # One hand inside a crop around a tracked hand, as in HandPipeline
+    "hand_roi": lambda: create_hands(max_num_hands=1, static_image_mode=True),
+}
+
+class _Job:
+    __slots__ = ("client", "kind", "frame", "queued", "result", "error", "ms", "wait_ms", "done")
+
+    def __init__(self, client, kind, frame):
+        self.client = client
+        self.kind = kind
+        self.frame = frame
+        self.queued = time.perf_counter()
+        self.result = None
+        self.error = None
+        self.ms = 0.0
+        self.wait_ms = 0.0
+        self.done = threading.Event()
+
+    def wait(self):
+        # The model's result, or its exception raised here, like a direct process() call
+        self.done.wait()
+        self.client.wait_stat.add(self.wait_ms)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+class InferencePool:
+    # A fixed number of worker threads, each with its own FaceMesh and Hands models,
+    # shared by every arena in the process. A frame becomes a face job plus the hand jobs
+    # its arena's HandPipeline asks for, so idle workers run them at the same time like
+    # InferenceStage does. Workers take the next job round-robin over the clients that
+    # have one waiting, so an arena with a faster camera cannot starve the others.
+    def __init__(self, workers=2, face_size=None, hands_size=None):
+        self.face_size = face_size
+        self.hands_size = hands_size
+        self._cond = threading.Condition()
+        self._clients = []
+        self._turn = 0
+        self._closed = False
+        self._models = [{kind: create() for kind, create in POOL_MODELS.items()} for _ in range(workers)]
+        self.busy_ms = [0.0] * workers
+        self._threads = [threading.Thread(target=self._run, args=(i,), name=f"InferencePool-{i}", daemon=True)
+                         for i in range(workers)]
+        self._start = time.perf_counter()
+        for thread in self._threads:
+            thread.start()
+
+    def client(self, name):
+        client = PoolClient(self, name)
+        with self._cond:
+            self._clients.append(client)
+        return client
+
+    def warm_up(self, rgb_frame):
+        # One pass of every model on a blank frame, before any arena submits work, so the
+        # first game frames do not pay for setting up the graphs
+        for models in self._models:
+            models["face"].process(resize_for_inference(rgb_frame, self.face_size))
+            models["hands"].process(resize_for_inference(rgb_frame, self.hands_size))
+            models["hand_roi"].process(rgb_frame)
+        self.busy_ms = [0.0] * len(self._models)
+        self._start = time.perf_counter()
+
+    def submit(self, client, kind, frame):
+        job = _Job(client, kind, frame)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Pool inferensi sudah ditutup.")
+            client.queue.append(job)
+            self._cond.notify()
+        return job
+
+    def _next_job(self):
+        # Called with the lock held
+        for offset in range(len(self._clients)):
+            client = self._clients[(self._turn + offset) % len(self._clients)]
+            if client.queue:
+                self._turn = (self._turn + offset + 1) % len(self._clients)
+                return client.queue.pop(0)
+        return None
+
+    def _run(self, worker):
+        models = self._models[worker]
+        while True:
+            with self._cond:
+                job = self._next_job()
+                while job is None and not self._closed:
+                    self._cond.wait()
+                    job = self._next_job()
+                if job is None:
+                    return
+            start = time.perf_counter()
+            job.wait_ms = (start - job.queued) * 1000.0
+            try:
+                # Hand frames come already scaled or cropped by the arena's HandPipeline
+                frame = resize_for_inference(job.frame, self.face_size) if job.kind == "face" else job.frame
+                job.result = models[job.kind].process(frame)
+            except Exception as e:
+                job.error = e
+            job.ms = (time.perf_counter() - start) * 1000.0
+            self.busy_ms[worker] += job.ms
+            job.done.set()
+
+    def stats(self):
+        elapsed_ms = (time.perf_counter() - self._start) * 1000.0
+        return {
+            "workers": len(self._threads),
+            "utilization": sum(self.busy_ms) / (elapsed_ms * len(self._threads)) if elapsed_ms else 0.0,
+        }
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join()
+        for models in self._models:
+            for model in models.values():
+                model.close()
+
+class _PoolModel:
+    # Stands in for one MediaPipe model inside a client's HandPipeline; process() runs
+    # on a pool worker and waits for it
+    def __init__(self, client, kind):
+        self.client = client
+        self.kind = kind
+
+    def process(self, rgb_frame):
+        return self.client.pool.submit(self.client, self.kind, rgb_frame).wait()
+
+    def close(self):
+        pass
+
+class PoolClient:
+    # Same interface as InferenceStage, for one arena; process() waits for the pool.
+    # Hands go through the arena's own HandPipeline, so gated players are skipped and
+    # tracked hands are searched for in crops, exactly as in a single-arena game.
+    def __init__(self, pool, name):
+        self.pool = pool
+        self.name = name
+        self.queue = []
+        self.hand_model = HandPipeline(_PoolModel(self, "hands"), [_PoolModel(self, "hand_roi") for _ in range(2)],
+                                       full_size=pool.hands_size)
+        self.face_stat = RollingStat()
+        self.hands_stat = RollingStat()
+        self.total_stat = RollingStat()
+        self.wait_stat = RollingStat()
+
+    def set_hand_gate(self, gate):
+        self.hand_model.set_gate(gate)
+
+    def frame_buffer(self):
+        return None
+
+    def process(self, rgb_frame, run_face=True, run_hands=True):
+        start = time.perf_counter()
+        face_job = self.pool.submit(self, "face", rgb_frame) if run_face else None
+        hands, hands_ms = None, 0.0
+        if run_hands:
+            # Runs here while a worker has the face job; each hand model call is its own job
+            hands = self.hand_model.process(rgb_frame)
+            hands_ms = (time.perf_counter() - start) * 1000.0
+            self.hands_stat.add(hands_ms)
+        face, face_ms = None, 0.0
+        if face_job is not None:
+            face = face_job.wait()
+            face_ms = face_job.ms
+            self.face_stat.add(face_ms)
+        total_ms = (time.perf_counter() - start) * 1000.0
+        self.total_stat.add(total_ms)
+        return InferenceResult(face, hands, face_ms, hands_ms, total_ms)
+
+    def reset_stats(self):
+        self.face_stat = RollingStat()
+        self.hands_stat = RollingStat()
+        self.total_stat = RollingStat()
+        self.wait_stat = RollingStat()
+
+    def stats(self):
+        return {
+            "face_ms": self.face_stat.mean(),
+            "hands_ms": self.hands_stat.mean(),
+            "inference_ms": self.total_stat.mean(),
+            "queue_ms": self.wait_stat.mean(),
+            "hand_full_runs": self.hand_model.full_runs,
+            "hand_roi_runs": self.hand_model.roi_runs,
+        }
+
+    def close(self):
+        # The pool outlives its clients; it is closed by whoever created it
+        pass
@@ -0,0 +1,96 @@
+import numpy as np
+
+LANDMARK_DTYPE = np.dtype([("x", np.float32), ("y", np.float32), ("z", np.float32)])
+HAND_POINTS = 21
+
+class PackedLandmarks:
+    # Wraps an (N, 3) float32 array so gameplay code can keep reading .landmark[i].x
+    __slots__ = ("array", "landmark")
+
+    def __init__(self, array):
+        self.array = array
+        self.landmark = array.view(LANDMARK_DTYPE).reshape(-1).view(np.recarray)
+
+class PackedResult:
+    # Stand-in for a MediaPipe result object built from landmark arrays. hand_players
+    # holds, for each hand, the player it was found for, or is None when not known.
+    __slots__ = ("multi_face_landmarks", "multi_hand_landmarks", "hand_players")
+
+    def __init__(self, multi_face_landmarks=None, multi_hand_landmarks=None, hand_players=None):
+        self.multi_face_landmarks = multi_face_landmarks
+        self.multi_hand_landmarks = multi_hand_landmarks
+        self.hand_players = hand_players
+
+def landmarks_to_array(landmark_list):
+    if isinstance(landmark_list, PackedLandmarks):
+        return landmark_list.array
+    return np.array([(p.x, p.y, p.z) for p in landmark_list.landmark], dtype=np.float32)
+
+def pack_landmark_lists(landmark_lists):
+    # (count, N, 3) float32, or None when nothing was detected
+    if not landmark_lists:
+        return None
+    return np.stack([landmarks_to_array(lm) for lm in landmark_lists])
+
+def unpack_landmark_lists(packed):
+    if packed is None:
+        return None
+    return [PackedLandmarks(array) for array in packed]
+
+def _gather(landmark_lists, indices, index_list, out):
+    # Rows `indices` of each landmark list into out[i]; returns how many lists were taken.
+    # index_list holds the same indices as Python ints, which protobuf indexes fastest.
+    count = 0
+    for landmark_list in landmark_lists or ():
+        if count == len(out):
+            break
+        if isinstance(landmark_list, PackedLandmarks):
+            np.take(landmark_list.array, indices, axis=0, out=out[count])
+        else:
+            # MediaPipe protobuf: read only the rows that are needed, one attribute access each
+            points = [landmark_list.landmark[i] for i in index_list]
+            rows = out[count]
+            rows[:, 0] = [p.x for p in points]
+            rows[:, 1] = [p.y for p in points]
+            rows[:, 2] = [p.z for p in points]
+        count += 1
+    return count
+
+def _rows(gathered, indices):
+    row_of = {int(idx): row for row, idx in enumerate(gathered)}
+    return np.vectorize(row_of.__getitem__, otypes=[np.intp])(indices)
+
+class LandmarkBatch:
+    # One frame's landmarks as (count, K, 3) float32 arrays in buffers allocated once.
+    # Only the K rows listed in face_indices / hand_indices are gathered, in that order:
+    # a MediaPipe face result costs one attribute read per landmark taken, so copying
+    # all 478 would be far slower than the handful gameplay reads.
+    def __init__(self, face_indices, hand_indices=range(HAND_POINTS), max_faces=2, max_hands=2):
+        self.face_indices = np.asarray(face_indices, dtype=np.intp)
+        self.hand_indices = np.asarray(hand_indices, dtype=np.intp)
+        self._face_list = self.face_indices.tolist()
+        self._hand_list = self.hand_indices.tolist()
+        self._faces = np.zeros((max_faces, len(self.face_indices), 3), dtype=np.float32)
+        self._hands = np.zeros((max_hands, len(self.hand_indices), 3), dtype=np.float32)
+        self.face_count = 0
+        self.hand_count = 0
+
+    def face_rows(self, indices):
+        # Positions of landmark indices (any nesting) within the gathered face rows
+        return _rows(self.face_indices, indices)
+
+    def hand_rows(self, indices):
+        return _rows(self.hand_indices, indices)
+
+    def load(self, face_lists, hand_lists):
+        self.face_count = _gather(face_lists, self.face_indices, self._face_list, self._faces)
+        self.hand_count = _gather(hand_lists, self.hand_indices, self._hand_list, self._hands)
+        return self
+
+    @property
+    def faces(self):
+        return self._faces[:self.face_count]
+
+    @property
+    def hands(self):
+        return self._hands[:self.hand_count]
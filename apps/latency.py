@@ -0,0 +1,101 @@
+import csv
+import json
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+# Histogram bins, in milliseconds
+HISTOGRAM_BIN_MS = 10
+HISTOGRAM_MAX_MS = 1000
+# Frames older than this can no longer be the cause of an effect
+FRAME_HISTORY_S = 2.0
+
+class LatencyTracker:
+    # Input-to-photon latency: from the moment a frame came off the camera, through the
+    # detection it produced (blink crossing the EAR threshold, thumbs-up) and the game
+    # effect it triggered (projectile fired, shield raised), to the end of the display
+    # call for the first frame that shows the effect. All times are time.monotonic().
+    def __init__(self):
+        self._frames = OrderedDict()
+        self._shown = []
+        # Per sample: kind, player, capture, processed, effect, displayed
+        self.samples = []
+
+    def frame_started(self, frame_time, capture_time):
+        # frame_time is the game clock reading input events of this frame are stamped with
+        self._frames[frame_time] = (capture_time, time.monotonic())
+        while self._frames:
+            oldest = next(iter(self._frames))
+            if frame_time - oldest <= FRAME_HISTORY_S:
+                break
+            self._frames.popitem(last=False)
+
+    def effects(self, effects):
+        # Drains GameCore.effects; each one becomes visible in the frame being drawn now
+        now = time.monotonic()
+        for kind, player, cause in effects:
+            if cause is None or cause.t not in self._frames:
+                continue
+            capture_time, processed_time = self._frames[cause.t]
+            self._shown.append((kind, player, capture_time, processed_time, now))
+        effects.clear()
+
+    def frame_displayed(self):
+        if not self._shown:
+            return
+        now = time.monotonic()
+        for entry in self._shown:
+            self.samples.append(entry + (now,))
+        self._shown.clear()
+
+    def totals(self, kind=None):
+        # End-to-end latency in ms
+        return np.array([(s[5] - s[2]) * 1000.0 for s in self.samples if kind is None or s[0] == kind])
+
+    def histogram(self, kind=None):
+        edges = np.arange(0, HISTOGRAM_MAX_MS + HISTOGRAM_BIN_MS, HISTOGRAM_BIN_MS)
+        counts, _ = np.histogram(np.minimum(self.totals(kind), HISTOGRAM_MAX_MS - 1e-3), bins=edges)
+        return edges, counts
+
+    def summary(self):
+        lines = []
+        for kind in ("projectile", "shield"):
+            totals = self.totals(kind)
+            if not len(totals):
+                lines.append(f"{kind}: no samples")
+                continue
+            p50, p95, p99 = np.percentile(totals, (50, 95, 99))
+            parts = np.array([(s[3] - s[2], s[4] - s[3], s[5] - s[4]) for s in self.samples if s[0] == kind]) * 1000.0
+            capture_ms, effect_ms, display_ms = parts.mean(axis=0)
+            lines.append(f"{kind}: {len(totals)} samples, p50 {p50:.0f} ms, p95 {p95:.0f} ms, p99 {p99:.0f} ms "
+                         f"(capture->processing {capture_ms:.0f}, ->effect {effect_ms:.0f}, ->display {display_ms:.0f})")
+        return "\n".join(lines)
+
+    def export(self, path):
+        # Raw samples as CSV, or samples plus histograms as JSON
+        if path.lower().endswith(".csv"):
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(("kind", "player", "capture_to_processing_ms", "processing_to_effect_ms",
+                                 "effect_to_display_ms", "total_ms"))
+                for kind, player, capture, processed, effect, displayed in self.samples:
+                    writer.writerow((kind, player, f"{(processed - capture) * 1000.0:.2f}",
+                                     f"{(effect - processed) * 1000.0:.2f}", f"{(displayed - effect) * 1000.0:.2f}",
+                                     f"{(displayed - capture) * 1000.0:.2f}"))
+            return
+        report = {"bin_ms": HISTOGRAM_BIN_MS, "histograms": {}, "samples": []}
+        for kind in ("projectile", "shield"):
+            edges, counts = self.histogram(kind)
+            report["histograms"][kind] = {"edges_ms": edges.tolist(), "counts": counts.tolist()}
+        for kind, player, capture, processed, effect, displayed in self.samples:
+            report["samples"].append({
+                "kind": kind,
+                "player": player,
+                "capture_to_processing_ms": round((processed - capture) * 1000.0, 2),
+                "processing_to_effect_ms": round((effect - processed) * 1000.0, 2),
+                "effect_to_display_ms": round((displayed - effect) * 1000.0, 2),
+                "total_ms": round((displayed - capture) * 1000.0, 2),
+            })
+        with open(path, "w") as f:
+            json.dump(report, f)
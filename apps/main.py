@@ -1,67 +1,75 @@
+import time
+# Taken before the heavy imports, so startup times include them
+PROCESS_START = time.perf_counter()
+import argparse
 import cv2
-import mediapipe as mp
 import numpy as np
-import threading
-import time
-from overlay import overlay_transparent
-from utils import (
-    eye_aspect_ratio,
-    detect_hand_gesture,
-    draw_healthbar,
-)
+from animation import AnimationAtlas, Animator
+from compositor import Compositor, add_healthbar, paint
+from overlay import BLEND_MODE, BLEND_MODES, set_blend_mode
+from sprite_cache import sprite_cache
+from assets import asset_cache, load_image, prepare_sprites
+from utils import INDEX_TIP_IDX, MIDDLE_TIP_IDX, THUMB_TIP_IDX, landmark_features
+from landmarks import LandmarkBatch
+from hand_roi import WRIST_IDX, player_for_wrist
 # Import the new menu manager
 import menu_manager
+from capture import open_source
+from display import create_display
+from recording import SessionRecorder, SessionReplay
+from profiler import FrameProfiler, NullProfiler
+from latency import LatencyTracker
+from quality import QualityGovernor, build_levels
+from startup import BackgroundInit, StartupTimer
+from inference import InferenceStage, RollingStat, create_face_mesh, create_hand_pipeline
+from mp_inference import MultiprocessInference
+from tracking import DetectionScheduler, PlayerTracker
+from scheduler import GameClock
+from simulation import SIM_HZ, FixedStepLoop, InputEvent, InputQueue
+from game_core import (
+    GAME_STATE_PLAYING,
+    GAME_STATE_WINNER,
+    OPEN_THRESHOLD,
+    MAX_PROJECTILES,
+    GameCore,
+)
 
 # Constants
 RESIZED_FRAME_DIMENSIONS = (640, 480)
-MAX_PROJECTILES = 50
+# Resolution each model runs at, independent of the display resolution above
+FACE_INFERENCE_SIZE = (640, 480)
+HANDS_INFERENCE_SIZE = (320, 240)
+# Run the models every Nth frame; trackers predict the frames in between
+FACE_DETECTION_INTERVAL = 2
+HANDS_DETECTION_INTERVAL = 3
+# Brightness steps of the instruction fade-out, each a cached text layer
+INSTRUCTION_FADE_LEVELS = 32
 SCREEN_CENTER_X = RESIZED_FRAME_DIMENSIONS[0] // 2
 
-# Game States
-GAME_STATE_PLAYING = 0
-GAME_STATE_WINNER = 1
-
-# Global variables for button rectangles (will be updated in main loop)
-replay_button_rect = None
-close_button_rect = None
-
-# Initialize Face Mesh and Hand Detection
-mp_face_mesh = mp.solutions.face_mesh
-face_mesh = mp.solutions.face_mesh.FaceMesh(max_num_faces=2, refine_landmarks=True)
-mp_hands = mp.solutions.hands
-hands = mp_hands.Hands(max_num_hands=2)
-
-# Load assets
-player1_img_raw = cv2.imread('assets/SPACESHIP/PLAYER 1.png', cv2.IMREAD_UNCHANGED)
-player2_img_raw = cv2.imread('assets/SPACESHIP/PLAYER 2.png', cv2.IMREAD_UNCHANGED)
-ammo_img_raw = cv2.imread('assets/MAIN UI/SHOT.png', cv2.IMREAD_UNCHANGED)
-shield_img = cv2.imread('assets/SHIELD/Shield Smooth Static.png', cv2.IMREAD_UNCHANGED)
-winner_img_raw = cv2.imread('assets/MAIN UI/WINNER.png', cv2.IMREAD_UNCHANGED)  # Load winner image
-replay_btn_img = cv2.imread('assets/BUTTON TITLE/REPLAY.png', cv2.IMREAD_UNCHANGED)
-close_btn_img = cv2.imread('assets/BUTTON TITLE/CLOSE.png', cv2.IMREAD_UNCHANGED)
-
-if player1_img_raw is None or player2_img_raw is None or ammo_img_raw is None or shield_img is None or winner_img_raw is None or replay_btn_img is None or close_btn_img is None:
+# Face Mesh and Hand Detection are created in create_inference(), so worker
+# processes that re-import this module do not build a second copy of the models.
+# MediaPipe itself is only imported there, off the path to the menu.
+
+# Load assets (decoded once, then memory-mapped from the asset cache)
+player1_img_raw = load_image('assets/SPACESHIP/PLAYER 1.png')
+player2_img_raw = load_image('assets/SPACESHIP/PLAYER 2.png')
+ammo_img_raw = load_image('assets/MAIN UI/SHOT.png')
+winner_img_raw = load_image('assets/MAIN UI/WINNER.png')  # Load winner image
+replay_btn_img = load_image('assets/BUTTON TITLE/REPLAY.png')
+close_btn_img = load_image('assets/BUTTON TITLE/CLOSE.png')
+
+if player1_img_raw is None or player2_img_raw is None or ammo_img_raw is None or winner_img_raw is None or replay_btn_img is None or close_btn_img is None:
     raise FileNotFoundError("Gambar tidak ditemukan. Pastikan semua aset ada di direktori yang benar.")
-if player1_img_raw.shape[2] < 4 or player2_img_raw.shape[2] < 4 or ammo_img_raw.shape[2] < 4 or shield_img.shape[2] < 4 or winner_img_raw.shape[2] < 4 or replay_btn_img.shape[2] < 4 or close_btn_img.shape[2] < 4:
+if player1_img_raw.shape[2] < 4 or player2_img_raw.shape[2] < 4 or ammo_img_raw.shape[2] < 4 or winner_img_raw.shape[2] < 4 or replay_btn_img.shape[2] < 4 or close_btn_img.shape[2] < 4:
     raise ValueError("Gambar tidak memiliki alpha channel.")
 
-# Function to rotate images while preserving the alpha channel
-def rotate_image_alpha(image, angle):
-    h, w = image.shape[:2]
-    center = (w // 2, h // 2)
-    rotation_matrix = cv2.getRotationMatrix2D(center, angle, 1.0)
-    cos = np.abs(rotation_matrix[0, 0])
-    sin = np.abs(rotation_matrix[0, 1])
-    new_w = int((h * sin) + (w * cos))
-    new_h = int((h * cos) + (w * sin))
-    rotation_matrix[0, 2] += (new_w / 2) - center[0]
-    rotation_matrix[1, 2] += (new_h / 2) - center[1]
-    rotated = cv2.warpAffine(image, rotation_matrix, (new_w, new_h), borderMode=cv2.BORDER_CONSTANT, borderValue=(0, 0, 0, 0))
-    return rotated
-
-# Rotate spaceship images
-player1_rotated = rotate_image_alpha(player1_img_raw, -90)
-player2_rotated = rotate_image_alpha(player2_img_raw, 90)
+# Register sprites so every draw call goes through the shared cache
+sprite_cache.register("player1", player1_img_raw)
+sprite_cache.register("player2", player2_img_raw)
+sprite_cache.register("ammo", ammo_img_raw)
+sprite_cache.register("winner", winner_img_raw)
+sprite_cache.register("replay", replay_btn_img)
+sprite_cache.register("close", close_btn_img)
 
 # Eye landmark indices
 LEFT_EYE_IDX = [362, 385, 387, 263, 373, 380]
@@ -69,97 +77,263 @@ RIGHT_EYE_IDX = [33, 160, 158, 133, 153, 144]
 
 # Nose landmark index for player position
 NOSE_IDX = 1
+# Landmarks gameplay reads; only these are copied out of each result
+FACE_LANDMARK_IDX = [NOSE_IDX] + LEFT_EYE_IDX + RIGHT_EYE_IDX
+HAND_LANDMARK_IDX = [WRIST_IDX, THUMB_TIP_IDX, INDEX_TIP_IDX, MIDDLE_TIP_IDX]
 
-# Thresholds and cooldowns
-BLINK_THRESHOLD = 0.15
-OPEN_THRESHOLD = 0.25
-BLINK_COOLDOWN = 1.0
+# Force face detection when tracking confidence drops below this, or the eyes start closing
+TRACKING_MIN_CONFIDENCE = 0.5
+EAR_FALLING_RATE = 0.5
 
-# Player size (using rotated image dimensions)
+# Spaceships are drawn rotated to face each other
+PLAYER1_ANGLE = -90
+PLAYER2_ANGLE = 90
+
+# Player size (using rotated image dimensions, i.e. width and height swapped)
 PLAYER_TARGET_W = 100
-PLAYER1_TARGET_H = int(PLAYER_TARGET_W * player1_rotated.shape[0] / player1_rotated.shape[1])
-PLAYER2_TARGET_H = int(PLAYER_TARGET_W * player2_rotated.shape[0] / player2_rotated.shape[1])
+PLAYER1_TARGET_H = int(PLAYER_TARGET_W * player1_img_raw.shape[1] / player1_img_raw.shape[0])
+PLAYER2_TARGET_H = int(PLAYER_TARGET_W * player2_img_raw.shape[1] / player2_img_raw.shape[0])
+
+# Shield drawn around a player
+SHIELD_SCALE_FACTOR = 1.3
+SHIELD1_SIZE = (int(PLAYER_TARGET_W * SHIELD_SCALE_FACTOR), int(PLAYER1_TARGET_H * SHIELD_SCALE_FACTOR))
+SHIELD2_SIZE = (int(PLAYER_TARGET_W * SHIELD_SCALE_FACTOR), int(PLAYER2_TARGET_H * SHIELD_SCALE_FACTOR))
+
+# Winner screen
+WINNER_SCALE_FACTOR = 0.5
+WINNER_DISPLAY_SIZE = (int(winner_img_raw.shape[1] * WINNER_SCALE_FACTOR), int(winner_img_raw.shape[0] * WINNER_SCALE_FACTOR))
+BUTTON_SCALE_FACTOR = 0.3
+REPLAY_BTN_SIZE = (int(replay_btn_img.shape[1] * BUTTON_SCALE_FACTOR), int(replay_btn_img.shape[0] * BUTTON_SCALE_FACTOR))
+CLOSE_BTN_SIZE = (int(close_btn_img.shape[1] * BUTTON_SCALE_FACTOR), int(close_btn_img.shape[0] * BUTTON_SCALE_FACTOR))
 
 # Bullet size
 AMMO_W = 80
 AMMO_H = int(AMMO_W * ammo_img_raw.shape[0] / ammo_img_raw.shape[1])
-
-# Initial health
-health_player1 = 100
-health_player2 = 100
-
-# Shield status
-shield_active_player1 = False
-shield_active_player2 = False
-
-# Last shield deactivation times for cooldown
-last_shield_deactivation_time_p1 = 0
-last_shield_deactivation_time_p2 = 0
-
-# Game control flags for mouse events
-_restart_game_flag = False
-_exit_game_flag = False
-
-def handle_mouse_event(event, x, y, flags, param):
-    global _restart_game_flag, _exit_game_flag, replay_button_rect, close_button_rect
-    if event == cv2.EVENT_LBUTTONDOWN:
-        # Check if replay button was clicked
-        if replay_button_rect and \
-           x >= replay_button_rect[0] and x <= replay_button_rect[0] + replay_button_rect[2] and \
-           y >= replay_button_rect[1] and y <= replay_button_rect[1] + replay_button_rect[3]:
-            _restart_game_flag = True
-        # Check if close button was clicked
-        if close_button_rect and \
-           x >= close_button_rect[0] and x <= close_button_rect[0] + close_button_rect[2] and \
-           y >= close_button_rect[1] and y <= close_button_rect[1] + close_button_rect[3]:
-            _exit_game_flag = True
-
-def activate_shield(player_id):
-    global shield_active_player1, shield_active_player2, \
-           last_shield_deactivation_time_p1, last_shield_deactivation_time_p2
-    current_time = time.time()
-    if player_id == "Player 1":
-        if not shield_active_player1 and \
-           (current_time - last_shield_deactivation_time_p1 >= 5.0):
-            shield_active_player1 = True
-            threading.Thread(target=deactivate_shield, args=("Player 1",)).start()
-    elif player_id == "Player 2":
-        if not shield_active_player2 and \
-           (current_time - last_shield_deactivation_time_p2 >= 5.0):
-            shield_active_player2 = True
-            threading.Thread(target=deactivate_shield, args=("Player 2",)).start()
-
-def deactivate_shield(player_id_str):
-    global shield_active_player1, shield_active_player2, \
-           last_shield_deactivation_time_p1, last_shield_deactivation_time_p2
-    time.sleep(3)  # Duration of shield activation
-    if player_id_str == "Player 1":
-        shield_active_player1 = False
-        last_shield_deactivation_time_p1 = time.time()
-    elif player_id_str == "Player 2":
-        shield_active_player2 = False
-        last_shield_deactivation_time_p2 = time.time()
-
-def main():
-    global _restart_game_flag, _exit_game_flag, replay_button_rect, close_button_rect
-    cap = cv2.VideoCapture(0)
-    if not cap.isOpened():
-        raise IOError("Tidak dapat membuka kamera.")
-    cv2.namedWindow("EVADER")
-    cv2.setMouseCallback("EVADER", handle_mouse_event)
-    current_game_state = GAME_STATE_PLAYING
-    winner_player_id = None
-    last_blink_time = [0, 0]
-    eye_ready_to_blink = [0, 0]
-    projectiles = []
-    global health_player1, health_player2, shield_active_player1, shield_active_player2
-    health_player1 = 100
-    health_player2 = 100
-    shield_active_player1 = False
-    shield_active_player2 = False
-    player_positions = [None, None]
-    show_instructions_start_time = time.time()
+# Ammo is drawn rotated by 90 degrees, so its on-screen size is (AMMO_H, AMMO_W)
+AMMO_ROTATED_SIZE = (AMMO_H, AMMO_W)
+
+# Every sprite variant gameplay draws, built once by prepare_sprites() before the game starts
+GAME_SPRITE_VARIANTS = [
+    ("player1", (PLAYER_TARGET_W, PLAYER1_TARGET_H), PLAYER1_ANGLE),
+    ("player2", (PLAYER_TARGET_W, PLAYER2_TARGET_H), PLAYER2_ANGLE),
+    ("ammo", AMMO_ROTATED_SIZE, PLAYER1_ANGLE),
+    ("ammo", AMMO_ROTATED_SIZE, PLAYER2_ANGLE),
+    ("winner", WINNER_DISPLAY_SIZE, 0),
+    ("replay", REPLAY_BTN_SIZE, 0),
+    ("close", CLOSE_BTN_SIZE, 0),
+]
+
+# Animated sheets, sliced and scaled into the atlas by load_animations():
+# name, path, (cell w, h), sizes drawn at, frames per second, loop, rotation
+SHIELD_CELL = (128, 128)
+EXPLOSION_CELL = (48, 48)
+HIT_EXPLOSION_SIZE = (64, 64)
+DEFEAT_EXPLOSION_SIZE = (PLAYER_TARGET_W * 3 // 2, PLAYER_TARGET_W * 3 // 2)
+# Same scale as the ships, whose sheet cells are the same 48 px
+TURBO_SIZE = (PLAYER_TARGET_W, PLAYER_TARGET_W)
+SHIELD_SIZES = (SHIELD1_SIZE, SHIELD2_SIZE)
+ANIMATION_SHEETS = [
+    ("shield_pulse", 'assets/SHIELD/Shield Smooth Pulse Loop.png', SHIELD_CELL, SHIELD_SIZES, 12, True, 0),
+    # Player 1 is hit from the right, Player 2 from the left; shots striking the top or
+    # bottom of the shield use the up/down sheets
+    ("shield_hit_right", 'assets/SHIELD/Shield Hit Right.png', SHIELD_CELL, (SHIELD1_SIZE,), 20, False, 0),
+    ("shield_hit_left", 'assets/SHIELD/Shield Hit Left.png', SHIELD_CELL, (SHIELD2_SIZE,), 20, False, 0),
+    ("shield_hit_up", 'assets/SHIELD/Shield Hit Up.png', SHIELD_CELL, SHIELD_SIZES, 20, False, 0),
+    ("shield_hit_down", 'assets/SHIELD/Shield Hit Down.png', SHIELD_CELL, SHIELD_SIZES, 20, False, 0),
+    # Six frames across the SHIELD_CRACK_WARNING before the shield drops
+    ("shield_crack", 'assets/SHIELD/Shield Crack.png', SHIELD_CELL, SHIELD_SIZES, 12, False, 0),
+    ("shield_destroyed", 'assets/SHIELD/Shield Destroyed.png', SHIELD_CELL, SHIELD_SIZES, 16, False, 0),
+    ("explosion", 'assets/MAIN UI/EXPLOSION.png', EXPLOSION_CELL, (HIT_EXPLOSION_SIZE, DEFEAT_EXPLOSION_SIZE), 14, False, 0),
+    # Engine flame behind each ship, turned the same way as the ship
+    ("turbo_left", 'assets/MAIN UI/TURBO.png', EXPLOSION_CELL, (TURBO_SIZE,), 10, True, PLAYER1_ANGLE),
+    ("turbo_right", 'assets/MAIN UI/TURBO.png', EXPLOSION_CELL, (TURBO_SIZE,), 10, True, PLAYER2_ANGLE),
+]
+animation_atlas = AnimationAtlas()
+
+def load_animations(atlas, sheets=ANIMATION_SHEETS):
+    for name, path, cell_size, sizes, fps, loop, angle in sheets:
+        atlas.add_sheet(name, load_image(path), cell_size, sizes, fps, loop, angle)
+    return atlas.build()
+
+# Gameplay runs in fixed steps on simulation time, driven by the frame loop
+game_clock = GameClock()
+
+def create_inference(mode, face_size=FACE_INFERENCE_SIZE, hands_size=HANDS_INFERENCE_SIZE):
+    if mode == "multiprocess":
+        frame_w, frame_h = RESIZED_FRAME_DIMENSIONS
+        return MultiprocessInference((frame_h, frame_w, 3), face_size=face_size, hands_size=hands_size)
+    # The hand pipeline downscales its own full-frame pass, so the stage passes frames through
+    return InferenceStage(create_face_mesh(), create_hand_pipeline(full_size=hands_size), face_size=face_size)
+
+def apply_quality(level, inference, hands_scheduler):
+    inference.configure(face_size=level.face_size, hands_size=level.hands_size,
+                        refine_landmarks=level.refine_landmarks, interpolation=level.interpolation)
+    hands_scheduler.interval = level.hands_interval
+
+def load_inference(mode, face_size, hands_size, startup=None):
+    inference = create_inference(mode, face_size, hands_size)
+    # One pass on a blank frame sets up the model graphs, so the first game frame does not pay for it
+    frame_w, frame_h = RESIZED_FRAME_DIMENSIONS
+    inference.process(np.zeros((frame_h, frame_w, 3), dtype=np.uint8))
+    inference.reset_stats()
+    if startup is not None:
+        startup.mark("models")
+    return inference
+
+def parse_size(text):
+    w, h = text.lower().split("x")
+    return int(w), int(h)
+
+def face_detection_needed(trackers, current_time):
+    for tracker in trackers:
+        if not tracker.active:
+            continue
+        # A player that has been gone long enough drops back to the regular interval
+        if 0.0 < tracker.confidence(current_time) < TRACKING_MIN_CONFIDENCE:
+            return True
+        if tracker.ear < OPEN_THRESHOLD or tracker.ear_falling(EAR_FALLING_RATE):
+            return True
+    return False
+
+def draw_instructions(canvas, instruction_text, alpha):
+    ih, iw = canvas.shape[:2]
+    font = cv2.FONT_HERSHEY_SIMPLEX
+    font_scale_base = ih / 480
+    font_scale = font_scale_base * 0.5
+    thickness = 1
+    max_text_w = 0
+    total_text_h = 0
+
+    for line in instruction_text:
+        (text_w, text_h), baseline = cv2.getTextSize(line, font, font_scale, thickness)
+        max_text_w = max(max_text_w, text_w)
+        total_text_h += (text_h + baseline + 10)
+
+    start_x = (iw - max_text_w) // 2
+    start_y = (ih - total_text_h) // 2
+    y_offset = start_y
+
+    # The text fades to black, as it always has, rather than to transparent
+    text_color = (255, 255, 255)
+    text_color_alpha = (int(text_color[0] * alpha), int(text_color[1] * alpha), int(text_color[2] * alpha), 255)
+    for line in instruction_text:
+        (text_w, text_h), baseline = cv2.getTextSize(line, font, font_scale, thickness)
+        x_pos = start_x + (max_text_w - text_w) // 2
+        cv2.putText(canvas, line, (x_pos, y_offset), font, font_scale, text_color_alpha, thickness, cv2.LINE_AA)
+        y_offset += (text_h + baseline + 10)
+    return canvas
+
+def winner_layout(iw, ih, winner):
+    # Positions of the winner banner and the REPLAY/CLOSE button rects (x, y, w, h)
+    winner_display_w, winner_display_h = WINNER_DISPLAY_SIZE
+    if winner == 0:
+        winner_x = (SCREEN_CENTER_X // 2) - (winner_display_w // 2)
+    else:
+        winner_x = SCREEN_CENTER_X + (SCREEN_CENTER_X // 2) - (winner_display_w // 2)
+    winner_y = int(ih * 0.1)
+
+    replay_btn_w, replay_btn_h = REPLAY_BTN_SIZE
+    close_btn_w, close_btn_h = CLOSE_BTN_SIZE
+    buttons_center_y = int(ih * 0.5)
+    total_buttons_width = replay_btn_w + close_btn_w + 40
+    start_x_buttons = (iw // 2) - (total_buttons_width // 2)
+    replay_x = start_x_buttons
+    replay_y = buttons_center_y - (replay_btn_h // 2)
+    close_x = start_x_buttons + replay_btn_w + 40
+    close_y = buttons_center_y - (close_btn_h // 2)
+    return {
+        "winner": (winner_x, winner_y, winner_display_w, winner_display_h),
+        "replay": (replay_x, replay_y, replay_btn_w, replay_btn_h),
+        "close": (close_x, close_y, close_btn_w, close_btn_h),
+    }
+
+def draw_winner_screen(canvas, winner, layout):
+    ih = canvas.shape[0]
+    winner_x, winner_y, winner_display_w, winner_display_h = layout["winner"]
+    paint(canvas, sprite_cache.get("winner", WINNER_DISPLAY_SIZE), winner_x, winner_y)
+
+    winner_text = f"Player {winner + 1} WINS!"
+    font = cv2.FONT_HERSHEY_SIMPLEX
+    text_scale = ih / 480 * 1.0
+    text_thickness = 2
+    (text_w, text_h), baseline = cv2.getTextSize(winner_text, font, text_scale, text_thickness)
+    text_x = winner_x + (winner_display_w // 2) - (text_w // 2)
+    text_y = winner_y + winner_display_h + 30
+    cv2.putText(canvas, winner_text, (text_x, text_y), font, text_scale, (0, 255, 255, 255), text_thickness, cv2.LINE_AA)
+
+    # Draw REPLAY and CLOSE buttons
+    paint(canvas, sprite_cache.get("replay", REPLAY_BTN_SIZE), *layout["replay"][:2])
+    paint(canvas, sprite_cache.get("close", CLOSE_BTN_SIZE), *layout["close"][:2])
+    return canvas
+
+def main(stream, inference, display, face_interval=FACE_DETECTION_INTERVAL, hands_interval=HANDS_DETECTION_INTERVAL,
+         clock=game_clock, recorder=None, replay=None, profiler=None,
+         show_hud=False, latency=None, governor=None, startup=None, log=print):
+    # Everything a game needs lives in this call, so several can run side by side (see host.py).
+    # Returns the run statistics that are also logged on exit.
+    if profiler is None:
+        profiler = NullProfiler()
+
+    # Button rectangles (updated in the loop) and the flags clicking them sets
+    replay_button_rect = None
+    close_button_rect = None
+    _restart_game_flag = False
+    _exit_game_flag = False
+
+    def handle_mouse_event(event, x, y, flags, param):
+        nonlocal _restart_game_flag, _exit_game_flag
+        if event == cv2.EVENT_LBUTTONDOWN:
+            # Check if replay button was clicked
+            if replay_button_rect and \
+               x >= replay_button_rect[0] and x <= replay_button_rect[0] + replay_button_rect[2] and \
+               y >= replay_button_rect[1] and y <= replay_button_rect[1] + replay_button_rect[3]:
+                _restart_game_flag = True
+            # Check if close button was clicked
+            if close_button_rect and \
+               x >= close_button_rect[0] and x <= close_button_rect[0] + close_button_rect[2] and \
+               y >= close_button_rect[1] and y <= close_button_rect[1] + close_button_rect[3]:
+                _exit_game_flag = True
+
+    display.open(handle_mouse_event)
+    ammo_sprite_ids = (
+        sprite_cache.intern("ammo", AMMO_ROTATED_SIZE, PLAYER1_ANGLE),
+        sprite_cache.intern("ammo", AMMO_ROTATED_SIZE, PLAYER2_ANGLE),
+    )
+    ammo_sizes = tuple((sprite_cache.by_id(i).width, sprite_cache.by_id(i).height) for i in ammo_sprite_ids)
+    core = GameCore(RESIZED_FRAME_DIMENSIONS,
+                    ((PLAYER_TARGET_W, PLAYER1_TARGET_H), (PLAYER_TARGET_W, PLAYER2_TARGET_H)),
+                    ammo_sizes, ammo_sprite_ids, MAX_PROJECTILES)
+    projectiles = core.projectiles
+    start_time = clock.now()
+    if recorder is not None:
+        recorder.start(start_time)
+    # Detections become input events; the core consumes them at SIM_HZ
+    input_events = InputQueue()
+    sim_loop = FixedStepLoop(SIM_HZ, inputs=input_events)
+    sim_loop.reset(start_time)
+    trackers = [PlayerTracker(), PlayerTracker()]
+    face_scheduler = DetectionScheduler(face_interval)
+    hands_scheduler = DetectionScheduler(hands_interval)
+    show_instructions_start_time = start_time
     instruction_display_duration = 10
+    compositor = Compositor(RESIZED_FRAME_DIMENSIONS)
+    # Clips per player index; all of them play on the game clock
+    shield_sizes = SHIELD_SIZES
+    shield_pulse = [animation_atlas.clip("shield_pulse", size) for size in shield_sizes]
+    shield_hit = (animation_atlas.clip("shield_hit_right", SHIELD1_SIZE), animation_atlas.clip("shield_hit_left", SHIELD2_SIZE))
+    shield_hit_up = [animation_atlas.clip("shield_hit_up", size) for size in shield_sizes]
+    shield_hit_down = [animation_atlas.clip("shield_hit_down", size) for size in shield_sizes]
+    shield_crack = [animation_atlas.clip("shield_crack", size) for size in shield_sizes]
+    shield_destroyed = [animation_atlas.clip("shield_destroyed", size) for size in shield_sizes]
+    turbo = (animation_atlas.clip("turbo_left", TURBO_SIZE), animation_atlas.clip("turbo_right", TURBO_SIZE))
+    hit_explosion = animation_atlas.clip("explosion", HIT_EXPLOSION_SIZE)
+    defeat_explosion = animation_atlas.clip("explosion", DEFEAT_EXPLOSION_SIZE)
+    animator = Animator()
+    landmark_batch = LandmarkBatch(FACE_LANDMARK_IDX, HAND_LANDMARK_IDX)
+    eye_rows = landmark_batch.face_rows([LEFT_EYE_IDX, RIGHT_EYE_IDX])
+    nose_row = int(landmark_batch.face_rows(NOSE_IDX))
+    tip_rows = landmark_batch.hand_rows([THUMB_TIP_IDX, INDEX_TIP_IDX, MIDDLE_TIP_IDX])
+    wrist_row = int(landmark_batch.hand_rows(WRIST_IDX))
     instruction_text = [
         "HOW TO PLAY :",
         "1. Area player dipisah dengan garis tengah.",
@@ -169,263 +343,203 @@ def main():
         "5. Gerakkan kepala untuk menghindar."
     ]
 
+    def simulation_step(sim_time, dt, events):
+        return core.step(events, dt)
+
+    def push_event(event):
+        input_events.push(event)
+        if recorder is not None:
+            recorder.add_event(event)
+
+    frame_stat = RollingStat()
+    last_frame_start = None
+    frames_processed = 0
+    run_start = time.perf_counter()
+
     while True:
-        ret, frame = cap.read()
+        profiler.begin_frame()
+        ret, frame = stream.read()
         if not ret:
             break
+        profiler.mark("capture")
+        frame_start = time.perf_counter()
+        if last_frame_start is not None:
+            frame_stat.add((frame_start - last_frame_start) * 1000.0)
+        last_frame_start = frame_start
 
+        raw_frame = frame
         frame = cv2.flip(frame, 1)
-        frame = cv2.resize(frame, RESIZED_FRAME_DIMENSIONS)
+        if (frame.shape[1], frame.shape[0]) != RESIZED_FRAME_DIMENSIONS:
+            frame = cv2.resize(frame, RESIZED_FRAME_DIMENSIONS)
         ih, iw = frame.shape[:2]
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results_face = face_mesh.process(rgb_frame)
-        results_hands = hands.process(rgb_frame)
-        current_time = time.time()
-
-        if current_game_state == GAME_STATE_PLAYING:
-            # Gameplay logic
-            new_projectiles = []
-            for proj in projectiles:
-                proj['x'] += 15 if proj['player'] == "Player 1" else -15
-                if 0 <= proj['x'] + proj['w'] and proj['x'] <= iw:
-                    new_projectiles.append(proj)
-            projectiles = new_projectiles
-
-            if len(projectiles) > MAX_PROJECTILES:
-                projectiles.pop(0)
-
-            if results_face.multi_face_landmarks:
-                detected_players = []
-                for face_landmarks in results_face.multi_face_landmarks[:2]:
-                    nose = face_landmarks.landmark[NOSE_IDX]
-                    if nose.x < 0 or nose.x > 1 or nose.y < 0 or nose.y > 1:
-                        continue
-
-                    # Determine player ID based on nose position relative to the center line
-                    player_id = 0 if nose.x * iw < SCREEN_CENTER_X else 1
-                    target_player_w = PLAYER_TARGET_W
-                    target_player_h = PLAYER1_TARGET_H if player_id == 0 else PLAYER2_TARGET_H
-
-                    # Adjust X position for better placement
-                    if player_id == 0:  # Player 1 (left)
-                        player_x = int(nose.x * iw) - int(target_player_w * 0.7)
-                    else:  # Player 2 (right)
-                        player_x = int(nose.x * iw) - int(target_player_w * 0.3)
-                    player_y = int(nose.y * ih) - target_player_h // 2
-
-                    # Ensure only one player is detected per side if two faces are detected
-                    if player_id not in [p["id"] for p in detected_players]:
-                        detected_players.append({
-                            "id": player_id,
-                            "x": player_x,
-                            "y": player_y,
-                            "landmarks": face_landmarks
-                        })
-
-                # Update player positions
-                for player in detected_players:
-                    player_id = player["id"]
-                    player_positions[player_id] = {"x": player["x"], "y": player["y"]}
-                    left_ear = eye_aspect_ratio(player["landmarks"].landmark, LEFT_EYE_IDX, iw, ih)
-                    right_ear = eye_aspect_ratio(player["landmarks"].landmark, RIGHT_EYE_IDX, iw, ih)
-                    avg_ear = (left_ear + right_ear) / 2.0
-                    blinking = avg_ear < BLINK_THRESHOLD
-                    eyes_open = avg_ear > OPEN_THRESHOLD
-
-                    if eyes_open:
-                        eye_ready_to_blink[player_id] = 1
-
-                    if blinking and eye_ready_to_blink[player_id] == 1 and current_time - last_blink_time[player_id] >= BLINK_COOLDOWN:
-                        ammo_rotation_angle = -90 if player_id == 0 else 90
-                        rotated_ammo = rotate_image_alpha(cv2.resize(ammo_img_raw, (AMMO_W, AMMO_H), interpolation=cv2.INTER_AREA), ammo_rotation_angle)
-                        rotated_ammo_h, rotated_ammo_w = rotated_ammo.shape[:2]
-
-                        # Position the projectile at the tip of the spaceship
-                        if player_id == 0:
-                            ammo_start_x = player["x"] + PLAYER_TARGET_W - (rotated_ammo_w // 2)
-                        else:  # Player 2 shooting to the left
-                            ammo_start_x = player["x"] - (rotated_ammo_w // 2)
-                        ammo_start_y = player["y"] + (PLAYER1_TARGET_H if player_id == 0 else PLAYER2_TARGET_H) // 2 - (rotated_ammo_h // 2)
-
-                        projectiles.append({
-                            'x': ammo_start_x,
-                            'y': ammo_start_y,
-                            'w': rotated_ammo_w,
-                            'h': rotated_ammo_h,
-                            'img': rotated_ammo,
-                            'player': f"Player {player_id + 1}"
-                        })
-                        last_blink_time[player_id] = current_time
-                        eye_ready_to_blink[player_id] = 0
-
-            # Detect hand gestures
-            if results_hands.multi_hand_landmarks:
-                for hand_landmarks in results_hands.multi_hand_landmarks:
-                    gesture = detect_hand_gesture(hand_landmarks)
-                    hand_x_normalized = hand_landmarks.landmark[mp_hands.HandLandmark.WRIST].x
-                    if gesture == "thumbs_up":
-                        activate_shield("Player 1" if hand_x_normalized < 0.5 else "Player 2")
-
-            # Draw projectiles and detect collisions
-            for i in range(len(projectiles) - 1, -1, -1):
-                proj = projectiles[i]
-                frame = overlay_transparent(frame, proj['img'], proj['x'], proj['y'], (proj['w'], proj['h']))
-                collision_occurred = False
-
-                for idx, position in enumerate(player_positions):
-                    if position is not None:
-                        player_x, player_y = position["x"], position["y"]
-                        player_w_check = PLAYER_TARGET_W
-                        player_h_check = PLAYER1_TARGET_H if idx == 0 else PLAYER2_TARGET_H
-
-                        # Collision logic
-                        player_left = player_x
-                        player_top = player_y
-                        player_right = player_x + player_w_check
-                        player_bottom = player_y + player_h_check
-
-                        proj_left = proj['x']
-                        proj_top = proj['y']
-                        proj_right = proj['x'] + proj['w']
-                        proj_bottom = proj['y'] + proj['h']
-
-                        if (proj_left < player_right and proj_right > player_left and
-                            proj_top < player_bottom and proj_bottom > player_top):
-                            if proj['player'] != f"Player {idx + 1}":
-                                if (idx == 0 and shield_active_player1) or (idx == 1 and shield_active_player2):
-                                    collision_occurred = True
-                                    break
-                                else:
-                                    if idx == 0:
-                                        health_player1 -= 10
-                                    else:
-                                        health_player2 -= 10
-                                    collision_occurred = True
-                                    if health_player1 <= 0:
-                                        current_game_state = GAME_STATE_WINNER
-                                        winner_player_id = "Player 2"
-                                    elif health_player2 <= 0:
-                                        current_game_state = GAME_STATE_WINNER
-                                        winner_player_id = "Player 1"
-                                    break
-
-                if collision_occurred:
-                    projectiles.pop(i)
-
-            # Draw shields if active
-            for idx, position in enumerate(player_positions):
-                if position is not None:
-                    player_x, player_y = position["x"], position["y"]
-                    player_w_shield = PLAYER_TARGET_W
-                    player_h_shield = PLAYER1_TARGET_H if idx == 0 else PLAYER2_TARGET_H
-
-                    shield_scale_factor = 1.3
-                    scaled_shield_w = int(player_w_shield * shield_scale_factor)
-                    scaled_shield_h = int(player_h_shield * shield_scale_factor)
-
-                    shield_draw_x = player_x - (scaled_shield_w - player_w_shield) // 2
-                    shield_draw_y = player_y - (scaled_shield_h - player_h_shield) // 2
-
-                    if idx == 0 and shield_active_player1:
-                        frame = overlay_transparent(frame, shield_img, shield_draw_x, shield_draw_y, (scaled_shield_w, scaled_shield_h))
-                    elif idx == 1 and shield_active_player2:
-                        frame = overlay_transparent(frame, shield_img, shield_draw_x, shield_draw_y, (scaled_shield_w, scaled_shield_h))
+        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=inference.frame_buffer())
+        profiler.mark("preprocess")
+        current_time = clock.now()
+        if latency is not None:
+            latency.frame_started(current_time, stream.last_capture_time)
+        run_face = face_scheduler.should_run(face_detection_needed(trackers, current_time))
+        hand_gate = (core.shield_available(0), core.shield_available(1))
+        inference.set_hand_gate(hand_gate)
+        run_hands = any(hand_gate) and hands_scheduler.should_run()
+        inference_result = inference.process(rgb_frame, run_face=run_face, run_hands=run_hands)
+        profiler.mark("inference")
+        profiler.record("face", inference_result.face_ms)
+        profiler.record("hands", inference_result.hands_ms)
+        if recorder is not None:
+            recorder.add_frame(raw_frame, current_time, inference_result)
+            profiler.mark("record")
+        # All landmarks gameplay reads, as arrays, then EAR, nose and thumbs-up for everyone at once
+        landmark_batch.load(inference_result.face.multi_face_landmarks if inference_result.face else None,
+                            inference_result.hands.multi_hand_landmarks if inference_result.hands else None)
+        avg_ears, noses, thumbs, wrist_xs = landmark_features(landmark_batch, eye_rows, nose_row, tip_rows, wrist_row, iw, ih)
+
+        if core.state == GAME_STATE_PLAYING:
+            # Turn this frame's detections into timestamped input events
+            measured = [False, False]
+            for face in range(landmark_batch.face_count):
+                nose_x, nose_y = float(noses[face, 0]), float(noses[face, 1])
+                if nose_x < 0 or nose_x > 1 or nose_y < 0 or nose_y > 1:
+                    continue
+
+                # Determine player ID based on nose position relative to the center line
+                player_id = 0 if nose_x * iw < SCREEN_CENTER_X else 1
+
+                # Ensure only one player is detected per side if two faces are detected
+                if measured[player_id]:
+                    continue
+                trackers[player_id].update(nose_x, nose_y, float(avg_ears[face]), current_time)
+                measured[player_id] = True
+
+            # Positions come from the trackers, so they are smoothed and predicted between detections
+            for player_id, tracker in enumerate(trackers):
+                if not tracker.active:
+                    continue
+                push_event(InputEvent(current_time, "nose", player_id, tracker.predict(current_time)))
+                # Blinks are only judged on measured EAR, never on a predicted or smoothed one
+                if measured[player_id]:
+                    push_event(InputEvent(current_time, "ear", player_id, tracker.raw_ear))
+
+            # Detect hand gestures. A hand belongs to the player it was found for; only
+            # results that do not say, like older recordings, fall back to the wrist's side.
+            hand_players = inference_result.hands.hand_players if inference_result.hands else None
+            for hand in range(landmark_batch.hand_count):
+                if thumbs[hand]:
+                    player_id = hand_players[hand] if hand_players is not None else player_for_wrist(wrist_xs[hand])
+                    push_event(InputEvent(current_time, "gesture", player_id, "thumbs_up"))
+
+            # Run the simulation up to the current time, then draw between its last two steps
+            profiler.mark("game")
+            sim_alpha = sim_loop.advance(current_time, simulation_step)
+            if latency is not None:
+                latency.effects(core.effects)
+            else:
+                core.effects.clear()
+            for kind, player_id, x, y in core.events:
+                if kind == "hit":
+                    animator.play(hit_explosion, current_time, x, y)
+                elif kind == "shield_hit":
+                    # The side facing the shot, or the top/bottom for shots striking there
+                    player = core.players[player_id]
+                    offset = y - (player.y + player.h // 2)
+                    if offset < -player.h // 4:
+                        animator.play(shield_hit_up[player_id], current_time, player=player_id)
+                    elif offset > player.h // 4:
+                        animator.play(shield_hit_down[player_id], current_time, player=player_id)
+                    else:
+                        animator.play(shield_hit[player_id], current_time, player=player_id)
+                elif kind == "shield_cracking":
+                    animator.play(shield_crack[player_id], current_time, player=player_id)
+                elif kind == "shield_down":
+                    animator.play(shield_destroyed[player_id], current_time, player=player_id)
+                elif kind == "defeated":
+                    animator.play(defeat_explosion, current_time, player=player_id)
+            core.events.clear()
+            profiler.mark("simulation")
+
+            # Draw projectiles
+            projectile_xs = projectiles.interpolated_x(sim_alpha)
+            for i in projectiles.live_indices():
+                compositor.add(sprite_cache.by_id(projectiles.sprite_id[i]), int(projectile_xs[i]), int(projectiles.y[i]))
+
+            # Draw shields if active, pulsing in step with the game clock
+            for player in core.players:
+                if player.present and player.shield.active:
+                    scaled_shield_w, scaled_shield_h = shield_sizes[player.idx]
+                    shield_draw_x = player.x - (scaled_shield_w - player.w) // 2
+                    shield_draw_y = player.y - (scaled_shield_h - player.h) // 2
+                    compositor.add(shield_pulse[player.idx].frame_at(current_time), shield_draw_x, shield_draw_y)
 
         # Draw players and health bars
-        for idx, position in enumerate(player_positions):
-            if position is not None:
-                player_x, player_y = position["x"], position["y"]
-                player_to_draw_img = player1_rotated if idx == 0 else player2_rotated
-                player_w_draw = PLAYER_TARGET_W
-                player_h_draw = PLAYER1_TARGET_H if idx == 0 else PLAYER2_TARGET_H
-                frame = overlay_transparent(frame, player_to_draw_img, player_x, player_y, (player_w_draw, player_h_draw))
-                health = health_player1 if idx == 0 else health_player2
-                frame = draw_healthbar(frame, f"Player {idx + 1}", health, player_x, player_y - 20)
-
-        # Draw dividing line between players
-        cv2.line(frame, (SCREEN_CENTER_X, 0), (SCREEN_CENTER_X, ih), (255, 255, 255), 2)
+        for player in core.players:
+            if player.present:
+                # Engine flame behind the ship: Player 1 faces right, Player 2 left
+                flame = turbo[player.idx].frame_at(current_time)
+                flame_x = player.x - flame.width // 2 if player.idx == 0 else player.x + player.w - flame.width // 2
+                compositor.add(flame, flame_x, player.y + (player.h - flame.height) // 2)
+                if player.idx == 0:
+                    player_sprite = sprite_cache.get("player1", (player.w, player.h), PLAYER1_ANGLE)
+                else:
+                    player_sprite = sprite_cache.get("player2", (player.w, player.h), PLAYER2_ANGLE)
+                compositor.add(player_sprite, player.x, player.y)
+                add_healthbar(compositor, f"Player {player.idx + 1}", player.health, player.x, player.y - 20)
+
+        # Shield hits, shield breaks and explosions, over the ships
+        animator.draw(compositor, current_time, core.players)
+
+        # Divider, instructions and winner screen are cached layers, rendered again only when they change
+        compositor.add_static("divider", None, lambda canvas: cv2.line(
+            canvas, (SCREEN_CENTER_X, 0), (SCREEN_CENTER_X, ih), (255, 255, 255, 255), 2))
 
         # Draw instructions with fade-out effect
         elapsed_time = current_time - show_instructions_start_time
-        if current_game_state == GAME_STATE_PLAYING and elapsed_time < instruction_display_duration:
+        if core.state == GAME_STATE_PLAYING and elapsed_time < instruction_display_duration:
             alpha = 1.0
             if elapsed_time > instruction_display_duration - 2:
                 alpha = 1.0 - (elapsed_time - (instruction_display_duration - 2)) / 2.0
                 alpha = max(0, min(1, alpha))
-
-            font = cv2.FONT_HERSHEY_SIMPLEX
-            font_scale_base = ih / 480
-            font_scale = font_scale_base * 0.5
-            thickness = 1
-            line_height = int(font_scale * 40)
-            max_text_w = 0
-            total_text_h = 0
-
-            for line in instruction_text:
-                (text_w, text_h), baseline = cv2.getTextSize(line, font, font_scale, thickness)
-                max_text_w = max(max_text_w, text_w)
-                total_text_h += (text_h + baseline + 10)
-
-            start_x = (iw - max_text_w) // 2
-            start_y = (ih - total_text_h) // 2
-            y_offset = start_y
-
-            for line in instruction_text:
-                (text_w, text_h), baseline = cv2.getTextSize(line, font, font_scale, thickness)
-                x_pos = start_x + (max_text_w - text_w) // 2
-                text_color = (255, 255, 255)
-                text_color_alpha = (int(text_color[0] * alpha), int(text_color[1] * alpha), int(text_color[2] * alpha))
-                cv2.putText(frame, line, (x_pos, y_offset), font, font_scale, text_color_alpha, thickness, cv2.LINE_AA)
-                y_offset += (text_h + baseline + 10)
+            # Quantized, so the fade re-renders the text at most INSTRUCTION_FADE_LEVELS times
+            fade_level = int(alpha * INSTRUCTION_FADE_LEVELS)
+            compositor.add_static("instructions", fade_level, lambda canvas: draw_instructions(
+                canvas, instruction_text, fade_level / INSTRUCTION_FADE_LEVELS))
 
         # Winner state display
-        if current_game_state == GAME_STATE_WINNER:
+        if core.state == GAME_STATE_WINNER:
             projectiles.clear()
-            winner_scale_factor = 0.5
-            winner_display_w = int(winner_img_raw.shape[1] * winner_scale_factor)
-            winner_display_h = int(winner_img_raw.shape[0] * winner_scale_factor)
-            winner_scaled_img = cv2.resize(winner_img_raw, (winner_display_w, winner_display_h), interpolation=cv2.INTER_AREA)
-
-            if winner_player_id == "Player 1":
-                winner_x = (SCREEN_CENTER_X // 2) - (winner_display_w // 2)
-            else:
-                winner_x = SCREEN_CENTER_X + (SCREEN_CENTER_X // 2) - (winner_display_w // 2)
-
-            winner_y = int(ih * 0.1)
-            frame = overlay_transparent(frame, winner_scaled_img, winner_x, winner_y, (winner_display_w, winner_display_h))
-
-            winner_text = f"{winner_player_id} WINS!"
-            font = cv2.FONT_HERSHEY_SIMPLEX
-            text_scale = ih / 480 * 1.0
-            text_thickness = 2
-            (text_w, text_h), baseline = cv2.getTextSize(winner_text, font, text_scale, text_thickness)
-            text_x = winner_x + (winner_display_w // 2) - (text_w // 2)
-            text_y = winner_y + winner_display_h + 30
-            cv2.putText(frame, winner_text, (text_x, text_y), font, text_scale, (0, 255, 255), text_thickness, cv2.LINE_AA)
-
-            # Draw REPLAY and CLOSE buttons
-            button_scale_factor = 0.3
-            replay_btn_resized = cv2.resize(replay_btn_img, (int(replay_btn_img.shape[1] * button_scale_factor), int(replay_btn_img.shape[0] * button_scale_factor)), interpolation=cv2.INTER_AREA)
-            close_btn_resized = cv2.resize(close_btn_img, (int(close_btn_img.shape[1] * button_scale_factor), int(close_btn_img.shape[0] * button_scale_factor)), interpolation=cv2.INTER_AREA)
-            replay_btn_w, replay_btn_h = replay_btn_resized.shape[1], replay_btn_resized.shape[0]
-            close_btn_w, close_btn_h = close_btn_resized.shape[1], close_btn_resized.shape[0]
-
-            buttons_center_y = int(ih * 0.5)
-            total_buttons_width = replay_btn_w + close_btn_w + 40
-            start_x_buttons = (iw // 2) - (total_buttons_width // 2)
-            replay_x = start_x_buttons
-            replay_y = buttons_center_y - (replay_btn_h // 2)
-            close_x = start_x_buttons + replay_btn_w + 40
-            close_y = buttons_center_y - (close_btn_h // 2)
-
-            frame = overlay_transparent(frame, replay_btn_resized, replay_x, replay_y)
-            frame = overlay_transparent(frame, close_btn_resized, close_x, close_y)
-
-            replay_button_rect = (replay_x, replay_y, replay_btn_w, replay_btn_h)
-            close_button_rect = (close_x, close_y, close_btn_w, close_btn_h)
-
-        cv2.imshow("EVADER", frame)
-        key = cv2.waitKey(1) & 0xFF
+            layout = winner_layout(iw, ih, core.winner)
+            compositor.add_static("winner", core.winner, lambda canvas: draw_winner_screen(canvas, core.winner, layout))
+            replay_button_rect = layout["replay"]
+            close_button_rect = layout["close"]
+        profiler.mark("text")
+
+        # Everything above is blended onto the camera frame here, in one pass over the dirty rects
+        frame = compositor.compose(frame)
+        profiler.mark("composite")
+
+        if recorder is not None:
+            recorder.add_state(core)
+        if show_hud:
+            frame = profiler.draw_hud(frame)
+            profiler.mark("text")
+        key = display.show(frame)
+        if startup is not None:
+            startup.mark("first game frame")
+        if latency is not None:
+            latency.frame_displayed()
+        profiler.mark("display")
+        profiler.end_frame()
+        if governor is not None:
+            # Judged on the time this frame kept the loop busy, not on waiting for the camera
+            frame_end = time.perf_counter()
+            level = governor.observe((frame_end - frame_start) * 1000.0, frame_end)
+            if level is not None:
+                _, previous, _, reason = governor.changes[-1]
+                log(f"Quality: {previous} -> {level.describe()}: {reason}")
+                apply_quality(level, inference, hands_scheduler)
+        frames_processed += 1
+
+        # A replayed session restarts on the same frame the recorded one did
+        if replay is not None and replay.restart_requested():
+            _restart_game_flag = True
 
         # Global exit (ESC)
         if key == 27:
@@ -433,24 +547,141 @@ def main():
 
         # Handle button clicks via mouse callback flags
         if _restart_game_flag:
-            current_game_state = GAME_STATE_PLAYING
-            winner_player_id = None
-            health_player1 = 100
-            health_player2 = 100
-            shield_active_player1 = False
-            shield_active_player2 = False
-            projectiles.clear()
-            player_positions = [None, None]
-            last_blink_time = [0, 0]
-            eye_ready_to_blink = [0, 0]
-            show_instructions_start_time = time.time()
+            if recorder is not None:
+                recorder.add_event(InputEvent(current_time, "restart", -1))
+            core.reset()
+            animator.clear()
+            input_events.clear()
+            sim_loop.reset(current_time)
+            for tracker in trackers:
+                tracker.reset()
+            face_scheduler.reset()
+            hands_scheduler.reset()
+            show_instructions_start_time = current_time
             _restart_game_flag = False
         if _exit_game_flag:
             break
 
-    cap.release()
-    cv2.destroyAllWindows()
+    run_elapsed = time.perf_counter() - run_start
+    display.close()
+
+    cache_stats = sprite_cache.stats()
+    log(f"Sprite cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, {cache_stats['entries']} entries")
+    inference_stats = inference.stats()
+    frame_ms = frame_stat.mean()
+    log(f"Inference: FaceMesh {inference_stats['face_ms']:.1f} ms, Hands {inference_stats['hands_ms']:.1f} ms, "
+        f"combined {inference_stats['inference_ms']:.1f} ms; frame {frame_ms:.1f} ms "
+        f"({1000.0 / frame_ms if frame_ms else 0.0:.1f} FPS)")
+    capture_stats = stream.stats()
+    log(f"Source: {capture_stats['captured']} frames captured, {capture_stats['dropped']} dropped")
+    run_fps = frames_processed / run_elapsed if run_elapsed else 0.0
+    log(f"Run: {frames_processed} frames in {run_elapsed:.2f} s ({run_fps:.1f} FPS)")
+    if profiler.enabled:
+        log(profiler.summary())
+    if latency is not None:
+        log(latency.summary())
+    if governor is not None:
+        log(governor.summary())
+    if startup is not None:
+        log(startup.summary())
+    return {"frames": frames_processed, "elapsed_s": run_elapsed, "fps": run_fps, "frame_ms": frame_ms, **inference_stats}
 
 if __name__ == "__main__":
-    if menu_manager.run_menu():
-        main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="EVADER")
+    parser.add_argument("--inference", choices=("inprocess", "multiprocess"), default="inprocess",
+                        help="run FaceMesh/Hands on threads in this process or in separate worker processes")
+    parser.add_argument("--face-size", type=parse_size, default=FACE_INFERENCE_SIZE, metavar="WxH",
+                        help="resolution FaceMesh runs at")
+    parser.add_argument("--hands-size", type=parse_size, default=HANDS_INFERENCE_SIZE, metavar="WxH",
+                        help="resolution Hands runs at")
+    parser.add_argument("--face-interval", type=int, default=FACE_DETECTION_INTERVAL,
+                        help="run FaceMesh every N frames (1 = every frame)")
+    parser.add_argument("--hands-interval", type=int, default=HANDS_DETECTION_INTERVAL,
+                        help="run Hands every N frames (1 = every frame)")
+    parser.add_argument("--source", default="camera",
+                        help="camera, camera:N, synthetic, a video file, or a directory/glob of images")
+    parser.add_argument("--loop", action="store_true", help="restart a video or image source when it ends")
+    parser.add_argument("--frames", type=int, default=None, help="number of frames a synthetic source produces")
+    parser.add_argument("--display", choices=("window", "null", "offscreen"), default="window",
+                        help="show frames in a window, discard them, or keep them offscreen")
+    parser.add_argument("--display-output", default=None, metavar="PATH",
+                        help="with --display offscreen, write every frame to this video file")
+    parser.add_argument("--record", default=None, metavar="PREFIX",
+                        help="record frames to PREFIX.mp4 and landmarks, timestamps and events to PREFIX.npz")
+    parser.add_argument("--replay", default=None, metavar="PREFIX",
+                        help="replay a recorded session, feeding its landmarks to the game instead of running the models")
+    parser.add_argument("--profile", action="store_true", help="time every stage of the frame loop")
+    parser.add_argument("--profile-hud", action="store_true", help="show stage p50/p95/p99 on screen (implies --profile)")
+    parser.add_argument("--profile-out", default=None, metavar="PATH",
+                        help="write per-frame stage times to PATH on exit, CSV if it ends in .csv, JSON otherwise "
+                             "(implies --profile)")
+    parser.add_argument("--latency", action="store_true",
+                        help="measure blink/thumbs-up to on-screen projectile/shield latency")
+    parser.add_argument("--latency-out", default=None, metavar="PATH",
+                        help="write latency samples to PATH on exit, CSV if it ends in .csv, JSON with histograms "
+                             "otherwise (implies --latency)")
+    parser.add_argument("--target-fps", type=float, default=None,
+                        help="lower inference resolution and resize quality, hand detection rate and landmark "
+                             "refinement while frames take longer than this rate allows, and raise them again "
+                             "when there is headroom")
+    parser.add_argument("--quality-log", default=None, metavar="PATH",
+                        help="with --target-fps, write every quality change and its reason to PATH as CSV")
+    parser.add_argument("--blend", choices=BLEND_MODES, default=BLEND_MODE,
+                        help="sprite blend: integer premultiplied alpha, or the original float64 math")
+    args = parser.parse_args()
+    set_blend_mode(args.blend)
+
+    startup = StartupTimer(PROCESS_START)
+    asset_report = prepare_sprites(sprite_cache, GAME_SPRITE_VARIANTS)
+    asset_stats = asset_cache.stats()
+    print(f"Assets: {asset_stats['hits']} images mapped from cache, {asset_stats['misses']} decoded "
+          f"({asset_stats['load_ms']:.1f} ms); {asset_report['variants']} sprite variants built in "
+          f"{asset_report['build_ms']:.1f} ms, {asset_report['bytes'] / 1024:.0f} KiB")
+    animation_stats = load_animations(animation_atlas).stats()
+    print(f"Animations: {animation_stats['clips']} clips, {animation_stats['frames']} frames built in "
+          f"{animation_stats['build_ms']:.1f} ms, {animation_stats['bytes'] / 1024:.0f} KiB")
+    startup.mark("assets")
+
+    replay = None
+    loader = None
+    clock = game_clock
+    if args.replay is not None:
+        # Inference is skipped entirely; the recording provides frames, landmarks and time
+        replay = SessionReplay(args.replay)
+        inference = replay.inference()
+        stream = replay.source()
+        clock = replay
+    else:
+        # Models load and warm up in the background while the menu is showing
+        loader = BackgroundInit(load_inference, args.inference, args.face_size, args.hands_size, startup)
+        stream = open_source(args.source, size=RESIZED_FRAME_DIMENSIONS, loop=args.loop, frames=args.frames).start()
+    display = create_display(args.display, args.display_output)
+    recorder = SessionRecorder(args.record, size=RESIZED_FRAME_DIMENSIONS) if args.record else None
+    latency = LatencyTracker() if args.latency or args.latency_out else None
+    profiler = FrameProfiler() if args.profile or args.profile_hud or args.profile_out else NullProfiler()
+    governor = None
+    # A replay runs no models, so there is nothing for the governor to trade
+    if args.target_fps and replay is None:
+        governor = QualityGovernor(build_levels(args.face_size, args.hands_size, args.hands_interval), args.target_fps)
+    try:
+        # Headless runs and replays have nobody to click START, so they go straight into the game
+        if replay is not None or not display.interactive or menu_manager.run_menu(stream, display, startup, loader):
+            if loader is not None:
+                inference = loader.result()
+            main(stream, inference, display, args.face_interval, args.hands_interval,
+                 clock=clock, recorder=recorder, replay=replay, profiler=profiler, show_hud=args.profile_hud,
+                 latency=latency, governor=governor, startup=startup)
+    finally:
+        if recorder is not None:
+            recorder.close()
+        if args.profile_out:
+            profiler.export(args.profile_out)
+        if args.latency_out:
+            latency.export(args.latency_out)
+        if args.quality_log and governor is not None:
+            governor.export(args.quality_log)
+        if loader is not None:
+            loader.close()
+        else:
+            inference.close()
+        stream.release()
\ No newline at end of file
@@ -1,20 +1,29 @@
 import cv2
 import numpy as np
-from overlay import overlay_transparent
+from overlay import overlay_sprite
+from sprite_cache import sprite_cache
+from assets import load_image, prepare_sprites
 
-def run_menu():
+def run_menu(stream, display, startup=None, loading=None):
+    # startup (a StartupTimer) gets a "menu" mark on the first frame shown; while
+    # loading (a BackgroundInit) is not ready the menu says the models are loading
     # Load assets
-    title_img = cv2.imread('assets/BUTTON TITLE/TITLE.png', cv2.IMREAD_UNCHANGED)
-    start_btn_img = cv2.imread('assets/BUTTON TITLE/START.png', cv2.IMREAD_UNCHANGED)
+    title_img = load_image('assets/BUTTON TITLE/TITLE.png')
+    start_btn_img = load_image('assets/BUTTON TITLE/START.png')
 
     if title_img is None or start_btn_img is None:
         raise FileNotFoundError("Gambar tidak ditemukan. Pastikan semua aset ada di direktori yang benar.")
     if title_img.shape[2] < 4 or start_btn_img.shape[2] < 4:
         raise ValueError("Gambar tidak memiliki alpha channel.")
+    sprite_cache.register("title", title_img)
+    sprite_cache.register("start", start_btn_img)
 
     # Constants
     RESIZED_FRAME_DIMENSIONS = (640, 480)
     SCREEN_CENTER_X = RESIZED_FRAME_DIMENSIONS[0] // 2
+    TITLE_SIZE = (int(RESIZED_FRAME_DIMENSIONS[0] * 0.8), int(RESIZED_FRAME_DIMENSIONS[1] * 0.8))
+    START_BTN_SIZE = (int(start_btn_img.shape[1] * 0.3), int(start_btn_img.shape[0] * 0.3))
+    prepare_sprites(sprite_cache, [("title", TITLE_SIZE, 0), ("start", START_BTN_SIZE, 0)])
 
     # Initialize variables
     start_button_rect = None
@@ -29,38 +38,39 @@ def run_menu():
                y >= start_button_rect[1] and y <= start_button_rect[1] + start_button_rect[3]:
                 _start_game_flag = True
 
-    # Main menu loop
-    cap = cv2.VideoCapture(0)
-    if not cap.isOpened():
-        raise IOError("Tidak dapat membuka kamera.")
-    cv2.namedWindow("EVADER")
-    cv2.setMouseCallback("EVADER", handle_mouse_event)
+    # Main menu loop (the camera stream is opened once and shared with the game)
+    display.open(handle_mouse_event)
 
     while True:
-        ret, frame = cap.read()
+        ret, frame = stream.read()
         if not ret:
             break
 
         frame = cv2.flip(frame, 1)
-        frame = cv2.resize(frame, RESIZED_FRAME_DIMENSIONS)
+        if (frame.shape[1], frame.shape[0]) != RESIZED_FRAME_DIMENSIONS:
+            frame = cv2.resize(frame, RESIZED_FRAME_DIMENSIONS)
         ih, iw = frame.shape[:2]
 
         # Draw title screen
-        title_scaled = cv2.resize(title_img, (int(iw * 0.8), int(ih * 0.8)), interpolation=cv2.INTER_AREA)
-        title_x = (iw - title_scaled.shape[1]) // 2
+        title_scaled = sprite_cache.get("title", TITLE_SIZE)
+        title_x = (iw - title_scaled.width) // 2
         title_y = int(ih * 0.2)
-        frame = overlay_transparent(frame, title_scaled, title_x, title_y, (title_scaled.shape[1], title_scaled.shape[0]))
+        frame = overlay_sprite(frame, title_scaled, title_x, title_y)
 
         # Draw start button
-        start_btn_resized = cv2.resize(start_btn_img, (int(start_btn_img.shape[1] * 0.3), int(start_btn_img.shape[0] * 0.3)), interpolation=cv2.INTER_AREA)
-        start_btn_w, start_btn_h = start_btn_resized.shape[1], start_btn_resized.shape[0]
+        start_btn_resized = sprite_cache.get("start", START_BTN_SIZE)
+        start_btn_w, start_btn_h = start_btn_resized.width, start_btn_resized.height
         start_x = (iw // 2) - (start_btn_w // 2)
         start_y = int(ih * 0.7)
-        frame = overlay_transparent(frame, start_btn_resized, start_x, start_y, (start_btn_w, start_btn_h))
+        frame = overlay_sprite(frame, start_btn_resized, start_x, start_y)
         start_button_rect = (start_x, start_y, start_btn_w, start_btn_h)
 
-        cv2.imshow("EVADER", frame)
-        key = cv2.waitKey(1) & 0xFF
+        if loading is not None and not loading.ready():
+            cv2.putText(frame, "Memuat model...", (10, ih - 15), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+
+        key = display.show(frame)
+        if startup is not None:
+            startup.mark("menu")
 
         # Exit on ESC
         if key == 27:
@@ -70,7 +80,6 @@ def run_menu():
         if _start_game_flag:
             break
 
-    cap.release()
-    cv2.destroyAllWindows()
+    display.close()
 
     return _start_game_flag
\ No newline at end of file
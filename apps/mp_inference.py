@@ -0,0 +1,318 @@
+import multiprocessing
+import queue
+import time
+import traceback
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+from inference import (
+    FACE_MESH_OPTIONS,
+    FaceMeshRebuild,
+    InferenceResult,
+    RollingStat,
+    create_face_mesh,
+    create_hand_pipeline,
+    resize_for_inference,
+)
+from landmarks import PackedResult, pack_landmark_lists, unpack_landmark_lists
+
+class FrameRing:
+    # Fixed-size ring of frames in shared memory. Workers map the same block and
+    # read a slot in place, so only the slot index crosses the process boundary.
+    def __init__(self, shape, slots=4, name=None):
+        self.shape = tuple(shape)
+        self.slots = slots
+        nbytes = int(np.prod(self.shape)) * slots
+        self._owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self._owner, size=nbytes if self._owner else 0)
+        self.frames = np.ndarray((slots,) + self.shape, dtype=np.uint8, buffer=self.shm.buf)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def close(self):
+        self.frames = None
+        self.shm.close()
+        if self._owner:
+            self.shm.unlink()
+
+WORKER_KINDS = ("face", "hands")
+
+def _worker_main(kind, ring_name, shape, slots, size, options, task_queue, result_queue):
+    ring = FrameRing(shape, slots, name=ring_name)
+    interpolation = options.get("interpolation", cv2.INTER_AREA)
+    try:
+        if kind == "hands":
+            # The hand pipeline downscales its own full-frame pass and crops at full size
+            model = create_hand_pipeline(full_size=size)
+            model.interpolation = interpolation
+            size = None
+        else:
+            refine_landmarks = options.get("refine_landmarks", FACE_MESH_OPTIONS["refine_landmarks"])
+            model = create_face_mesh(refine_landmarks=refine_landmarks)
+            face_rebuild = FaceMeshRebuild(refine_landmarks)
+    except Exception:
+        result_queue.put(("error", traceback.format_exc(), 0.0))
+        ring.close()
+        return
+    result_queue.put(("ready", None, 0.0))
+
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+        if task[0] == "configure":
+            # Quality settings; applied before the next frame, in queue order
+            options = task[1]
+            interpolation = options.get("interpolation", interpolation)
+            if kind == "hands":
+                model.full_size = options.get("size", model.full_size)
+                model.interpolation = interpolation
+            else:
+                size = options.get("size", size)
+                if "refine_landmarks" in options:
+                    # Built on a helper thread; frames keep going to the current model meanwhile
+                    face_rebuild.request(options["refine_landmarks"])
+            continue
+        seq, slot, hand_gate = task
+        start = time.perf_counter()
+        try:
+            if kind == "hands":
+                model.set_gate(hand_gate)
+            else:
+                model = face_rebuild.swap(model)
+            # Downscaling happens here, off the game process
+            result = model.process(resize_for_inference(ring.frames[slot], size, interpolation))
+            if kind == "face":
+                packed = pack_landmark_lists(result.multi_face_landmarks)
+            else:
+                packed = (pack_landmark_lists(result.multi_hand_landmarks), result.hand_players)
+        except Exception:
+            # Reported like a startup failure, with the frame's number in place of the time
+            result_queue.put(("error", traceback.format_exc(), seq))
+            continue
+        result_queue.put((seq, packed, (time.perf_counter() - start) * 1000.0))
+
+    if kind == "face":
+        face_rebuild.close()
+    model.close()
+    ring.close()
+
+class _Worker:
+    def __init__(self, context, kind, ring, size=None, log=print):
+        self.context = context
+        self.log = log
+        self.kind = kind
+        self.ring = ring
+        self.size = size
+        # Quality settings, kept so a restarted worker comes back with them
+        self.options = {}
+        self.process = None
+        self.ready = False
+        self.restarts = 0
+        self.missed = 0
+
+    def start(self):
+        self.task_queue = self.context.Queue()
+        self.result_queue = self.context.Queue()
+        self.process = self.context.Process(
+            target=_worker_main,
+            args=(self.kind, self.ring.name, self.ring.shape, self.ring.slots, self.size, self.options,
+                  self.task_queue, self.result_queue),
+            name=f"EVADER-{self.kind}",
+            daemon=True,
+        )
+        self.process.start()
+        self.ready = False
+        self.missed = 0
+
+    def wait_ready(self, timeout):
+        deadline = time.monotonic() + timeout
+        while not self.ready:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self.process.is_alive():
+                raise RuntimeError(f"Worker inferensi '{self.kind}' gagal dijalankan.")
+            self.poll_ready(min(remaining, 0.1))
+
+    def poll_ready(self, timeout=0.0):
+        try:
+            status, payload, _ = self.result_queue.get(timeout=timeout) if timeout else self.result_queue.get_nowait()
+        except queue.Empty:
+            return False
+        if status == "error":
+            raise RuntimeError(f"Worker inferensi '{self.kind}' gagal memuat model:\n{payload}")
+        self.ready = status == "ready"
+        return self.ready
+
+    def submit(self, seq, slot, hand_gate):
+        if not self.ready:
+            self.poll_ready()
+        if self.ready:
+            self.task_queue.put((seq, slot, hand_gate))
+            return True
+        return False
+
+    def configure(self, options):
+        self.options.update(options)
+        self.size = self.options.get("size", self.size)
+        if self.process is not None:
+            self.task_queue.put(("configure", options))
+
+    def collect(self, seq, timeout):
+        # Returns (ok, packed, ms) for this frame; results of older, timed-out frames are
+        # discarded, and a failed frame is logged and returned as not ok
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False, None, 0.0
+            try:
+                result_seq, packed, ms = self.result_queue.get(timeout=min(remaining, 0.05))
+            except queue.Empty:
+                if not self.process.is_alive():
+                    return False, None, 0.0
+                continue
+            if result_seq == "error":
+                self.log(f"Worker inferensi '{self.kind}' gagal memproses frame {ms}:\n{packed.rstrip()}")
+                if ms == seq:
+                    return False, None, 0.0
+                continue
+            if result_seq == seq:
+                return True, packed, ms
+
+    def stop(self, timeout=2.0):
+        if self.process is None:
+            return
+        if self.process.is_alive():
+            try:
+                self.task_queue.put(None)
+            except (OSError, ValueError):
+                pass
+            self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout)
+        for q in (self.task_queue, self.result_queue):
+            q.close()
+            q.cancel_join_thread()
+        self.process = None
+        self.ready = False
+
+    def restart(self):
+        # The replacement reports ready on its own; frames until then get empty results
+        self.stop(timeout=0.5)
+        self.restarts += 1
+        self.start()
+
+class MultiprocessInference:
+    # Same interface as InferenceStage, with FaceMesh and Hands in their own processes
+    def __init__(self, frame_shape, face_size=None, hands_size=None, slots=4,
+                 frame_timeout=1.0, startup_timeout=60.0, max_missed=3, log=print):
+        self.frame_timeout = frame_timeout
+        self.max_missed = max_missed
+        self.ring = FrameRing(frame_shape, slots)
+        self._context = multiprocessing.get_context("spawn")
+        sizes = {"face": face_size, "hands": hands_size}
+        self._workers = {kind: _Worker(self._context, kind, self.ring, sizes[kind], log) for kind in WORKER_KINDS}
+        self._seq = 0
+        self.hand_gate = (True, True)
+        self.face_stat = RollingStat()
+        self.hands_stat = RollingStat()
+        self.total_stat = RollingStat()
+        try:
+            for worker in self._workers.values():
+                worker.start()
+            for worker in self._workers.values():
+                worker.wait_ready(startup_timeout)
+        except Exception:
+            self.close()
+            raise
+
+    def set_hand_gate(self, gate):
+        # Sent along with each task so the worker's hand pipeline skips gated players
+        self.hand_gate = tuple(gate)
+
+    def configure(self, face_size=None, hands_size=None, refine_landmarks=None, interpolation=None):
+        # Queued ahead of the next frame; FaceMesh is rebuilt inside its worker
+        shared = {} if interpolation is None else {"interpolation": interpolation}
+        face = dict(shared)
+        if face_size is not None:
+            face["size"] = face_size
+        if refine_landmarks is not None and refine_landmarks != self._workers["face"].options.get(
+                "refine_landmarks", FACE_MESH_OPTIONS["refine_landmarks"]):
+            face["refine_landmarks"] = refine_landmarks
+        hands = dict(shared)
+        if hands_size is not None:
+            hands["size"] = hands_size
+        for kind, options in (("face", face), ("hands", hands)):
+            if options:
+                self._workers[kind].configure(options)
+
+    def frame_buffer(self):
+        # Slot the next frame should be written into, so cvtColor can fill shared memory directly
+        return self.ring.frames[(self._seq + 1) % self.ring.slots]
+
+    def process(self, rgb_frame, run_face=True, run_hands=True):
+        start = time.perf_counter()
+        self._seq += 1
+        slot = self._seq % self.ring.slots
+        target = self.ring.frames[slot]
+        # Skip the copy when the caller already wrote into frame_buffer()
+        if not np.may_share_memory(rgb_frame, target):
+            np.copyto(target, rgb_frame)
+
+        wanted = {"face": run_face, "hands": run_hands}
+        submitted = {kind: wanted[kind] and worker.submit(self._seq, slot, self.hand_gate) for kind, worker in self._workers.items()}
+        outputs = {}
+        for kind, worker in self._workers.items():
+            packed, ms = None, 0.0
+            if not wanted[kind]:
+                outputs[kind] = None
+                continue
+            if submitted[kind]:
+                ok, packed, ms = worker.collect(self._seq, self.frame_timeout)
+                if ok:
+                    worker.missed = 0
+                else:
+                    worker.missed += 1
+                    if not worker.process.is_alive() or worker.missed >= self.max_missed:
+                        worker.restart()
+            outputs[kind] = (packed, ms)
+        total_ms = (time.perf_counter() - start) * 1000.0
+
+        face = hands = None
+        face_ms = hands_ms = 0.0
+        if outputs["face"] is not None:
+            packed, face_ms = outputs["face"]
+            face = PackedResult(multi_face_landmarks=unpack_landmark_lists(packed))
+            self.face_stat.add(face_ms)
+        if outputs["hands"] is not None:
+            packed, hands_ms = outputs["hands"]
+            # Hands come with the player each was found for
+            hand_landmarks, hand_players = packed if packed is not None else (None, None)
+            hands = PackedResult(multi_hand_landmarks=unpack_landmark_lists(hand_landmarks), hand_players=hand_players)
+            self.hands_stat.add(hands_ms)
+        self.total_stat.add(total_ms)
+        return InferenceResult(face, hands, face_ms, hands_ms, total_ms)
+
+    def reset_stats(self):
+        self.face_stat = RollingStat()
+        self.hands_stat = RollingStat()
+        self.total_stat = RollingStat()
+
+    def stats(self):
+        return {
+            "face_ms": self.face_stat.mean(),
+            "hands_ms": self.hands_stat.mean(),
+            "inference_ms": self.total_stat.mean(),
+            "restarts": sum(worker.restarts for worker in self._workers.values()),
+        }
+
+    def close(self):
+        for worker in self._workers.values():
+            worker.stop()
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
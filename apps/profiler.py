@@ -0,0 +1,127 @@
+import csv
+import json
+import time
+
+import cv2
+import numpy as np
+
+# Frame loop stages in the order they run. "face" and "hands" are the model times
+# reported by the inference stage; they overlap inside "inference" when run concurrently.
+STAGES = ("capture", "preprocess", "inference", "face", "hands", "record", "game",
+          "simulation", "composite", "text", "display")
+PERCENTILES = (50, 95, 99)
+
+class FrameProfiler:
+    # Lap timer over the frame loop: mark(stage) charges the time since the previous
+    # mark to that stage. Each frame is one row of a fixed-size ring buffer, so the
+    # cost per stage is a perf_counter() call and an add.
+    enabled = True
+
+    def __init__(self, stages=STAGES, capacity=3600, hud_interval=15):
+        self.stages = stages
+        self.capacity = capacity
+        self.hud_interval = hud_interval
+        self._index = {name: i for i, name in enumerate(stages)}
+        self.times = np.zeros((capacity, len(stages)), dtype=np.float32)
+        self.frame_start = np.zeros(capacity, dtype=np.float64)
+        self.frames = 0
+        self._row = np.zeros(len(stages), dtype=np.float64)
+        self._start = 0.0
+        self._last = 0.0
+        self._hud_lines = []
+
+    def begin_frame(self):
+        self._row[:] = 0.0
+        self._start = self._last = time.perf_counter()
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        self._row[self._index[stage]] += (now - self._last) * 1000.0
+        self._last = now
+
+    def record(self, stage, ms):
+        # For times measured elsewhere, e.g. the models in a worker process
+        self._row[self._index[stage]] += ms
+
+    def end_frame(self):
+        slot = self.frames % self.capacity
+        self.times[slot] = self._row
+        self.frame_start[slot] = self._start
+        self.frames += 1
+
+    def rows(self):
+        # Held frames, oldest first
+        if self.frames <= self.capacity:
+            return self.frame_start[:self.frames], self.times[:self.frames]
+        split = self.frames % self.capacity
+        order = np.r_[split:self.capacity, 0:split]
+        return self.frame_start[order], self.times[order]
+
+    def percentiles(self):
+        _, times = self.rows()
+        if not len(times):
+            return {}
+        values = np.percentile(times, PERCENTILES, axis=0)
+        totals = np.percentile(times.sum(axis=1) - times[:, self._index["face"]] - times[:, self._index["hands"]],
+                               PERCENTILES)
+        report = {stage: tuple(values[:, i].tolist()) for i, stage in enumerate(self.stages)}
+        report["frame"] = tuple(totals.tolist())
+        return report
+
+    def draw_hud(self, frame):
+        # Percentiles are recomputed every hud_interval frames; in between the text is reused
+        if self.frames % self.hud_interval == 0 or not self._hud_lines:
+            self._hud_lines = [f"{'stage':<10} p50   p95   p99"]
+            for stage, (p50, p95, p99) in self.percentiles().items():
+                self._hud_lines.append(f"{stage:<10} {p50:5.1f} {p95:5.1f} {p99:5.1f}")
+        y = 14
+        for line in self._hud_lines:
+            cv2.putText(frame, line, (8, y), cv2.FONT_HERSHEY_PLAIN, 0.8, (0, 255, 0), 1, cv2.LINE_AA)
+            y += 12
+        return frame
+
+    def export(self, path):
+        starts, times = self.rows()
+        starts = starts - starts[0] if len(starts) else starts
+        if path.lower().endswith(".csv"):
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(("frame", "t") + self.stages)
+                first = self.frames - len(times)
+                for i, (t, row) in enumerate(zip(starts, times)):
+                    writer.writerow([first + i, f"{t:.6f}"] + [f"{v:.3f}" for v in row])
+        else:
+            with open(path, "w") as f:
+                json.dump({
+                    "stages": list(self.stages),
+                    "percentiles": {stage: dict(zip(map(str, PERCENTILES), values))
+                                    for stage, values in self.percentiles().items()},
+                    "first_frame": self.frames - len(times),
+                    "t": starts.round(6).tolist(),
+                    "times_ms": times.round(3).tolist(),
+                }, f)
+
+    def summary(self):
+        lines = [f"{'Stage':<11}{'p50':>7}{'p95':>7}{'p99':>7}  ms"]
+        for stage, (p50, p95, p99) in self.percentiles().items():
+            lines.append(f"{stage:<11}{p50:7.2f}{p95:7.2f}{p99:7.2f}")
+        return "\n".join(lines)
+
+class NullProfiler:
+    # Stand-in when profiling is off: every call is an empty method
+    enabled = False
+
+    def begin_frame(self):
+        pass
+
+    def mark(self, stage):
+        pass
+
+    def record(self, stage, ms):
+        pass
+
+    def end_frame(self):
+        pass
+
+    def draw_hud(self, frame):
+        return frame
@@ -0,0 +1,80 @@
+import numpy as np
+
+# Projectile owners, matching the player index used everywhere else (0 = left, 1 = right)
+OWNER_PLAYER1 = 0
+OWNER_PLAYER2 = 1
+
+class ProjectileStore:
+    # Struct-of-arrays projectile pool with a fixed capacity. Player 1's shots travel
+    # right and Player 2's travel left; when full, a new shot replaces the oldest one.
+    def __init__(self, capacity):
+        self.capacity = capacity
+        # Positions are float so sub-pixel steps at a fixed simulation rate accumulate
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        # Positions before the last step, for interpolated drawing
+        self.prev_x = np.zeros(capacity, dtype=np.float32)
+        self.w = np.zeros(capacity, dtype=np.int32)
+        self.h = np.zeros(capacity, dtype=np.int32)
+        self.owner = np.zeros(capacity, dtype=np.int8)
+        self.sprite_id = np.zeros(capacity, dtype=np.int32)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.spawn_order = np.zeros(capacity, dtype=np.int64)
+        self._next_order = 0
+
+    def __len__(self):
+        return int(np.count_nonzero(self.alive))
+
+    def clear(self):
+        self.alive[:] = False
+
+    def spawn(self, x, y, w, h, owner, sprite_id):
+        free = np.flatnonzero(~self.alive)
+        if free.size:
+            slot = free[0]
+        else:
+            slot = int(np.argmin(self.spawn_order))
+        self.x[slot] = x
+        self.prev_x[slot] = x
+        self.y[slot] = y
+        self.w[slot] = w
+        self.h[slot] = h
+        self.owner[slot] = owner
+        self.sprite_id[slot] = sprite_id
+        self.alive[slot] = True
+        self.spawn_order[slot] = self._next_order
+        self._next_order += 1
+        return slot
+
+    def step(self, distance, frame_w):
+        # Move every live shot along its owner's direction and cull the ones off screen
+        direction = np.where(self.owner == OWNER_PLAYER1, 1.0, -1.0).astype(np.float32)
+        self.prev_x[:] = self.x
+        self.x += np.where(self.alive, direction * np.float32(distance), np.float32(0))
+        self.alive &= (self.x + self.w >= 0) & (self.x <= frame_w)
+
+    def collide(self, boxes, present):
+        # boxes: (players, 4) array of x, y, w, h; present: which players are on screen.
+        # A shot can only hit the other player. Returns the index of the player hit by
+        # each removed projectile, and the slots of those projectiles.
+        boxes = np.asarray(boxes, dtype=np.float32)
+        present = np.asarray(present, dtype=bool)
+        target = 1 - self.owner.astype(np.intp)
+        tx, ty, tw, th = boxes[target].T
+        hit = (
+            self.alive
+            & present[target]
+            & (self.x < tx + tw) & (self.x + self.w > tx)
+            & (self.y < ty + th) & (self.y + self.h > ty)
+        )
+        self.alive &= ~hit
+        return target[hit], np.flatnonzero(hit)
+
+    def interpolated_x(self, alpha):
+        # Draw position alpha of the way from the previous step to the current one
+        return self.prev_x + (self.x - self.prev_x) * np.float32(alpha)
+
+    def live_indices(self):
+        # Live slots in spawn order, so older shots are drawn first
+        idx = np.flatnonzero(self.alive)
+        return idx[np.argsort(self.spawn_order[idx], kind="stable")]
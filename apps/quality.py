@@ -0,0 +1,118 @@
+import csv
+
+import cv2
+from inference import RollingStat
+
+# Quality steps, best first. Sizes are fractions of the configured inference sizes,
+# hands_interval is added to the configured hand detection interval.
+QUALITY_STEPS = (
+    {"name": "high", "scale": 1.0, "hands_interval": 0, "refine_landmarks": True, "interpolation": cv2.INTER_AREA},
+    {"name": "medium", "scale": 0.75, "hands_interval": 1, "refine_landmarks": True, "interpolation": cv2.INTER_AREA},
+    {"name": "low", "scale": 0.5, "hands_interval": 2, "refine_landmarks": False, "interpolation": cv2.INTER_LINEAR},
+    {"name": "minimum", "scale": 0.4, "hands_interval": 5, "refine_landmarks": False, "interpolation": cv2.INTER_NEAREST},
+)
+# Models are never run below this size, whatever the step scale
+MIN_INFERENCE_SIZE = (160, 120)
+
+class QualityLevel:
+    __slots__ = ("index", "name", "face_size", "hands_size", "hands_interval", "refine_landmarks", "interpolation")
+
+    def __init__(self, index, name, face_size, hands_size, hands_interval, refine_landmarks, interpolation):
+        self.index = index
+        self.name = name
+        self.face_size = face_size
+        self.hands_size = hands_size
+        self.hands_interval = hands_interval
+        self.refine_landmarks = refine_landmarks
+        self.interpolation = interpolation
+
+    def describe(self):
+        return (f"{self.name} (face {self.face_size[0]}x{self.face_size[1]}, "
+                f"hands {self.hands_size[0]}x{self.hands_size[1]} every {self.hands_interval}, "
+                f"{'refined' if self.refine_landmarks else 'basic'} landmarks)")
+
+def _scaled(size, scale):
+    # Even dimensions keep the aspect ratio and suit the resize fast paths
+    return (max(MIN_INFERENCE_SIZE[0], int(size[0] * scale) // 2 * 2),
+            max(MIN_INFERENCE_SIZE[1], int(size[1] * scale) // 2 * 2))
+
+def build_levels(face_size, hands_size, hands_interval, steps=QUALITY_STEPS):
+    return [QualityLevel(i, step["name"], _scaled(face_size, step["scale"]), _scaled(hands_size, step["scale"]),
+                         hands_interval + step["hands_interval"], step["refine_landmarks"], step["interpolation"])
+            for i, step in enumerate(steps)]
+
+class QualityGovernor:
+    # Keeps the frame loop inside the budget of a target frame rate. The loop reports
+    # how long each frame kept it busy; once a full window of frames averages over the
+    # budget (plus down_margin) quality drops one level, and once a window averages well
+    # under it (up_margin) for at least up_hold seconds it rises one level. Every change
+    # restarts the window, so each decision is made on frames run at the current level.
+    # A rise that has to be undone within up_hold doubles up_hold, up to max_up_hold.
+    def __init__(self, levels, target_fps, window=45, down_margin=1.1, up_margin=0.7,
+                 down_hold=1.0, up_hold=4.0, max_up_hold=60.0):
+        self.levels = levels
+        self.target_fps = target_fps
+        self.budget_ms = 1000.0 / target_fps
+        self.window = window
+        self.down_margin = down_margin
+        self.up_margin = up_margin
+        self.down_hold = down_hold
+        self.up_hold = up_hold
+        self.max_up_hold = max_up_hold
+        self.index = 0
+        # Per change: seconds since the first frame, from level, to level, reason
+        self.changes = []
+        self._start = None
+        self._stat = RollingStat(window)
+        self._samples = 0
+        self._last_change = None
+        self._last_raise = None
+
+    @property
+    def level(self):
+        return self.levels[self.index]
+
+    def observe(self, frame_ms, now):
+        # Returns the new QualityLevel when it changes, None otherwise; changes[-1] holds why
+        if self._start is None:
+            self._start = now
+        self._stat.add(frame_ms)
+        self._samples += 1
+        if self._samples < self.window:
+            return None
+        mean_ms = self._stat.mean()
+        since_change = now - self._last_change if self._last_change is not None else float("inf")
+
+        if mean_ms > self.budget_ms * self.down_margin and self.index < len(self.levels) - 1 \
+                and since_change >= self.down_hold:
+            if self._last_raise is not None and now - self._last_raise < self.up_hold:
+                self.up_hold = min(self.up_hold * 2.0, self.max_up_hold)
+            reason = (f"mean frame {mean_ms:.1f} ms over {self.budget_ms * self.down_margin:.1f} ms "
+                      f"({self.target_fps:g} FPS budget {self.budget_ms:.1f} ms)")
+            return self._change(self.index + 1, now, reason)
+
+        if mean_ms < self.budget_ms * self.up_margin and self.index > 0 and since_change >= self.up_hold:
+            self._last_raise = now
+            reason = (f"mean frame {mean_ms:.1f} ms under {self.budget_ms * self.up_margin:.1f} ms "
+                      f"for {since_change:.1f} s ({self.target_fps:g} FPS budget {self.budget_ms:.1f} ms)")
+            return self._change(self.index - 1, now, reason)
+        return None
+
+    def _change(self, index, now, reason):
+        previous = self.level
+        self.index = index
+        self.changes.append((now - self._start, previous.name, self.level.name, reason))
+        self._stat = RollingStat(self.window)
+        self._samples = 0
+        self._last_change = now
+        return self.level
+
+    def summary(self):
+        return f"Quality: {len(self.changes)} changes, ended at {self.level.name}"
+
+    def export(self, path):
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(("time_s", "from", "to", "reason"))
+            for now, previous, level, reason in self.changes:
+                writer.writerow((f"{now:.3f}", previous, level, reason))
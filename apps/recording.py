@@ -0,0 +1,259 @@
+import cv2
+import numpy as np
+from capture import VideoFileSource
+from inference import InferenceResult
+from landmarks import PackedResult, pack_landmark_lists, unpack_landmark_lists
+
+# Per-frame landmark count meaning "the model did not run on this frame"
+NOT_RUN = -1
+# Recorded player of a hand whose result did not say which player it was found for
+UNKNOWN_PLAYER = -1
+
+class _LandmarkTrack:
+    # Variable number of landmark lists per frame, stored as one (total, N, 3) array
+    # plus a per-frame count (NOT_RUN when the model was skipped)
+    def __init__(self):
+        self.counts = []
+        self.chunks = []
+
+    def add(self, landmark_lists, ran):
+        if not ran:
+            self.counts.append(NOT_RUN)
+            return
+        packed = pack_landmark_lists(landmark_lists)
+        if packed is None:
+            self.counts.append(0)
+            return
+        self.counts.append(len(packed))
+        self.chunks.append(packed)
+
+    def arrays(self):
+        counts = np.array(self.counts, dtype=np.int16)
+        if self.chunks:
+            # FaceMesh gives 478 points with refined landmarks and 468 without, and the quality
+            # governor can switch between them mid-session; shorter lists are padded with NaN
+            # rows, which gameplay never reads
+            width = max(chunk.shape[1] for chunk in self.chunks)
+            points = np.full((sum(len(chunk) for chunk in self.chunks), width, 3), np.nan, dtype=np.float32)
+            row = 0
+            for chunk in self.chunks:
+                points[row:row + len(chunk), :chunk.shape[1]] = chunk
+                row += len(chunk)
+        else:
+            points = np.zeros((0, 0, 3), dtype=np.float32)
+        return counts, points
+
+class SessionRecorder:
+    # Writes <prefix>.mp4 with the captured frames and <prefix>.npz with, per frame,
+    # the game clock time, the FaceMesh/Hands landmarks (and the player of each hand)
+    # and a snapshot of the game state, plus every input event fed to the simulation
+    def __init__(self, prefix, fps=30.0, size=(640, 480)):
+        self.prefix = prefix
+        self.fps = fps
+        self.size = size
+        self._writer = None
+        self.start_time = 0.0
+        self.timestamps = []
+        self.states = []
+        self._face = _LandmarkTrack()
+        self._hands = _LandmarkTrack()
+        self._hand_players = []
+        self.events = []
+
+    def start(self, t):
+        # Game clock time the round started at, before the first frame
+        self.start_time = t
+
+    def add_frame(self, frame, t, result):
+        # frame is the raw captured frame; replay runs it through the same flip and resize
+        if self._writer is None:
+            self._writer = cv2.VideoWriter(self.prefix + ".mp4", cv2.VideoWriter_fourcc(*"mp4v"), self.fps, self.size)
+            if not self._writer.isOpened():
+                raise IOError(f"Tidak dapat menulis video: {self.prefix}.mp4")
+        if (frame.shape[1], frame.shape[0]) != self.size:
+            frame = cv2.resize(frame, self.size)
+        self._writer.write(frame)
+        self.timestamps.append(t)
+        face = result.face
+        hands = result.hands
+        self._face.add(face.multi_face_landmarks if face is not None else None, face is not None)
+        self._hands.add(hands.multi_hand_landmarks if hands is not None else None, hands is not None)
+        if hands is not None and hands.multi_hand_landmarks:
+            players = hands.hand_players or [UNKNOWN_PLAYER] * len(hands.multi_hand_landmarks)
+            self._hand_players.extend(players)
+
+    def add_state(self, core):
+        # Health of both players and live projectile count after this frame's simulation
+        self.states.append((core.players[0].health, core.players[1].health, len(core.projectiles)))
+
+    def add_event(self, event):
+        self.events.append(event)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.release()
+            self._writer = None
+        try:
+            face_counts, face_points = self._face.arrays()
+            hand_counts, hand_points = self._hands.arrays()
+            hand_players = np.array(self._hand_players, dtype=np.int8)
+        except ValueError as e:
+            # Keep the timestamps, game states and events even if the landmarks cannot be stored
+            print(f"Landmark tidak dapat disimpan, rekaman tanpa landmark: {e}")
+            face_counts = hand_counts = np.full(len(self.timestamps), NOT_RUN, dtype=np.int16)
+            face_points = hand_points = np.zeros((0, 0, 3), dtype=np.float32)
+            hand_players = np.zeros(0, dtype=np.int8)
+        event_values = np.full((len(self.events), 2), np.nan)
+        event_labels = []
+        for i, event in enumerate(self.events):
+            if isinstance(event.value, str):
+                event_labels.append(event.value)
+                continue
+            event_labels.append("")
+            if event.value is not None:
+                event_values[i, :len(np.atleast_1d(event.value))] = event.value
+        np.savez_compressed(
+            self.prefix + ".npz",
+            start_time=np.float64(self.start_time),
+            timestamps=np.array(self.timestamps, dtype=np.float64),
+            states=np.array(self.states, dtype=np.int32).reshape(-1, 3),
+            face_counts=face_counts,
+            face_points=face_points,
+            hand_counts=hand_counts,
+            hand_points=hand_points,
+            hand_players=hand_players,
+            event_t=np.array([e.t for e in self.events], dtype=np.float64),
+            event_kind=np.array([e.kind for e in self.events], dtype=np.str_),
+            event_player=np.array([e.player for e in self.events], dtype=np.int8),
+            event_value=event_values,
+            event_label=np.array(event_labels, dtype=np.str_),
+        )
+
+def _unpack_track(counts, points):
+    offsets = np.concatenate(([0], np.cumsum(np.maximum(counts, 0))))
+    frames = []
+    for i, count in enumerate(counts):
+        if count == NOT_RUN:
+            frames.append(None)
+        else:
+            frames.append(unpack_landmark_lists(points[offsets[i]:offsets[i] + count]) or [])
+    return frames
+
+def _unpack_players(counts, players):
+    # Per frame, the player of each hand, or None where the recording does not say
+    # (recordings made before hands carried their player, or UNKNOWN_PLAYER entries)
+    if players is None:
+        return [None] * len(counts)
+    offsets = np.concatenate(([0], np.cumsum(np.maximum(counts, 0))))
+    frames = []
+    for i, count in enumerate(counts):
+        frame = players[offsets[i]:offsets[i] + max(count, 0)].tolist()
+        frames.append(frame if frame and UNKNOWN_PLAYER not in frame else None)
+    return frames
+
+class SessionReplay:
+    # Plays a recorded session back: source() yields the recorded frames, inference()
+    # returns the recorded landmarks instead of running the models, and the clock
+    # reports the recorded time of the frame last read
+    def __init__(self, prefix):
+        self.prefix = prefix
+        data = np.load(prefix + ".npz")
+        self.start_time = float(data["start_time"])
+        self.timestamps = data["timestamps"]
+        self.states = data["states"]
+        self.face_frames = _unpack_track(data["face_counts"], data["face_points"])
+        self.hand_frames = _unpack_track(data["hand_counts"], data["hand_points"])
+        self.hand_player_frames = _unpack_players(data["hand_counts"],
+                                                  data["hand_players"] if "hand_players" in data else None)
+        restarts = data["event_t"][data["event_kind"] == "restart"]
+        self._restart_times = set(restarts.tolist())
+        self.frame_index = -1
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def now(self):
+        if self.frame_index < 0:
+            return self.start_time
+        return float(self.timestamps[self.frame_index])
+
+    def restart_requested(self):
+        # The player clicked REPLAY on this frame during recording
+        return self.frame_index >= 0 and self.now() in self._restart_times
+
+    def source(self):
+        return _ReplaySource(self)
+
+    def inference(self):
+        return _ReplayInference(self)
+
+class _ReplaySource(VideoFileSource):
+    def __init__(self, replay):
+        super().__init__(replay.prefix + ".mp4")
+        self.replay = replay
+
+    def read(self, timeout=None):
+        if self.replay.frame_index + 1 >= len(self.replay):
+            return False, None
+        ret, frame = super().read(timeout)
+        if ret:
+            self.replay.frame_index += 1
+        return ret, frame
+
+class _ReplayInference:
+    # Same interface as InferenceStage; results come from the recording
+    def __init__(self, replay):
+        self.replay = replay
+
+    def set_hand_gate(self, gate):
+        pass
+
+    def frame_buffer(self):
+        return None
+
+    def process(self, rgb_frame, run_face=True, run_hands=True):
+        i = self.replay.frame_index
+        faces = self.replay.face_frames[i]
+        hands = self.replay.hand_frames[i]
+        face = None if faces is None else PackedResult(multi_face_landmarks=faces or None)
+        hand = None if hands is None else PackedResult(multi_hand_landmarks=hands or None,
+                                                       hand_players=self.replay.hand_player_frames[i])
+        return InferenceResult(face, hand, 0.0, 0.0, 0.0)
+
+    def stats(self):
+        return {"face_ms": 0.0, "hands_ms": 0.0, "inference_ms": 0.0}
+
+    def close(self):
+        pass
+
+def compare_sessions(a, b):
+    # Frame-by-frame comparison of two recordings of the same input, e.g. a session
+    # and its replay on a newer version. Returns the first frame whose game state
+    # differs (None if none do) and the event counts of both.
+    data_a = np.load(a + ".npz")
+    data_b = np.load(b + ".npz")
+    states_a, states_b = data_a["states"], data_b["states"]
+    frames = min(len(states_a), len(states_b))
+    diff = np.flatnonzero(np.any(states_a[:frames] != states_b[:frames], axis=1))
+    first = int(diff[0]) if diff.size else None
+    if first is None and len(states_a) != len(states_b):
+        first = frames
+    return {
+        "frames": (len(states_a), len(states_b)),
+        "first_difference": first,
+        "events": (len(data_a["event_t"]), len(data_b["event_t"])),
+    }
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compare two recorded sessions frame by frame")
+    parser.add_argument("a", help="prefix of the first recording (without .mp4/.npz)")
+    parser.add_argument("b", help="prefix of the second recording")
+    args = parser.parse_args()
+    report = compare_sessions(args.a, args.b)
+    print(f"Frames: {report['frames'][0]} vs {report['frames'][1]}, events: {report['events'][0]} vs {report['events'][1]}")
+    if report["first_difference"] is None:
+        print("Game state identical on every frame")
+    else:
+        print(f"Game state first differs at frame {report['first_difference']}")
@@ -0,0 +1,64 @@
+import heapq
+import time
+
+class GameClock:
+    # Monotonic seconds; the game loop reads it once per frame
+    def __init__(self, time_fn=time.monotonic):
+        self._time_fn = time_fn
+
+    def now(self):
+        return self._time_fn()
+
+class Timer:
+    __slots__ = ("due", "seq", "callback", "args", "cancelled")
+
+    def __init__(self, due, seq, callback, args):
+        self.due = due
+        self.seq = seq
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def __lt__(self, other):
+        return (self.due, self.seq) < (other.due, other.seq)
+
+    def cancel(self):
+        self.cancelled = True
+
+class TimerScheduler:
+    # Heap of timers driven by the game clock. Nothing runs on another thread: due
+    # timers fire inside run_due(), in (due time, scheduling order), so the same
+    # clock readings always produce the same sequence of callbacks.
+    def __init__(self, clock):
+        self.clock = clock
+        self._heap = []
+        self._seq = 0
+
+    def call_at(self, due, callback, *args):
+        timer = Timer(due, self._seq, callback, args)
+        self._seq += 1
+        heapq.heappush(self._heap, timer)
+        return timer
+
+    def call_later(self, delay, callback, *args):
+        return self.call_at(self.clock.now() + delay, callback, *args)
+
+    def cancel_all(self):
+        for timer in self._heap:
+            timer.cancelled = True
+        self._heap.clear()
+
+    def run_due(self, now=None):
+        if now is None:
+            now = self.clock.now()
+        fired = 0
+        while self._heap and self._heap[0].due <= now:
+            timer = heapq.heappop(self._heap)
+            if timer.cancelled:
+                continue
+            timer.callback(*timer.args)
+            fired += 1
+        return fired
+
+    def pending(self):
+        return sum(1 for timer in self._heap if not timer.cancelled)
@@ -0,0 +1,88 @@
+import heapq
+
+# Rate gameplay runs at, independent of how fast frames are captured, inferred and drawn
+SIM_HZ = 120
+
+class InputEvent:
+    # Something the players did, stamped with the capture time of the frame it was seen in
+    __slots__ = ("t", "kind", "player", "value")
+
+    def __init__(self, t, kind, player, value=None):
+        self.t = t
+        self.kind = kind
+        self.player = player
+        self.value = value
+
+class InputQueue:
+    def __init__(self):
+        self._heap = []
+        self._seq = 0
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, event):
+        heapq.heappush(self._heap, (event.t, self._seq, event))
+        self._seq += 1
+
+    def pop_due(self, t):
+        # Events stamped at or before t, oldest first
+        while self._heap and self._heap[0][0] <= t:
+            yield heapq.heappop(self._heap)[2]
+
+    def clear(self):
+        self._heap.clear()
+
+class FixedStepLoop:
+    # Accumulator loop: advance() runs step_fn(sim_time, dt, events) once per elapsed dt
+    # and returns how far the wall clock is into the next step (0..1) for interpolation.
+    # It also serves as the clock for timers that must follow simulation time.
+    def __init__(self, step_hz=SIM_HZ, max_catch_up=0.25, inputs=None):
+        self.dt = 1.0 / step_hz
+        # Events a frame pushes are stamped with its time, which sim_time has not reached
+        # yet; advance() hands all of them to the first step so they apply in this frame
+        self.inputs = inputs if inputs is not None else InputQueue()
+        self.max_catch_up = max_catch_up
+        self.sim_time = 0.0
+        self.accumulator = 0.0
+        self.steps = 0
+        self.skipped_time = 0.0
+        self._last_time = None
+
+    def reset(self, now):
+        self.sim_time = now
+        self.accumulator = 0.0
+        self._last_time = now
+
+    def now(self):
+        return self.sim_time
+
+    def advance(self, now, step_fn):
+        if self._last_time is None:
+            self.reset(now)
+        self.accumulator += now - self._last_time
+        self._last_time = now
+
+        # After a long stall, skip time instead of running a burst of catch-up steps
+        if self.accumulator > self.max_catch_up:
+            skipped = self.accumulator - self.max_catch_up
+            self.sim_time += skipped
+            self.skipped_time += skipped
+            self.accumulator = self.max_catch_up
+
+        events = list(self.inputs.pop_due(now))
+        if events and self.accumulator < self.dt:
+            # No step falls due this frame; a zero-length one still applies the input
+            if step_fn(self.sim_time, 0.0, events) is False:
+                self.accumulator = 0.0
+            return self.accumulator / self.dt
+        while self.accumulator >= self.dt:
+            self.sim_time += self.dt
+            self.accumulator -= self.dt
+            self.steps += 1
+            if step_fn(self.sim_time, self.dt, events) is False:
+                # The simulation stopped itself (e.g. the round ended); drop the remainder
+                self.accumulator = 0.0
+                break
+            events = ()
+        return self.accumulator / self.dt
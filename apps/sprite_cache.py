@@ -0,0 +1,118 @@
+import threading
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+from overlay import rotate_image_alpha
+
+def premultiply(bgr, alpha):
+    # Planes for the integer blend: colour premultiplied by alpha, and 255 - alpha
+    # repeated per channel, the form cv2.multiply takes
+    alpha16 = alpha.astype(np.uint16)[:, :, np.newaxis]
+    premul = ((bgr * alpha16 + 127) // 255).astype(np.uint8)
+    inv_alpha = np.repeat((255 - alpha)[:, :, np.newaxis], 3, axis=2)
+    return premul, inv_alpha
+
+class Sprite:
+    __slots__ = ("bgr", "alpha", "premul", "inv_alpha", "width", "height")
+
+    def __init__(self, image):
+        # Split once so drawing never has to touch the RGBA source again
+        self.bgr = np.ascontiguousarray(image[:, :, :3])
+        self.alpha = np.ascontiguousarray(image[:, :, 3])
+        self.premul, self.inv_alpha = premultiply(self.bgr, self.alpha)
+        self.height, self.width = image.shape[:2]
+
+    @property
+    def nbytes(self):
+        return self.bgr.nbytes + self.alpha.nbytes + self.premul.nbytes + self.inv_alpha.nbytes
+
+class SpriteCache:
+    def __init__(self, capacity=128):
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._sources = {}
+        self._entries = OrderedDict()
+        self._ids = {}
+        self._keys = []
+        self._pinned = set()
+        # Arenas hosted in one process (host.py) draw from the same cache on their own threads
+        self._lock = threading.Lock()
+
+    def register(self, name, image):
+        if image is None:
+            raise FileNotFoundError(f"Gambar untuk aset '{name}' tidak ditemukan.")
+        if image.ndim < 3 or image.shape[2] < 4:
+            raise ValueError(f"Gambar untuk aset '{name}' tidak memiliki alpha channel.")
+        self._sources[name] = image
+        # Drop stale variants built from a previous image under the same name
+        for key in [k for k in self._entries if k[0] == name]:
+            del self._entries[key]
+            self._pinned.discard(key)
+
+    def source(self, name):
+        return self._sources[name]
+
+    def get(self, name, size=None, angle=0):
+        # size is the final (w, h) after rotation, matching overlay_transparent's overlay_size
+        key = (name, tuple(size) if size else None, angle)
+        with self._lock:
+            return self._get(key)
+
+    def _get(self, key):
+        name, size, angle = key
+        sprite = self._entries.get(key)
+        if sprite is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return sprite
+
+        self.misses += 1
+        image = self._sources[name]
+        if angle:
+            image = rotate_image_alpha(image, angle)
+        if size and (image.shape[1], image.shape[0]) != size:
+            image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+        sprite = Sprite(image)
+        self._entries[key] = sprite
+        if len(self._entries) > self.capacity:
+            self._evict()
+        return sprite
+
+    def _evict(self):
+        # Least recently used first, never a pinned variant
+        for key in self._entries:
+            if key not in self._pinned:
+                del self._entries[key]
+                return
+
+    def pin(self, name, size=None, angle=0):
+        # Build a variant now and keep it resident for the rest of the session
+        sprite = self.get(name, size, angle)
+        self._pinned.add((name, tuple(size) if size else None, angle))
+        return sprite
+
+    def intern(self, name, size=None, angle=0):
+        # Small integer handle for a variant, so array-backed stores can reference sprites
+        key = (name, tuple(size) if size else None, angle)
+        with self._lock:
+            sprite_id = self._ids.get(key)
+            if sprite_id is None:
+                sprite_id = len(self._keys)
+                self._ids[key] = sprite_id
+                self._keys.append(key)
+        return sprite_id
+
+    def by_id(self, sprite_id):
+        return self.get(*self._keys[sprite_id])
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+# Shared by the menu and the game so both reuse the same prepared sprites
+sprite_cache = SpriteCache()
@@ -0,0 +1,38 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+class StartupTimer:
+    # Milliseconds from process start to each milestone, e.g. the first menu frame
+    def __init__(self, start=None):
+        self.start = time.perf_counter() if start is None else start
+        self.marks = {}
+
+    def mark(self, name):
+        # Only the first time counts, so marking inside a loop is fine
+        if name not in self.marks:
+            self.marks[name] = (time.perf_counter() - self.start) * 1000.0
+
+    def summary(self):
+        return "Startup: " + ", ".join(f"{name} {ms:.0f} ms" for name, ms in self.marks.items())
+
+class BackgroundInit:
+    # Builds something slow on a helper thread, e.g. the models while the menu is showing
+    def __init__(self, factory, *args):
+        pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="Init")
+        self._future = pool.submit(factory, *args)
+        pool.shutdown(wait=False)
+
+    def ready(self):
+        return self._future.done()
+
+    def result(self):
+        # Waits for it; an exception raised while building is raised here
+        return self._future.result()
+
+    def close(self):
+        # Waits for it and closes what was built; a failed build has nothing to close
+        try:
+            built = self._future.result()
+        except Exception:
+            return
+        built.close()
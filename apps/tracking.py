@@ -0,0 +1,105 @@
+import math
+
+import numpy as np
+
+def _smoothing_factor(dt, cutoff):
+    tau = 1.0 / (2.0 * math.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+class OneEuroFilter:
+    # One Euro filter (Casiez et al.): heavy smoothing when the signal is still,
+    # little lag when it moves fast. Works on floats and NumPy arrays alike.
+    def __init__(self, min_cutoff=1.0, beta=0.0, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def reset(self):
+        self.value = None
+        self.derivative = None
+        self.last_time = None
+
+    def __call__(self, value, t):
+        if self.value is None:
+            self.value = value
+            self.derivative = value * 0.0
+            self.last_time = t
+            return self.value
+
+        dt = t - self.last_time
+        if dt <= 0:
+            return self.value
+        raw_derivative = (value - self.value) / dt
+        a_d = _smoothing_factor(dt, self.d_cutoff)
+        self.derivative = a_d * raw_derivative + (1.0 - a_d) * self.derivative
+
+        cutoff = self.min_cutoff + self.beta * np.max(np.abs(self.derivative))
+        a = _smoothing_factor(dt, cutoff)
+        self.value = a * value + (1.0 - a) * self.value
+        self.last_time = t
+        return self.value
+
+class PlayerTracker:
+    # Filtered nose position (normalized) and EAR for one player, plus constant-velocity
+    # prediction for the frames where face detection is skipped.
+    def __init__(self, max_prediction=0.2, hold_time=0.5):
+        self.position_filter = OneEuroFilter(min_cutoff=1.0, beta=10.0)
+        # The filtered EAR only decides when to run face detection again. Blinks are judged on
+        # the measured EAR: smoothing lifts a shallow blink's minimum over the threshold.
+        self.ear_filter = OneEuroFilter(min_cutoff=3.0, beta=5.0, d_cutoff=10.0)
+        self.max_prediction = max_prediction
+        self.hold_time = hold_time
+        self.ear = None
+        self.raw_ear = None
+        self.last_update = None
+
+    def reset(self):
+        self.position_filter.reset()
+        self.ear_filter.reset()
+        self.ear = None
+        self.raw_ear = None
+        self.last_update = None
+
+    @property
+    def active(self):
+        return self.last_update is not None
+
+    def update(self, nose_x, nose_y, ear, t):
+        self.position_filter(np.array((nose_x, nose_y), dtype=np.float64), t)
+        self.ear = float(self.ear_filter(ear, t))
+        self.raw_ear = float(ear)
+        self.last_update = t
+
+    def predict(self, t):
+        # Extrapolate at most max_prediction seconds, then hold the last position
+        horizon = min(max(t - self.last_update, 0.0), self.max_prediction)
+        x, y = self.position_filter.value + self.position_filter.derivative * horizon
+        return float(x), float(y)
+
+    def ear_falling(self, rate):
+        # True while the filtered EAR drops faster than `rate` per second
+        return self.ear_filter.derivative is not None and self.ear_filter.derivative < -rate
+
+    def confidence(self, t):
+        # 1.0 right after a detection, fading to 0.0 after hold_time without one
+        if self.last_update is None:
+            return 0.0
+        return max(0.0, 1.0 - (t - self.last_update) / self.hold_time)
+
+class DetectionScheduler:
+    # Runs a model every `interval` frames, and on every frame while `needs_detection`
+    # says the tracked state is not good enough to predict from.
+    def __init__(self, interval=1):
+        self.interval = max(1, interval)
+        self._frames_since = self.interval
+
+    def should_run(self, needs_detection=False):
+        self._frames_since += 1
+        if needs_detection or self._frames_since >= self.interval:
+            self._frames_since = 0
+            return True
+        return False
+
+    def reset(self):
+        self._frames_since = self.interval
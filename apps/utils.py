@@ -1,5 +1,8 @@
 import numpy as np
-import cv2
+
+# Point pairs of eye_aspect_ratio: the two vertical distances, then the horizontal one
+EAR_PAIRS = (np.array([1, 2, 0]), np.array([5, 4, 3]))
+THUMB_TIP_IDX, INDEX_TIP_IDX, MIDDLE_TIP_IDX = 4, 8, 12
 
 def eye_aspect_ratio(landmarks, eye_indices, img_w, img_h):
     p = np.array([(landmarks[i].x * img_w, landmarks[i].y * img_h) for i in eye_indices])
@@ -10,20 +13,35 @@ def eye_aspect_ratio(landmarks, eye_indices, img_w, img_h):
     return ear
 
 def detect_hand_gesture(hand_landmarks, thumb_threshold=0.1):
-    thumb_tip = hand_landmarks.landmark[4]
-    index_tip = hand_landmarks.landmark[8]
-    middle_tip = hand_landmarks.landmark[12]
+    thumb_tip = hand_landmarks.landmark[THUMB_TIP_IDX]
+    index_tip = hand_landmarks.landmark[INDEX_TIP_IDX]
+    middle_tip = hand_landmarks.landmark[MIDDLE_TIP_IDX]
 
     if (thumb_tip.y + thumb_threshold < index_tip.y) and (thumb_tip.y + thumb_threshold < middle_tip.y):
         return "thumbs_up"
 
     return None
 
-def draw_healthbar(frame, player_id, health, x, y, w=100, h=10, bg_color=(0, 0, 0), fg_color=(0, 255, 0)):
-    cv2.rectangle(frame, (x, y), (x + w, y + h), bg_color, 2)
+def eye_aspect_ratios(eyes, img_w, img_h):
+    # Batched eye_aspect_ratio: eyes is (..., 6, 2+) normalized points in eye_aspect_ratio's
+    # order, the result has the leading shape. Computed in float64 like the scalar version.
+    p = eyes[..., :2].astype(np.float64) * (img_w, img_h)
+    d = p[..., EAR_PAIRS[0], :] - p[..., EAR_PAIRS[1], :]
+    dist = np.sqrt((d * d).sum(axis=-1))
+    return (dist[..., 0] + dist[..., 1]) / (2.0 * dist[..., 2])
 
-    fill_width = int((health / 100) * w)
-    cv2.rectangle(frame, (x, y), (x + fill_width, y + h), fg_color, -1)
+def thumbs_up(tip_ys, thumb_threshold=0.1):
+    # Batched detect_hand_gesture on (count, 3) y of the thumb, index and middle finger tips
+    thumb_y = tip_ys[:, 0].astype(np.float64) + thumb_threshold
+    return (thumb_y < tip_ys[:, 1]) & (thumb_y < tip_ys[:, 2])
 
-    cv2.putText(frame, player_id, (x, y - 5), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-    return frame
\ No newline at end of file
+def landmark_features(batch, eye_rows, nose_row, tip_rows, wrist_row, img_w, img_h, thumb_threshold=0.1):
+    # Everything gameplay reads from a LandmarkBatch, for all faces and hands at once:
+    # average EAR of both eyes and nose (x, y) per face, thumbs-up and wrist x per hand.
+    # eye_rows is (2, 6) face rows, tip_rows the thumb/index/middle tip hand rows; see
+    # LandmarkBatch.face_rows / hand_rows.
+    faces = batch.faces
+    ears = eye_aspect_ratios(faces[:, eye_rows], img_w, img_h)
+    hands = batch.hands
+    return ((ears[:, 0] + ears[:, 1]) / 2.0, faces[:, nose_row, :2],
+            thumbs_up(hands[:, tip_rows, 1], thumb_threshold), hands[:, wrist_row, 0])